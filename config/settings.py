@@ -9,10 +9,21 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # ==================== SYMBOL CONFIGURATION ====================
-# Primary symbol for Angel One
-SYMBOL = "NIFTY 50"
-SYMBOL_TOKEN = "99926000"  # Angel One symbol token for Nifty 50 index
-EXCHANGE = "NSE"
+# Primary symbol for Angel One (override for other sources, e.g. BTCUSD / BTCUSD / DELTA)
+SYMBOL = os.getenv("SYMBOL", "NIFTY 50")
+SYMBOL_TOKEN = os.getenv("SYMBOL_TOKEN", "99926000")  # Angel One symbol token for Nifty 50 index
+EXCHANGE = os.getenv("EXCHANGE", "NSE")
+
+# Watchlist CSV (columns: symbol, token, exchange) - scanned concurrently.
+# Without the file only SYMBOL / SYMBOL_TOKEN above is watched.
+# See config/watchlist.example.csv
+WATCHLIST_FILE = os.getenv("WATCHLIST_FILE", "config/watchlist.csv")
+SCAN_MAX_WORKERS = 16  # Concurrent candle fetches per scan cycle
+
+# Local copy of Angel One's scrip master (OpenAPIScripMaster.json), indexed
+# into SQLite on first use. Watchlist rows without a token are resolved by symbol.
+INSTRUMENT_MASTER_PATH = os.getenv("INSTRUMENT_MASTER_PATH", "data/OpenAPIScripMaster.json")
+INSTRUMENT_INDEX_PATH = "data/instruments.sqlite3"
 
 # ==================== TIMEFRAME CONFIGURATION ====================
 TIMEFRAME = "FIVE_MINUTE"  # Angel One format - 5 minute candles
@@ -26,6 +37,21 @@ SUPPORTED_TIMEFRAMES = {
     "1d": "ONE_DAY"
 }
 
+# Candle length in minutes for each Angel One interval
+TIMEFRAME_MINUTES = {
+    "ONE_MINUTE": 1,
+    "FIVE_MINUTE": 5,
+    "FIFTEEN_MINUTE": 15,
+    "ONE_HOUR": 60,
+    "ONE_DAY": 1440
+}
+
+# Multi-timeframe mode: fetch only 1-minute candles and roll them up into
+# every timeframe listed here (NSE session aligned, 09:15 anchor), e.g.
+# ["FIVE_MINUTE", "FIFTEEN_MINUTE", "ONE_HOUR"]. None = TIMEFRAME only.
+STRATEGY_TIMEFRAMES = None
+MULTI_TIMEFRAME_DAYS = 10  # 1-minute history for warm-up (Angel One max: 30)
+
 # ==================== RSI CONFIGURATION ====================
 # ==================== RSI CONFIGURATION ====================
 RSI_PERIOD = 14  # Standard RSI period
@@ -48,8 +74,18 @@ MAX_CANDLES = 7  # Maximum distance between Point A and Point B
 
 # Rule 5: Candle counting includes Point A and Point B
 
-# ==================== BOT CONFIGURATION ====================
-CHECK_INTERVAL = 60  # Check every 60 seconds (1 minute)
+# ==================== TRADE SIMULATION (BACKTEST) ====================
+# Entry at the confirmation candle's HIGH (bullish) / LOW (bearish),
+# stop at its other end, target at RISK_REWARD x risk
+SIM_ENTRY_WINDOW = 3   # Candles after confirmation allowed to trigger the entry
+SIM_MAX_HOLD = 20      # Time exit after this many candles in the trade
+SIM_RISK_REWARD = 2.0
+
+# ==================== SCREENER CONFIGURATION ====================
+# End-of-day scan of a whole universe (tests/screener.py)
+SCREENER_TIMEFRAMES = ["FIFTEEN_MINUTE", "ONE_HOUR", "ONE_DAY"]
+SCREENER_RECENT_CANDLES = 5   # Divergences confirmed within the last N candles are reported
+SCREENER_DAYS = 365           # Candle history loaded per symbol (indicator warm-up)
 
 # ==================== MARKET HOURS CONFIGURATION ====================
 # Indian market trading hours (IST)
@@ -61,15 +97,85 @@ MARKET_CLOSE_MINUTE = 30
 # Trading days
 TRADING_DAYS = [0, 1, 2, 3, 4]  # Monday to Friday (0=Monday, 6=Sunday)
 
+# ==================== CANDLE SOURCE CONFIGURATION ====================
+# Where candles come from:
+# - "angel": Angel One SmartAPI (NSE session, credentials below)
+# - "delta": Delta Exchange India crypto perpetuals (24x7, public candles, no login)
+# - "file" : CSV / Parquet files in CANDLE_FILES_DIR named <token>_<TIMEFRAME>.csv|.parquet
+#            (offline runs without credentials)
+CANDLE_SOURCE = os.getenv("CANDLE_SOURCE", "angel")
+CANDLE_FILES_DIR = os.getenv("CANDLE_FILES_DIR", "data/candles")
+
+# Keep-alive connections per HTTP session (>= concurrent fetches, else
+# connections are dropped and re-opened every cycle)
+HTTP_POOL_SIZE = SCAN_MAX_WORKERS
+
+# ==================== DELTA EXCHANGE API CONFIGURATION ====================
+DELTA_BASE_URL = os.getenv("DELTA_BASE_URL", "https://api.india.delta.exchange")
+DELTA_RATE_LIMITS = [(10, 1), (150, 60)]   # Client-side limits: (requests, per seconds)
+DELTA_MAX_CANDLES_PER_REQUEST = 2000       # history/candles page size
+DELTA_REQUEST_TIMEOUT = 10                 # Seconds
+
+# Delta resolution for each timeframe name
+DELTA_RESOLUTIONS = {
+    "ONE_MINUTE": "1m",
+    "FIVE_MINUTE": "5m",
+    "FIFTEEN_MINUTE": "15m",
+    "ONE_HOUR": "1h",
+    "ONE_DAY": "1d"
+}
+
 # ==================== ANGEL ONE API CONFIGURATION ====================
 ANGEL_API_KEY = os.getenv("ANGEL_API_KEY", "")
 ANGEL_CLIENT_ID = os.getenv("ANGEL_CLIENT_ID", "")
 ANGEL_PASSWORD = os.getenv("ANGEL_PASSWORD", "")
 ANGEL_TOTP_SECRET = os.getenv("ANGEL_TOTP_SECRET", "")
 
-# Validate required credentials
-if not all([ANGEL_API_KEY, ANGEL_CLIENT_ID, ANGEL_PASSWORD]):
-    raise ValueError("Missing Angel One credentials. Please check your .env file.")
+
+def require_angel_credentials():
+    """
+    Validate the Angel One credentials. Called only before a live session is
+    created, so offline tools (backtests on stored candles, tests) can import
+    the settings without them.
+    """
+    if not all([ANGEL_API_KEY, ANGEL_CLIENT_ID, ANGEL_PASSWORD]):
+        raise ValueError("Missing Angel One credentials. Please check your .env file.")
+
+# Session tokens are cached here so restarts skip the TOTP login
+ENABLE_SESSION_CACHE = True
+SESSION_CACHE_PATH = "data/session.json"
+
+# Client-side limits for getCandleData: (requests, per seconds)
+ANGEL_HISTORICAL_RATE_LIMITS = [(3, 1), (180, 60)]
+
+# Longest date range (days) a single getCandleData request may span
+ANGEL_MAX_DAYS_PER_REQUEST = {
+    "ONE_MINUTE": 30,
+    "THREE_MINUTE": 60,
+    "FIVE_MINUTE": 100,
+    "TEN_MINUTE": 100,
+    "FIFTEEN_MINUTE": 200,
+    "THIRTY_MINUTE": 200,
+    "ONE_HOUR": 400,
+    "ONE_DAY": 2000
+}
+HISTORY_DOWNLOAD_WORKERS = 3  # Concurrent windows in a long-history download
+
+# ==================== LIVE FEED CONFIGURATION ====================
+# Build candles from WebSocket ticks instead of polling REST at each close
+ENABLE_LIVE_FEED = False
+LIVE_FEED_RECORD_PATH = None  # e.g. "data/ticks.jsonl" to record ticks for replay
+
+# ==================== CHECKPOINT CONFIGURATION ====================
+# Indicator / strategy state and alert dedup keys, saved after every cycle
+# so a restart resumes without rebuilding state or repeating alerts
+ENABLE_CHECKPOINT = True
+CHECKPOINT_PATH = "data/checkpoint.pkl"
+
+# ==================== CANDLE STORE CONFIGURATION ====================
+# Local SQLite cache of fetched candles (only new candles are downloaded)
+ENABLE_CANDLE_STORE = True
+CANDLE_STORE_PATH = "data/candles.sqlite3"
 
 # ==================== TELEGRAM CONFIGURATION ====================
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
@@ -80,5 +186,10 @@ ENABLE_TELEGRAM_ALERTS = bool(TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID)
 LOG_LEVEL = "INFO"  # INFO, DEBUG, WARNING, ERROR
 LOG_FILE = "logs/rsi_divergence.log"
 
+# Stage latency metrics (wait / fetch / indicators / strategy / alert and
+# candle close → alert lag) with rolling p50/p95/p99
+METRICS_FORMAT = "jsonl"  # "jsonl" (one line per cycle), "prometheus" (textfile collector) or None
+METRICS_PATH = "logs/metrics.jsonl"  # e.g. "/var/lib/node_exporter/rsi_bot.prom" for prometheus
+
 # ==================== DISPLAY SETTINGS ====================
 SHOW_DETAILED_LOGS = True  # Show detailed signal information
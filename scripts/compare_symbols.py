@@ -1,15 +1,19 @@
-from delta_api_helper import DeltaApiHelper
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.delta_api_helper import DeltaApiHelper
 import pandas as pd
 
 api = DeltaApiHelper()
 
-target_time = "2026-01-21 06:45:00+00:00"
+target_time = pd.Timestamp("2026-01-21 06:45:00+00:00")
 
 for sym in ["BTCUSD", "BTC-USDT", "BTC_USDT", "BTC-PERP"]:
     print(f"\nScanning {sym}...")
-    df = api.fetch_candles(sym, "15m")
+    df = api.fetch_candles(sym, "DELTA", "15m")
     if df is not None:
-        row = df[df['time'].astype(str) == target_time]
+        row = df[df['time'] == target_time]
         if not row.empty:
             print(f"Data for {target_time}:")
             print(row[['time', 'open', 'high', 'low', 'close']].to_string(index=False))
@@ -1,17 +1,23 @@
-from delta_api_helper import DeltaApiHelper
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.delta_api_helper import DeltaApiHelper
 import pandas as pd
 
 api = DeltaApiHelper()
-df = api.fetch_candles("BTCUSD", "15m")
+df = api.fetch_candles("BTCUSD", "DELTA", "15m")
 
 # Target Time
-target = "2026-01-21 06:45:00+00:00"
+target = pd.Timestamp("2026-01-21 06:45:00+00:00")
 
-row = df[df['time'].astype(str) == target]
+row = df[df['time'] == target] if df is not None else pd.DataFrame()
 
 if not row.empty:
     print(f"✅ Found Data for {target}:")
     print(f"Close Price: {row['close'].values[0]}")
     print(row[['time', 'open', 'high', 'low', 'close', 'volume']])
+elif df is None or df.empty:
+    print("❌ Failed to fetch candles.")
 else:
     print(f"❌ No data found for {target}. Data range: {df['time'].min()} to {df['time'].max()}")
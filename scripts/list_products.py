@@ -1,15 +1,15 @@
-import requests
-import json
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-url = "https://api.india.delta.exchange/v2/products"
-response = requests.get(url)
-data = response.json()
+from utils.delta_api_helper import DeltaApiHelper
 
-if "result" in data:
-    for p in data["result"]:
+products = DeltaApiHelper().products(["perpetual_futures", "futures"])
+
+if products is not None:
+    for p in products:
         # Filter for relevant symbols
-        c_type = p.get('contract_type')
-        if "BTC" in p["symbol"] and c_type in ["perpetual_futures", "futures"]:
-             print(f"Symbol: {p['symbol']}, Type: {c_type}, Quote: {p.get('quote_currency')}")
+        if "BTC" in p["symbol"]:
+             print(f"Symbol: {p['symbol']}, Type: {p['contract_type']}, Quote: {p.get('quote_currency')}")
 else:
     print("Failed to fetch products.")
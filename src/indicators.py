@@ -0,0 +1,280 @@
+"""
+Incremental Indicator Engine
+O(1)-per-candle RSI and Bollinger Bands that reproduce pandas_ta values
+
+Tolerance vs pandas_ta (native pandas path, i.e. without TA-Lib):
+- RSI  : within 1e-8 RSI points
+- BB   : within 1e-6 price units (sums are resynchronised periodically
+         to stop floating-point drift on long streams)
+"""
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Rolling sums are rebuilt from the window after this many updates
+BB_RESYNC_EVERY = 1000
+
+
+def rsi(close, length):
+    """
+    Batch RSI over a whole series (same values as IncrementalRSI / pandas_ta).
+    """
+    close = pd.Series(np.asarray(close, dtype=float))
+    change = close.diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / length, min_periods=length).mean()
+    loss = (-change).clip(lower=0).ewm(alpha=1 / length, min_periods=length).mean()
+    return (100 * gain / (gain + loss)).to_numpy()
+
+
+def bollinger_bands(close, length, std):
+    """
+    Batch Bollinger Bands (SMA +/- std * population std).
+
+    Returns:
+    --------
+    (numpy.ndarray, numpy.ndarray)
+        lower, upper
+    """
+    close = pd.Series(np.asarray(close, dtype=float))
+    rolling = close.rolling(length)
+    mid = rolling.mean().to_numpy()
+    deviation = std * rolling.std(ddof=0).to_numpy()
+    return mid - deviation, mid + deviation
+
+
+def rsi_panel(closes, length):
+    """
+    Wilder RSI for every row of a (symbols, candles) close matrix at once.
+
+    Rows may be NaN-padded (ragged histories); each row gives the same values
+    as rsi() on its non-NaN closes, NaN at padded positions. The time loop
+    runs once for all symbols: the state per row is the same pair of
+    recursive sums as IncrementalRSI.
+    """
+    closes = np.atleast_2d(np.asarray(closes, dtype=float))
+    symbols, candles = closes.shape
+    decay = 1.0 - 1.0 / length
+    change = np.full_like(closes, np.nan)
+    change[:, 1:] = closes[:, 1:] - closes[:, :-1]
+    valid = ~np.isnan(change)
+    gains = np.where(valid, np.maximum(change, 0.0), 0.0)
+    losses = np.where(valid, np.maximum(-change, 0.0), 0.0)
+    counts = np.cumsum(valid, axis=1)
+
+    # Time-major copies so every step reads / writes one contiguous row
+    gains = np.ascontiguousarray(gains.T)
+    losses = np.ascontiguousarray(losses.T)
+    gain_sum = np.zeros(symbols)
+    loss_sum = np.zeros(symbols)
+    for t in range(candles):
+        # Decaying over gaps matches ewm(ignore_na=False); rows that have not
+        # started yet stay at zero
+        gain_sum *= decay
+        gain_sum += gains[t]
+        gains[t] = gain_sum
+        loss_sum *= decay
+        loss_sum += losses[t]
+        losses[t] = loss_sum
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = (100.0 * gains / (gains + losses)).T
+    result[(counts < length) | np.isnan(closes)] = np.nan
+    return result
+
+
+def bollinger_panel(closes, length, std):
+    """
+    Bollinger Bands for every row of a (symbols, candles) close matrix.
+
+    Windows are summed as `length` shifted slices (two-pass mean / variance,
+    no running sums to drift), so rows match bollinger_bands(); a window that
+    touches NaN padding is NaN.
+
+    Returns:
+    --------
+    (numpy.ndarray, numpy.ndarray)
+        lower, upper with the shape of closes
+    """
+    closes = np.atleast_2d(np.asarray(closes, dtype=float))
+    lower = np.full_like(closes, np.nan)
+    upper = np.full_like(closes, np.nan)
+    width = closes.shape[1] - length + 1
+    if width <= 0:
+        return lower, upper
+
+    windows = [closes[:, k:k + width] for k in range(length)]
+    mean = windows[0].copy()
+    for w in windows[1:]:
+        mean += w
+    mean /= length
+    variance = np.zeros_like(mean)
+    scratch = np.empty_like(mean)
+    for w in windows:
+        np.subtract(w, mean, out=scratch)
+        scratch *= scratch
+        variance += scratch
+    variance /= length
+    deviation = std * np.sqrt(variance)
+    lower[:, length - 1:] = mean - deviation
+    upper[:, length - 1:] = mean + deviation
+    return lower, upper
+
+
+class IncrementalRSI:
+    """
+    RSI with Wilder smoothing, updated one close at a time.
+
+    pandas_ta smooths gains/losses with rma = ewm(alpha=1/length, adjust=True,
+    min_periods=length). The adjusted EWM divides a decayed sum by the same
+    decayed weight sum for gains and losses, so the weight cancels in
+    gain / (gain + loss) and the state is just (gain sum, loss sum, count,
+    last close).
+    """
+
+    def __init__(self, length=None):
+        if length is None:
+            from config.settings import RSI_PERIOD
+            length = RSI_PERIOD
+        self.length = length
+        self.decay = 1.0 - 1.0 / length
+        self._state = (0.0, 0.0, 0, None)
+        self._previous = self._state
+
+    def update(self, close, replace=False):
+        """
+        Add one close and return the RSI (NaN until warmed up).
+        With replace=True the last close is revised instead of appended.
+        """
+        if replace:
+            self._state = self._previous
+        self._previous = self._state
+
+        gain_sum, loss_sum, count, last_close = self._state
+        if last_close is not None:
+            change = close - last_close
+            gain_sum = self.decay * gain_sum + max(change, 0.0)
+            loss_sum = self.decay * loss_sum + max(-change, 0.0)
+            count += 1
+        self._state = (gain_sum, loss_sum, count, close)
+
+        if count < self.length:
+            return math.nan
+        total = gain_sum + loss_sum
+        if total == 0:
+            return math.nan  # pandas_ta gives 0/0 for a flat series
+        return 100.0 * gain_sum / total
+
+    def warm_up(self, closes):
+        """Feed a historical batch and return the RSI for every close"""
+        return np.array([self.update(float(x)) for x in closes])
+
+
+class IncrementalBollinger:
+    """
+    Bollinger Bands (SMA +/- k * population std) from rolling sum and
+    sum of squares over the last `length` closes.
+    """
+
+    def __init__(self, length=None, std=None):
+        if length is None or std is None:
+            from config.settings import BB_PERIOD, BB_STD_DEV
+            length = BB_PERIOD if length is None else length
+            std = BB_STD_DEV if std is None else std
+        self.length = length
+        self.std = std
+        self.window = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._updates = 0
+
+    def update(self, close, replace=False):
+        """
+        Add one close and return (lower, upper), NaN until warmed up.
+        With replace=True the last close is revised instead of appended.
+        """
+        if replace and self.window:
+            old = self.window.pop()
+            self.total -= old
+            self.total_sq -= old * old
+        elif len(self.window) == self.length:
+            old = self.window.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+
+        self.window.append(close)
+        self.total += close
+        self.total_sq += close * close
+
+        self._updates += 1
+        if self._updates % BB_RESYNC_EVERY == 0:
+            self.total = math.fsum(self.window)
+            self.total_sq = math.fsum(x * x for x in self.window)
+
+        if len(self.window) < self.length:
+            return math.nan, math.nan
+
+        mean = self.total / self.length
+        variance = max(self.total_sq / self.length - mean * mean, 0.0)
+        deviation = self.std * math.sqrt(variance)
+        return mean - deviation, mean + deviation
+
+    def warm_up(self, closes):
+        """Feed a historical batch and return (lower, upper) arrays"""
+        bands = np.array([self.update(float(x)) for x in closes]).reshape(-1, 2)
+        return bands[:, 0], bands[:, 1]
+
+
+class IndicatorEngine:
+    """
+    RSI + Bollinger Bands state for one instrument.
+
+    Warm up once from a historical batch, then push each new candle.
+    A candle with the same time as the newest one revises it in place.
+    """
+
+    def __init__(self, rsi_period=None, bb_period=None, bb_std=None):
+        self.rsi = IncrementalRSI(rsi_period)
+        self.bb = IncrementalBollinger(bb_period, bb_std)
+        self.last_time = None
+
+    def update(self, time, close):
+        """
+        Push one candle close.
+
+        Returns:
+        --------
+        dict
+            {"rsi": ..., "BBL": ..., "BBU": ...}
+        """
+        replace = self.last_time is not None and time == self.last_time
+        close = float(close)
+        rsi = self.rsi.update(close, replace=replace)
+        lower, upper = self.bb.update(close, replace=replace)
+        self.last_time = time
+        return {"rsi": rsi, "BBL": lower, "BBU": upper}
+
+    def warm_up(self, df):
+        """
+        Feed a historical batch and add rsi/BBL/BBU columns to df (in place).
+        """
+        values = [self.update(t, c) for t, c in zip(df['time'], df['close'])]
+        df['rsi'] = [v['rsi'] for v in values]
+        df['BBL'] = [v['BBL'] for v in values]
+        df['BBU'] = [v['BBU'] for v in values]
+        return df
+
+    def apply(self, df):
+        """
+        Process only the candles of df not older than the newest one seen.
+
+        Returns:
+        --------
+        pandas.DataFrame
+            The processed rows (a copy) with rsi/BBL/BBU columns. On the first
+            call this is the whole frame.
+        """
+        if self.last_time is not None:
+            df = df[df['time'] >= self.last_time]
+        return self.warm_up(df.copy())
@@ -1,13 +1,11 @@
 """
 RSI Divergence Trading Bot - Main Entry Point
-Angel One / Nifty 50 Edition
+Angel One / Nifty 50 Edition (other markets through CANDLE_SOURCE)
 """
 
 import sys
 import os
 import time
-import pandas as pd
-import pandas_ta as ta
 from logzero import logger
 from datetime import datetime, timedelta, timezone
 
@@ -18,111 +16,308 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import (
     SYMBOL,
-    SYMBOL_TOKEN,
-    EXCHANGE,
     TIMEFRAME,
-    RSI_PERIOD,
-    MIN_CANDLES,
-    MAX_CANDLES,
-    ANGEL_API_KEY,
-    ANGEL_CLIENT_ID,
-    ANGEL_PASSWORD,
-    ANGEL_TOTP_SECRET,
-    BB_PERIOD,
-    BB_STD_DEV,
-    ENABLE_TELEGRAM_ALERTS
+    ENABLE_TELEGRAM_ALERTS,
+    TIMEFRAME_MINUTES,
+    ENABLE_CANDLE_STORE,
+    CANDLE_STORE_PATH,
+    ENABLE_SESSION_CACHE,
+    SESSION_CACHE_PATH,
+    ENABLE_LIVE_FEED,
+    LIVE_FEED_RECORD_PATH,
+    STRATEGY_TIMEFRAMES,
+    MULTI_TIMEFRAME_DAYS,
+    METRICS_FORMAT,
+    METRICS_PATH,
+    ENABLE_CHECKPOINT,
+    CHECKPOINT_PATH
 )
 
-from utils.api_helpers import AngelOneApiHelper
-from src.strategy import check_divergence
-from utils.telegram_helper import send_telegram_alert
+from utils.candle_source import open_candle_source
+from utils.candle_store import CandleStore
+from utils.session_cache import SessionCache
+from src.scanner import WatchlistScanner, load_watchlist
+from utils.telegram_helper import dispatch_alert, get_alert_dispatcher
+from utils.metrics import get_metrics
+from utils.checkpoint import Checkpoint
+from utils.scheduler import CandleCloseScheduler
 
 # ================= CONSTANTS =================
 
 CANDLE_BUFFER_SECONDS = 15
 
-TIMEFRAME_MINUTES = {
-    "ONE_MINUTE": 1,
-    "FIVE_MINUTE": 5,
-    "FIFTEEN_MINUTE": 15,
-    "ONE_HOUR": 60,
-    "ONE_DAY": 1440
-}
+# ================= CHECKPOINT =================
 
-# ================= TIME HELPERS =================
+def restore_checkpoint(scanner, checkpoint):
+    if checkpoint is None:
+        return
+    # Older state cannot be continued from the fetched history window
+    state = checkpoint.load(scanner.fingerprint(), max_age=(scanner.days - 1) * 86400)
+    if state:
+        restored = scanner.restore(state)
+        logger.info(f"[CHECKPOINT] Restored state for {restored} symbol(s)")
 
-def now_ist():
-    return datetime.now(timezone.utc) + timedelta(hours=5, minutes=30)
 
+def save_checkpoint(scanner, checkpoint):
+    if checkpoint is None:
+        return
+    try:
+        checkpoint.save(scanner.snapshot(), scanner.fingerprint())
+    except Exception as e:
+        logger.warning(f"[CHECKPOINT] Could not save checkpoint: {e}")
 
-def next_market_open_ist():
-    now = now_ist()
 
-    # Weekend handling
-    if now.weekday() >= 5:
-        days_ahead = 7 - now.weekday()
-        now += timedelta(days=days_ahead)
+# ================= METRICS =================
 
-    market_open = now.replace(hour=9, minute=15, second=0, microsecond=0)
+def record_alert_lag(signal, timeframe, now=None):
+    """Seconds from the confirmation candle's close to its alert"""
+    candle_close = signal['confirmation_time'] + timedelta(minutes=TIMEFRAME_MINUTES.get(timeframe, 5))
+    lag = ((now or datetime.now(timezone.utc)) - candle_close).total_seconds()
+    get_metrics().observe("candle_to_alert", lag)
+    return lag
 
-    # If past market close today → next day
-    if now.time() >= datetime.strptime("15:30", "%H:%M").time():
-        market_open += timedelta(days=1)
 
-    # Skip weekends
-    while market_open.weekday() >= 5:
-        market_open += timedelta(days=1)
+def export_metrics(**fields):
+    if not METRICS_FORMAT:
+        return
+    try:
+        get_metrics().export(METRICS_PATH, METRICS_FORMAT, **fields)
+    except OSError as e:
+        logger.warning(f"[METRICS] Could not write metrics: {e}")
 
-    return market_open
 
+def log_cycle_metrics():
+    latency = get_metrics().snapshot()["latency"]
+    parts = [
+        f"{name}={latency[name]['last']:.2f}s (p95 {latency[name]['p95']:.2f}s)"
+        for name in ("wait", "wakeup_late", "fetch", "indicators", "strategy", "alert", "candle_to_alert")
+        if name in latency
+    ]
+    logger.info("[METRICS] " + " | ".join(parts))
 
-def get_next_candle_close_time():
-    now = now_ist()
-    interval = TIMEFRAME_MINUTES.get(TIMEFRAME, 5)
 
-    next_minute = ((now.minute // interval) + 1) * interval
+# ================= ALERTS =================
 
-    if next_minute >= 60:
-        next_minute %= 60
-        return now.replace(minute=next_minute, second=0, microsecond=0) + timedelta(hours=1)
+def report_result(result, send=None, now=None):
+    symbol = result["item"]["symbol"]
+    timeframe = result["timeframe"]
+    logger.info(
+        f"[SCAN] {symbol} {timeframe} | Price={result['price']:.2f} | "
+        f"RSI={result['rsi']:.2f} | Candle={result['time'].strftime('%H:%M')}"
+    )
+
+    if result["signal"]:
+        report_signal(symbol, result["signal"], timeframe, send, now)
 
-    return now.replace(minute=next_minute, second=0, microsecond=0)
 
+def report_signal(symbol, signal, timeframe=TIMEFRAME, send=None, now=None):
+    """
+    Log a signal and send its alert through `send` (default: the Telegram
+    dispatcher when alerts are enabled). `now` overrides the clock used for
+    the candle-to-alert latency (replay mode).
+    """
+    logger.info("=" * 80)
+    logger.info(f"[SIGNAL] {symbol} {timeframe} {signal['type']} DIVERGENCE")
+    logger.info(f"Strength : {signal['strength']}")
+    logger.info(f"Pattern  : {signal['pattern']}")
+    logger.info(
+        f"Price    : {signal['p1_price']:.2f} → {signal['p2_price']:.2f}"
+    )
+    logger.info(
+        f"RSI      : {signal['p1_rsi']:.2f} → {signal['p2_rsi']:.2f}"
+    )
+    logger.info(
+        f"Time     : {signal['confirmation_time'].strftime('%Y-%m-%d %H:%M')}"
+    )
+    logger.info("=" * 80)
 
-def wait_for_candle_close():
-    next_close = get_next_candle_close_time()
-    wait_until = next_close + timedelta(seconds=CANDLE_BUFFER_SECONDS)
-    wait_seconds = (wait_until - now_ist()).total_seconds()
+    lag = record_alert_lag(signal, timeframe, now)
+    logger.info(f"[LATENCY] Candle close → alert: {lag:.1f}s")
+
+    if send is None and ENABLE_TELEGRAM_ALERTS:
+        send = dispatch_alert  # queued; never blocks the scan loop
+    if send:
+        emoji = "🟢" if signal['type'] == "BULLISH" else "🔴"
+        msg = (
+            f"{emoji} <b>{signal['type']} RSI DIVERGENCE</b>\n\n"
+            f"<b>Symbol:</b> {symbol}\n"
+            f"<b>TF:</b> {timeframe}\n"
+            f"<b>Time:</b> {signal['confirmation_time'].strftime('%H:%M')}\n"
+            f"<b>Strength:</b> {signal['strength']}\n"
+            f"<b>Pattern:</b> {signal['pattern']}\n"
+            f"<b>Price:</b> {signal['p1_price']:.2f} → {signal['p2_price']:.2f}\n"
+            f"<b>RSI:</b> {signal['p1_rsi']:.2f} → {signal['p2_rsi']:.2f}"
+        )
+        send(msg)
+
+
+# ================= POLLING CYCLE =================
+
+def run_cycle(api, scanner, scheduler, checkpoint=None, send=None, clock=None, export=True):
+    """
+    One polling cycle: wait for the next candle close, scan the watchlist and
+    report the results. `clock` / `send` are swapped in by replay mode.
+
+    Returns:
+    --------
+    list of dict
+        scan_cycle results
+    """
+    metrics = get_metrics()
+
+    # ===== WAIT FOR CANDLE CLOSE (skips nights / weekends) =====
+    with metrics.span("wait"):
+        close_time, closed, late = scheduler.wait()
 
-    if wait_seconds <= 0:
-        return True
+    logger.info(
+        f"[FETCH] {', '.join(closed)} closed at {close_time.strftime('%H:%M')} | "
+        f"Woke {late:.2f}s late. Fetching candle data..."
+    )
 
-    # Safety guard
-    if wait_seconds > 300:
-        logger.warning("[WAIT] Abnormal candle wait skipped")
-        return False
+    # ===== FETCH + INDICATORS + STRATEGY (all symbols) =====
+    retries_before = metrics.counters.get("fetch_retries", 0)
+    results = scanner.scan_cycle()
+    retries = metrics.counters.get("fetch_retries", 0) - retries_before
 
+    rate = api.rate_limiter.snapshot()
     logger.info(
-        f"[WAIT] Next candle close at {next_close.strftime('%H:%M:%S')} | "
-        f"Sleeping {int(wait_seconds)}s"
+        f"[RATE] Requests={rate['requests']} | Queued={rate['queued']} | "
+        f"Throttled={rate['throttled']} | Retries={retries} | Waited={rate['wait_seconds']:.1f}s"
     )
-    time.sleep(wait_seconds)
-    return True
+
+    with metrics.span("alert"):
+        now = clock.now() if clock else None
+        for result in results:
+            report_result(result, send, now)
+
+    save_checkpoint(scanner, checkpoint)
+    log_cycle_metrics()
+    if export:
+        export_metrics(
+            cycle_seconds=scanner.last_cycle_seconds,
+            retries=retries,
+            symbols=len({r["item"]["token"] for r in results}),
+            signals=sum(1 for r in results if r["signal"])
+        )
+
+    if send is None and ENABLE_TELEGRAM_ALERTS:
+        alerts = get_alert_dispatcher().stats()
+        logger.info(
+            f"[ALERTS] Sent={alerts['sent']} | Pending={alerts['pending']} | "
+            f"Dropped={alerts['dropped']} | Failed={alerts['failed']} | "
+            f"Latency p50={alerts.get('latency_p50', 0):.2f}s"
+        )
+
+    return results
+
+
+# ================= LIVE FEED MODE =================
+
+def run_live_feed(api, scanner, checkpoint=None):
+    """
+    Scan candles built from WebSocket ticks as soon as they close.
+    Indicator/strategy state is warmed up once from REST history; a signal
+    on the last closed candle of that history is alerted like any other.
+    """
+    from utils.live_feed import LiveFeed
+
+    logger.info("[FEED] Warming up from historical candles...")
+    for result in scanner.scan_cycle():
+        report_result(result)
+
+    feed = LiveFeed(
+        api,
+        scanner.watchlist,
+        TIMEFRAME_MINUTES.get(scanner.fetch_timeframe, 5),
+        record_path=LIVE_FEED_RECORD_PATH
+    )
+    feed.start()
+    metrics = get_metrics()
+    last_export = time.monotonic()
+
+    try:
+        while True:
+            token, candle = feed.candles.get()
+            results = scanner.on_candle(token, candle)
+            with metrics.span("alert"):
+                for result in results:
+                    report_result(result)
+
+            if time.monotonic() - last_export >= 60:
+                export_metrics(mode="live_feed")
+                save_checkpoint(scanner, checkpoint)
+                last_export = time.monotonic()
+
+    except KeyboardInterrupt:
+        logger.info("[STOP] Bot stopped manually")
+    finally:
+        feed.stop()
+        save_checkpoint(scanner, checkpoint)
+        if ENABLE_TELEGRAM_ALERTS:
+            get_alert_dispatcher().stop()
+
+
+# ================= REPLAY MODE =================
+
+def run_replay(api, scanner, clock, end):
+    """
+    Drive run_cycle over recorded candles on a virtual clock
+    (api = utils.replay.ReplayApiHelper, clock = its ReplayClock).
+
+    Returns:
+    --------
+    dict
+        cycles, candles, seconds (wall time), cycles_per_second,
+        candles_per_second, alerts (results with a signal) and
+        messages (alert texts that would have been sent)
+    """
+    scheduler = CandleCloseScheduler(
+        scanner.timeframes, CANDLE_BUFFER_SECONDS,
+        now=clock.now, monotonic=clock.monotonic, sleep=clock.sleep, session=api.session
+    )
+    alerts, messages = [], []
+    cycles = candles = 0
+    started = time.perf_counter()
+
+    while scheduler.next_event()[0] <= end:
+        results = run_cycle(api, scanner, scheduler, send=messages.append, clock=clock, export=False)
+        cycles += 1
+        candles += len(results)
+        alerts.extend(r for r in results if r["signal"])
+
+    seconds = time.perf_counter() - started
+    return {
+        "cycles": cycles,
+        "candles": candles,
+        "seconds": seconds,
+        "cycles_per_second": cycles / seconds if seconds else 0.0,
+        "candles_per_second": candles / seconds if seconds else 0.0,
+        "alerts": alerts,
+        "messages": messages,
+    }
 
 
 # ================= MAIN =================
 
+def build_scanner(api, watchlist=None):
+    """Watchlist scanner configured from settings"""
+    return WatchlistScanner(
+        api, watchlist or load_watchlist(), timeframe=TIMEFRAME, timeframes=STRATEGY_TIMEFRAMES,
+        days=MULTI_TIMEFRAME_DAYS if STRATEGY_TIMEFRAMES else 5
+    )
+
+
 def main():
     logger.info("=" * 80)
-    logger.info("RSI Divergence Bot - Angel One / Nifty 50")
+    logger.info(f"RSI Divergence Bot - {SYMBOL}")
     logger.info("=" * 80)
 
-    api = AngelOneApiHelper(
-        api_key=ANGEL_API_KEY,
-        client_id=ANGEL_CLIENT_ID,
-        password=ANGEL_PASSWORD,
-        totp_secret=ANGEL_TOTP_SECRET
+    # Credentials are only required by the Angel One source
+    api = open_candle_source(
+        candle_store=CandleStore(CANDLE_STORE_PATH) if ENABLE_CANDLE_STORE else None,
+        session_cache=SessionCache(SESSION_CACHE_PATH) if ENABLE_SESSION_CACHE else None
     )
+    logger.info(f"[SOURCE] Candles from '{api.name}'")
 
     logger.info("[LOGIN] Logging in...")
     if not api.login():
@@ -132,101 +327,28 @@ def main():
     logger.info("[SUCCESS] Logged in successfully")
     logger.info("-" * 80)
 
-    last_signal_time = None
+    scanner = build_scanner(api)
+    logger.info(f"[WATCHLIST] {len(scanner.watchlist)} symbol(s) | Workers={scanner.max_workers}")
+
+    checkpoint = Checkpoint(CHECKPOINT_PATH) if ENABLE_CHECKPOINT else None
+    restore_checkpoint(scanner, checkpoint)
+
+    if ENABLE_LIVE_FEED and api.tick_feed:
+        run_live_feed(api, scanner, checkpoint)
+        return
+    if ENABLE_LIVE_FEED:
+        logger.warning(f"[FEED] No tick feed for '{api.name}' candles. Polling on candle close")
+
+    scheduler = CandleCloseScheduler(scanner.timeframes, CANDLE_BUFFER_SECONDS, session=api.session)
 
     while True:
         try:
-            # ===== MARKET CLOSED → WAIT TILL OPEN =====
-            if not api.is_market_open():
-                next_open = next_market_open_ist()
-                sleep_seconds = (next_open - now_ist()).total_seconds()
-                sleep_seconds = max(sleep_seconds, 60)
-
-                logger.info(
-                    f"[MARKET] Closed. Sleeping until "
-                    f"{next_open.strftime('%Y-%m-%d %H:%M')} IST"
-                )
-                time.sleep(sleep_seconds)
-                continue
-
-            # ===== WAIT FOR CANDLE CLOSE =====
-            if not wait_for_candle_close():
-                continue
-
-            logger.info("[FETCH] Fetching candle data...")
-
-            df = api.fetch_candles(
-                symbol_token=SYMBOL_TOKEN,
-                exchange=EXCHANGE,
-                timeframe=TIMEFRAME,
-                days=5
-            )
-
-            if df is None or df.empty:
-                logger.warning("[WARNING] No candle data received")
-                continue
-
-            # ===== UTC → IST =====
-            df['time'] = pd.to_datetime(df['time']) + timedelta(hours=5, minutes=30)
-
-            # ===== INDICATORS =====
-            df['rsi'] = ta.rsi(df['close'], length=RSI_PERIOD)
-
-            bb = ta.bbands(df['close'], length=BB_PERIOD, std=BB_STD_DEV)
-            if bb is not None:
-                df['BBL'] = bb[[c for c in bb.columns if c.startswith("BBL")][0]]
-                df['BBU'] = bb[[c for c in bb.columns if c.startswith("BBU")][0]]
-
-            # ===== STRATEGY =====
-            signal = check_divergence(df)
-
-            last_price = df['close'].iloc[-1]
-            last_rsi = df['rsi'].iloc[-1]
-            last_time = df['time'].iloc[-1]
-
-            logger.info(
-                f"[SCAN] {SYMBOL} | Price={last_price:.2f} | "
-                f"RSI={last_rsi:.2f} | Candle={last_time.strftime('%H:%M')}"
-            )
-
-            if signal:
-                if last_signal_time == signal['confirmation_time']:
-                    logger.info("[SKIP] Duplicate signal ignored")
-                    continue
-
-                last_signal_time = signal['confirmation_time']
-
-                logger.info("=" * 80)
-                logger.info(f"[SIGNAL] {signal['type']} DIVERGENCE")
-                logger.info(f"Strength : {signal['strength']}")
-                logger.info(f"Pattern  : {signal['pattern']}")
-                logger.info(
-                    f"Price    : {signal['p1_price']:.2f} → {signal['p2_price']:.2f}"
-                )
-                logger.info(
-                    f"RSI      : {signal['p1_rsi']:.2f} → {signal['p2_rsi']:.2f}"
-                )
-                logger.info(
-                    f"Time     : {signal['confirmation_time'].strftime('%Y-%m-%d %H:%M')}"
-                )
-                logger.info("=" * 80)
-
-                if ENABLE_TELEGRAM_ALERTS:
-                    emoji = "🟢" if signal['type'] == "BULLISH" else "🔴"
-                    msg = (
-                        f"{emoji} <b>{signal['type']} RSI DIVERGENCE</b>\n\n"
-                        f"<b>Symbol:</b> {SYMBOL}\n"
-                        f"<b>TF:</b> {TIMEFRAME}\n"
-                        f"<b>Time:</b> {signal['confirmation_time'].strftime('%H:%M')}\n"
-                        f"<b>Strength:</b> {signal['strength']}\n"
-                        f"<b>Pattern:</b> {signal['pattern']}\n"
-                        f"<b>Price:</b> {signal['p1_price']:.2f} → {signal['p2_price']:.2f}\n"
-                        f"<b>RSI:</b> {signal['p1_rsi']:.2f} → {signal['p2_rsi']:.2f}"
-                    )
-                    send_telegram_alert(msg)
+            run_cycle(api, scanner, scheduler, checkpoint)
 
         except KeyboardInterrupt:
             logger.info("[STOP] Bot stopped manually")
+            if ENABLE_TELEGRAM_ALERTS:
+                get_alert_dispatcher().stop()
             break
         except Exception as e:
             logger.error(f"[ERROR] {e}")
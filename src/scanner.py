@@ -0,0 +1,297 @@
+"""
+Watchlist Scanner
+Fetches and scans every watchlist symbol concurrently on each candle close
+"""
+import csv
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, timezone
+
+from logzero import logger
+
+from src.indicators import IndicatorEngine
+from src.strategy import DivergenceDetector
+from src.timeframes import MultiTimeframeEngine
+from utils.candle_store import to_ist
+from utils.metrics import get_metrics
+
+# Base stream that multi-timeframe mode rolls up
+BASE_TIMEFRAME = "ONE_MINUTE"
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def load_watchlist(path=None):
+    """
+    Load the watchlist.
+
+    The file is a CSV with columns: symbol, token, exchange. Rows without a
+    token are resolved by symbol through the instrument master. Without a
+    file the bot watches the single SYMBOL / SYMBOL_TOKEN from settings.
+
+    Returns:
+    --------
+    list of dict
+        [{"symbol": ..., "token": ..., "exchange": ...}, ...]
+    """
+    from config.settings import SYMBOL, SYMBOL_TOKEN, EXCHANGE, WATCHLIST_FILE
+
+    path = path or WATCHLIST_FILE
+    if not path or not os.path.exists(path):
+        return [{"symbol": SYMBOL, "token": SYMBOL_TOKEN, "exchange": EXCHANGE}]
+
+    watchlist = []
+    master = None
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            symbol = (row.get("symbol") or "").strip()
+            exchange = (row.get("exchange") or EXCHANGE).strip()
+            token = (row.get("token") or "").strip()
+            if not token:
+                if not symbol:
+                    continue
+                if master is None:
+                    master = open_instrument_master()
+                instrument = master.by_symbol(symbol, exchange)
+                if instrument is None:
+                    logger.warning(f"[WATCHLIST] Unknown symbol {symbol} ({exchange}) skipped")
+                    continue
+                token = instrument["token"]
+            watchlist.append({"symbol": symbol or token, "token": token, "exchange": exchange})
+    return watchlist
+
+
+def open_instrument_master():
+    """Instrument master index from settings (built from the local master file if stale)"""
+    from config.settings import INSTRUMENT_MASTER_PATH, INSTRUMENT_INDEX_PATH
+    from utils.instrument_master import InstrumentMaster
+    return InstrumentMaster(INSTRUMENT_INDEX_PATH, INSTRUMENT_MASTER_PATH)
+
+
+class SymbolState:
+    """Per-symbol streaming state kept between scan cycles"""
+
+    def __init__(self):
+        self.indicators = IndicatorEngine()
+        self.detector = DivergenceDetector()
+        self.last_signal_time = None
+
+
+class WatchlistScanner:
+    """
+    Runs fetch → indicators → strategy for every watchlist symbol through a
+    bounded thread pool (the work is dominated by network I/O).
+
+    With `timeframes` set, only 1-minute candles are fetched (or received) and
+    rolled up into every listed timeframe; the strategy runs on each timeframe
+    as its candles close.
+    """
+
+    def __init__(self, api, watchlist, timeframe=None, max_workers=None, days=5,
+                 timeframes=None, metrics=None):
+        from config.settings import TIMEFRAME, SCAN_MAX_WORKERS
+
+        self.api = api
+        self.metrics = metrics or get_metrics()
+        self.watchlist = watchlist
+        self.timeframe = timeframe or TIMEFRAME
+        self.days = days
+        self.max_workers = max(1, min(max_workers or SCAN_MAX_WORKERS, len(watchlist)))
+        self.timeframes = list(timeframes) if timeframes else [self.timeframe]
+        self.rollups = None
+        if timeframes:
+            self.rollups = {item["token"]: MultiTimeframeEngine(self.timeframes) for item in watchlist}
+        self.states = {
+            item["token"]: {tf: SymbolState() for tf in self.timeframes} for item in watchlist
+        }
+        self._items = {item["token"]: item for item in watchlist}
+        self.last_cycle_seconds = None
+
+    @property
+    def fetch_timeframe(self):
+        """Interval actually requested from the API"""
+        return BASE_TIMEFRAME if self.rollups else self.timeframe
+
+    def scan_symbol(self, item):
+        """
+        Fetch and scan one symbol.
+
+        Returns:
+        --------
+        list of dict
+            One {"item", "timeframe", "signal", "price", "rsi", "time"} per
+            timeframe that has a new candle; signal is None when nothing (new)
+            fired. Returns None when no candle data was received.
+        """
+        with self.metrics.span("fetch"):
+            df = self.api.fetch_candles(
+                symbol_token=item["token"],
+                exchange=item["exchange"],
+                timeframe=self.fetch_timeframe,
+                days=self.days
+            )
+
+        if df is None or df.empty:
+            logger.warning(f"[WARNING] No candle data received for {item['symbol']}")
+            return None
+
+        # ===== UTC → IST =====
+        df['time'] = to_ist(df['time'])
+        self._check_continuity(item, df)
+
+        if self.rollups:
+            # ===== 1m → higher timeframes, latest closed candle per timeframe =====
+            latest = {}
+            now = self.api.now() if hasattr(self.api, "now") else None
+            for tf, candle in self.rollups[item["token"]].sync(df, now):
+                latest[tf] = self._push(item, tf, candle)
+            return [latest[tf] for tf in self.timeframes if tf in latest]
+
+        state = self.states[item["token"]][self.timeframe]
+
+        # ===== INDICATORS (incremental, new candles only) =====
+        with self.metrics.span("indicators"):
+            df = state.indicators.apply(df)
+
+        # ===== STRATEGY =====
+        with self.metrics.span("strategy"):
+            signal = state.detector.sync(df)
+
+        return [{
+            "item": item,
+            "timeframe": self.timeframe,
+            "signal": self._dedupe(item, state, signal),
+            "price": df['close'].iloc[-1],
+            "rsi": df['rsi'].iloc[-1],
+            "time": df['time'].iloc[-1],
+        }]
+
+    def on_candle(self, token, candle):
+        """
+        Push one closed candle (e.g. from the live tick feed) for a symbol.
+        In multi-timeframe mode this is a 1-minute candle.
+
+        Returns:
+        --------
+        list of dict
+            scan_symbol-style results (empty if nothing new closed)
+        """
+        item = self._items.get(token)
+        if item is None:
+            return []
+        if self.rollups:
+            closed = self.rollups[token].update(candle)
+        else:
+            closed = [(self.timeframe, candle)]
+        results = [self._push(item, tf, c) for tf, c in closed]
+        return [r for r in results if r]
+
+    def _push(self, item, timeframe, candle):
+        """Run indicators + strategy on one candle of one timeframe"""
+        state = self.states[item["token"]][timeframe]
+
+        # Candles older than the newest one are ignored; the same time revises it
+        last_time = state.detector.last_time
+        if last_time is not None and candle['time'] < last_time:
+            return None
+
+        with self.metrics.span("indicators"):
+            values = state.indicators.update(candle['time'], candle['close'])
+        candle = dict(candle, **values)
+        with self.metrics.span("strategy"):
+            signal = state.detector.update(candle)
+
+        return {
+            "item": item,
+            "timeframe": timeframe,
+            "signal": self._dedupe(item, state, signal),
+            "price": candle['close'],
+            "rsi": candle['rsi'],
+            "time": candle['time'],
+        }
+
+    def _check_continuity(self, item, df):
+        """
+        Reset a symbol's streaming state if the fetched candles start after its
+        newest candle (e.g. a checkpoint older than the fetch window).
+        """
+        token = item["token"]
+        if self.rollups:
+            last_time = self.rollups[token].last_time
+        else:
+            last_time = self.states[token][self.timeframe].indicators.last_time
+        if last_time is None or df['time'].iloc[0] <= last_time:
+            return
+        logger.warning(f"[STATE] {item['symbol']}: history gap since {last_time}. Rebuilding state")
+        if self.rollups:
+            self.rollups[token] = MultiTimeframeEngine(self.timeframes)
+        for tf in self.timeframes:
+            last_signal_time = self.states[token][tf].last_signal_time
+            self.states[token][tf] = SymbolState()
+            self.states[token][tf].last_signal_time = last_signal_time
+
+    def fingerprint(self):
+        """Settings a checkpoint must match to be restored"""
+        from config.settings import RSI_PERIOD, BB_PERIOD, BB_STD_DEV, MIN_CANDLES, MAX_CANDLES
+        return (self.fetch_timeframe, tuple(self.timeframes),
+                RSI_PERIOD, BB_PERIOD, BB_STD_DEV, MIN_CANDLES, MAX_CANDLES)
+
+    def snapshot(self):
+        """Streaming state of every symbol, for a warm-restart checkpoint"""
+        return {"states": self.states, "rollups": self.rollups}
+
+    def restore(self, snapshot):
+        """
+        Adopt checkpointed state for symbols that are still on the watchlist.
+        Returns the number of symbols restored.
+        """
+        restored = 0
+        for token, states in snapshot["states"].items():
+            if token not in self.states:
+                continue
+            self.states[token] = states
+            if self.rollups and token in (snapshot["rollups"] or {}):
+                self.rollups[token] = snapshot["rollups"][token]
+            restored += 1
+        return restored
+
+    def _dedupe(self, item, state, signal):
+        if signal:
+            if state.last_signal_time == signal['confirmation_time']:
+                logger.info(f"[SKIP] {item['symbol']}: Duplicate signal ignored")
+                return None
+            state.last_signal_time = signal['confirmation_time']
+        return signal
+
+    def _scan_safely(self, item):
+        try:
+            return self.scan_symbol(item)
+        except Exception as e:
+            logger.error(f"[ERROR] {item['symbol']}: {e}")
+            return None
+
+    def scan_cycle(self):
+        """
+        Scan the whole watchlist once.
+
+        Returns:
+        --------
+        list of dict
+            scan_symbol results of every symbol, flattened
+        """
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = [r for batch in pool.map(self._scan_safely, self.watchlist)
+                       if batch for r in batch]
+
+        self.last_cycle_seconds = time.perf_counter() - started
+        self.metrics.observe("scan_cycle", self.last_cycle_seconds)
+        signals = sum(1 for r in results if r["signal"])
+        scanned = len({r["item"]["token"] for r in results})
+        logger.info(
+            f"[CYCLE] Scanned {scanned}/{len(self.watchlist)} symbols in "
+            f"{self.last_cycle_seconds:.2f}s | Signals={signals}"
+        )
+        return results
@@ -0,0 +1,274 @@
+"""
+Universe Screener
+End-of-day divergence scan over many symbols and timeframes.
+
+Each timeframe's candles are packed once into a single shared-memory array;
+worker processes attach to it by name and receive only (symbol, start, end)
+spans, so no candle data is pickled between processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta, timezone
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from logzero import logger
+
+from src.indicators import rsi_panel, bollinger_panel
+from src.strategy import Candles, find_divergence
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# RSI is computed over this many periods before the scanned tail instead of
+# the full history ((1 - 1/14) ** 700 ~ 1e-23: identical to float precision)
+RSI_WARMUP_PERIODS = 50
+
+# Rows of a packed candle array (time = epoch seconds)
+PACKED_FIELDS = ("time", "open", "high", "low", "close", "volume")
+
+SCREEN_COLUMNS = [
+    "rank", "symbol", "token", "exchange", "timeframe", "bars_ago", "type", "strength",
+    "pattern", "confirmation_time", "confirmation_close", "last_close",
+    "p1_price", "p2_price", "p1_rsi", "p2_rsi", "rsi_change", "bb_touched"
+]
+
+# Packed arrays ({timeframe: (6, N) array}) and strategy settings, set once per worker
+_packed = {}
+_handles = []
+_params = None
+
+
+def frame_to_array(df):
+    """Candle DataFrame (tz-aware time) → (6, n) packed-field array"""
+    times = df['time'].dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+    times = times.astype("datetime64[s]").astype(np.float64)
+    return np.vstack([times] + [df[f].to_numpy(dtype=np.float64) for f in PACKED_FIELDS[1:]])
+
+
+def pack_candles(arrays):
+    """
+    Concatenate per-symbol (6, n) arrays into one (6, N) array.
+
+    Returns:
+    --------
+    tuple
+        (packed array, offsets) - symbol i is packed[:, offsets[i]:offsets[i + 1]]
+    """
+    lengths = [a.shape[1] if a is not None else 0 for a in arrays]
+    offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+    packed = np.empty((len(PACKED_FIELDS), offsets[-1]), dtype=np.float64)
+    for a, start, end in zip(arrays, offsets[:-1], offsets[1:]):
+        if end > start:
+            packed[:, start:end] = a
+    return packed, offsets
+
+
+def _to_shared(packed):
+    """Copy a packed array into a new shared-memory block"""
+    shm = shared_memory.SharedMemory(create=True, size=max(packed.nbytes, 1))
+    view = np.ndarray(packed.shape, dtype=packed.dtype, buffer=shm.buf)
+    view[:] = packed
+    return shm
+
+
+def _init_worker(blocks, params):
+    """Attach to every timeframe's shared block ({timeframe: (name, shape)})"""
+    global _params
+    _params = params
+    for timeframe, (name, shape) in blocks.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _handles.append(shm)
+        _packed[timeframe] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def screen_series(values, rsi_values, lower, upper, params):
+    """
+    Divergences confirmed within the last `recent` candles of one symbol.
+
+    Parameters:
+    -----------
+    values : numpy.ndarray
+        (6, n) packed candles of one symbol, oldest first (at least the
+        scanned tail)
+    rsi_values, lower, upper : numpy.ndarray
+        Indicators of the same candles
+    params : dict
+        recent, min_candles, max_candles
+
+    Returns:
+    --------
+    list of dict
+        Signal fields plus bars_ago (0 = confirmed on the newest candle) and last_close
+    """
+    # Each recent candle in turn as the confirmation candle
+    candles = Candles(*values, rsi_values, lower, upper)
+    size = len(candles)
+    rows = []
+    for end in range(max(size - params["recent"], 0) + 1, size + 1):
+        signal = find_divergence(_prefix(candles, end), params["min_candles"], params["max_candles"])
+        if signal is None:
+            continue
+        row = signal.to_dict()
+        for field in ("time", "p1_time", "confirmation_time"):
+            row[field] = pd.Timestamp(row[field], unit="s", tz="UTC").tz_convert(IST)
+        row["bars_ago"] = size - end
+        row["last_close"] = float(values[4, -1])
+        rows.append(row)
+    return rows
+
+
+def _prefix(candles, end):
+    """View of the first `end` candles"""
+    return Candles(*(None if values is None else values[:end]
+                     for values in (getattr(candles, f) for f in Candles.__slots__)))
+
+
+def screen_spans(task):
+    """
+    Worker task: (timeframe, [(symbol index, start, end), ...]) → signal rows.
+
+    Indicators of all symbols in the task are computed in one panel pass over
+    a NaN-padded (symbols × candles) matrix of their recent closes.
+    """
+    timeframe, spans = task
+    packed = _packed[timeframe]
+    params = _params
+
+    # Only the recent confirmations are needed: scan just enough of the tail.
+    # Indicators only need their own warm-up before it: Bollinger windows are
+    # exact, and RSI weights older than RSI_WARMUP_PERIODS lengths fall below
+    # float precision.
+    tail = params["recent"] + params["max_candles"] + 1
+    width = tail + max(RSI_WARMUP_PERIODS * params["rsi_period"], params["bb_period"])
+    closes = np.full((len(spans), width), np.nan)
+    for k, (_, start, end) in enumerate(spans):
+        lo = max(start, end - width)
+        closes[k, width - (end - lo):] = packed[4, lo:end]
+    rsi_values = rsi_panel(closes, params["rsi_period"])[:, -tail:]
+    lower, upper = (band[:, -tail:] for band in
+                    bollinger_panel(closes, params["bb_period"], params["bb_std"]))
+
+    rows = []
+    for k, (index, start, end) in enumerate(spans):
+        n = min(end - start, tail)
+        if end - start < params["rsi_period"] + 4:
+            continue
+        values = packed[:, end - n:end]
+        for row in screen_series(values, rsi_values[k, -n:], lower[k, -n:], upper[k, -n:], params):
+            row["symbol_index"] = index
+            row["timeframe"] = timeframe
+            rows.append(row)
+    return rows
+
+
+def screen_universe(universe, candles, recent=None, workers=None, chunks_per_worker=4):
+    """
+    Screen every symbol on every timeframe.
+
+    Parameters:
+    -----------
+    universe : list of dict
+        Watchlist items ({"symbol", "token", "exchange"})
+    candles : dict
+        {timeframe: [(6, n) array or None per universe item]} (see load_universe)
+    recent : int, optional
+        Report divergences confirmed within the last N candles (default
+        SCREENER_RECENT_CANDLES)
+    workers : int, optional
+        Worker processes (default: CPU count). 1 runs in-process.
+
+    Returns:
+    --------
+    pandas.DataFrame
+        SCREEN_COLUMNS, ranked: newest confirmation first, then BB-touch
+        confirmed, then the largest RSI divergence
+    """
+    from config.settings import (
+        SCREENER_RECENT_CANDLES, RSI_PERIOD, BB_PERIOD, BB_STD_DEV, MIN_CANDLES, MAX_CANDLES
+    )
+
+    params = {
+        "recent": SCREENER_RECENT_CANDLES if recent is None else recent,
+        "rsi_period": RSI_PERIOD, "bb_period": BB_PERIOD, "bb_std": BB_STD_DEV,
+        "min_candles": MIN_CANDLES, "max_candles": MAX_CANDLES,
+    }
+    workers = workers or os.cpu_count() or 1
+
+    packed = {}
+    tasks = []
+    for timeframe, arrays in candles.items():
+        packed[timeframe], offsets = pack_candles(arrays)
+        spans = [(i, int(offsets[i]), int(offsets[i + 1]))
+                 for i in range(len(arrays)) if offsets[i + 1] > offsets[i]]
+        # Round-robin so every chunk mixes long and short histories
+        n_chunks = max(1, min(len(spans), workers * chunks_per_worker))
+        tasks.extend((timeframe, spans[k::n_chunks]) for k in range(n_chunks) if spans[k::n_chunks])
+
+    if workers == 1:
+        global _params
+        _packed.clear()
+        _packed.update(packed)
+        _params = params
+        results = [screen_spans(task) for task in tasks]
+    else:
+        blocks = {}
+        try:
+            for timeframe, array in packed.items():
+                blocks[timeframe] = _to_shared(array)
+            names = {tf: (shm.name, packed[tf].shape) for tf, shm in blocks.items()}
+            packed.clear()  # workers read the shared copies
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(names, params)) as pool:
+                results = list(pool.map(screen_spans, tasks))
+        finally:
+            for shm in blocks.values():
+                shm.close()
+                shm.unlink()
+
+    rows = [row for batch in results for row in batch]
+    return rank_signals(rows, universe)
+
+
+def rank_signals(rows, universe):
+    """Attach symbol details to screen_spans rows and rank them"""
+    if not rows:
+        return pd.DataFrame(columns=SCREEN_COLUMNS)
+
+    table = pd.DataFrame(rows)
+    items = [universe[i] for i in table["symbol_index"]]
+    table["symbol"] = [item["symbol"] for item in items]
+    table["token"] = [item["token"] for item in items]
+    table["exchange"] = [item["exchange"] for item in items]
+    table["rsi_change"] = table["p2_rsi"] - table["p1_rsi"]
+    table["_strength"] = table["rsi_change"].abs()
+    table = table.sort_values(["bars_ago", "bb_touched", "_strength"],
+                              ascending=[True, False, False], kind="mergesort")
+    table["rank"] = np.arange(1, len(table) + 1)
+    return table[SCREEN_COLUMNS].reset_index(drop=True)
+
+
+def load_universe(store, universe, timeframes, days=None):
+    """
+    Candles of every universe item from the candle store.
+
+    Returns:
+    --------
+    dict
+        {timeframe: [(6, n) array or None per item]}
+    """
+    from config.settings import SCREENER_DAYS
+    from datetime import datetime
+
+    start = datetime.now(IST) - timedelta(days=days or SCREENER_DAYS)
+    candles = {}
+    for timeframe in timeframes:
+        arrays = []
+        for item in universe:
+            array = store.load_array(item["token"], item["exchange"], timeframe, start=start)
+            arrays.append(array if array.shape[1] else None)
+        missing = sum(a is None for a in arrays)
+        if missing:
+            logger.warning(f"[SCREENER] {timeframe}: no stored candles for {missing}/{len(universe)} symbol(s)")
+        candles[timeframe] = arrays
+    return candles
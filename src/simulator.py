@@ -0,0 +1,163 @@
+"""
+Trade Outcome Simulator
+Replays every divergence signal as a trade with NumPy arrays (no per-signal loop)
+
+Trade rules:
+- Entry : BULLISH buys when price reaches the confirmation HIGH,
+          BEARISH sells when price reaches the confirmation LOW,
+          within `entry_window` candles after the confirmation candle.
+          A candle that gaps through the level fills at its open.
+- Stop  : the other end of the confirmation candle
+- Target: entry +/- risk_reward * risk
+- Exit  : first of stop / target, else the close after `max_hold` candles.
+          When stop and target fall in the same candle the stop is assumed
+          (no intra-candle data).
+"""
+import numpy as np
+import pandas as pd
+
+# Columns added to the signal table by simulate_trades
+TRADE_COLUMNS = [
+    "entry_index", "entry_price", "stop", "target", "exit_index", "exit_price",
+    "exit_reason", "bars_held", "pnl", "pnl_pct", "r_multiple", "mae", "mfe"
+]
+
+
+def simulate_trades(df, signals, entry_window=None, max_hold=None, risk_reward=None):
+    """
+    Simulate all signals at once.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Candles the signals were found on (open, high, low, close)
+    signals : pandas.DataFrame
+        scan_divergences output ('index' = confirmation candle position)
+    entry_window, max_hold, risk_reward : optional
+        Default to SIM_ENTRY_WINDOW / SIM_MAX_HOLD / SIM_RISK_REWARD
+
+    Returns:
+    --------
+    pandas.DataFrame
+        signals with TRADE_COLUMNS added. exit_reason is one of TARGET, STOP,
+        TIME, END_OF_DATA (data ran out while in the trade) or NO_ENTRY.
+        pnl / mae / mfe are in price points in the trade direction.
+    """
+    if entry_window is None or max_hold is None or risk_reward is None:
+        from config.settings import SIM_ENTRY_WINDOW, SIM_MAX_HOLD, SIM_RISK_REWARD
+        entry_window = SIM_ENTRY_WINDOW if entry_window is None else entry_window
+        max_hold = SIM_MAX_HOLD if max_hold is None else max_hold
+        risk_reward = SIM_RISK_REWARD if risk_reward is None else risk_reward
+    if entry_window < 1 or max_hold < 1:
+        raise ValueError(f"entry_window and max_hold must be >= 1 "
+                         f"(got {entry_window}, {max_hold})")
+
+    trades = signals.reset_index(drop=True).copy()
+    if trades.empty:
+        for col in TRADE_COLUMNS:
+            trades[col] = pd.Series(dtype=object if col == "exit_reason" else float)
+        return trades
+
+    o = df['open'].to_numpy(dtype=float)
+    h = df['high'].to_numpy(dtype=float)
+    l = df['low'].to_numpy(dtype=float)
+    c = df['close'].to_numpy(dtype=float)
+    n = len(c)
+
+    conf = trades['index'].to_numpy(dtype=int)
+    long = (trades['type'] == "BULLISH").to_numpy()
+    side = np.where(long, 1.0, -1.0)
+    conf_high = h[conf]
+    conf_low = l[conf]
+    level = np.where(long, conf_high, conf_low)
+    stop = np.where(long, conf_low, conf_high)
+    rows = np.arange(len(conf))
+
+    # ===== ENTRY: first candle after confirmation reaching the level =====
+    span = entry_window + max_hold
+    pos = conf[:, None] + 1 + np.arange(span)          # (signals, span) candle positions
+    in_data = pos < n
+    pos = np.minimum(pos, n - 1)
+    H, L, O, C = h[pos], l[pos], o[pos], c[pos]
+
+    trigger = np.where(long[:, None], H[:, :entry_window] >= level[:, None],
+                       L[:, :entry_window] <= level[:, None]) & in_data[:, :entry_window]
+    entered = trigger.any(axis=1)
+    entry_k = np.argmax(trigger, axis=1)
+    entry_open = O[rows, entry_k]
+    entry_price = np.where(long, np.maximum(level, entry_open), np.minimum(level, entry_open))
+    risk = side * (entry_price - stop)
+    target = entry_price + side * risk_reward * risk
+
+    # ===== HOLD WINDOW: max_hold candles from the entry candle =====
+    hold = entry_k[:, None] + np.arange(max_hold)      # offsets into the span
+    valid = in_data[rows[:, None], hold]
+    HH, LL, CC = H[rows[:, None], hold], L[rows[:, None], hold], C[rows[:, None], hold]
+
+    stop_hit = np.where(long[:, None], LL <= stop[:, None], HH >= stop[:, None]) & valid
+    target_hit = np.where(long[:, None], HH >= target[:, None], LL <= target[:, None]) & valid
+    first_stop = np.where(stop_hit.any(axis=1), np.argmax(stop_hit, axis=1), max_hold)
+    first_target = np.where(target_hit.any(axis=1), np.argmax(target_hit, axis=1), max_hold)
+    last_valid = valid.sum(axis=1) - 1
+
+    by_stop = first_stop <= first_target
+    exit_k = np.where(by_stop, first_stop, first_target)
+    timed_out = exit_k >= max_hold
+    exit_k = np.where(timed_out, np.maximum(last_valid, 0), exit_k)
+
+    exit_price = np.where(timed_out, CC[rows, exit_k], np.where(by_stop, stop, target))
+    exit_reason = np.where(timed_out,
+                           np.where(last_valid < max_hold - 1, "END_OF_DATA", "TIME"),
+                           np.where(by_stop, "STOP", "TARGET"))
+
+    # ===== EXCURSIONS from entry up to and including the exit candle =====
+    upto = (np.arange(max_hold)[None, :] <= exit_k[:, None]) & valid
+    best = np.where(long, np.where(upto, HH, -np.inf).max(axis=1), np.where(upto, LL, np.inf).min(axis=1))
+    worst = np.where(long, np.where(upto, LL, np.inf).min(axis=1), np.where(upto, HH, -np.inf).max(axis=1))
+    mfe = np.maximum(side * (best - entry_price), 0.0)
+    mae = np.maximum(side * (entry_price - worst), 0.0)
+
+    pnl = side * (exit_price - entry_price)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_multiple = np.where(risk > 0, pnl / risk, np.nan)
+
+    entry_index = conf + 1 + entry_k
+    trades['entry_index'] = np.where(entered, entry_index, -1)
+    trades['entry_price'] = np.where(entered, entry_price, np.nan)
+    trades['stop'] = np.where(entered, stop, np.nan)
+    trades['target'] = np.where(entered, target, np.nan)
+    trades['exit_index'] = np.where(entered, entry_index + exit_k, -1)
+    trades['exit_price'] = np.where(entered, exit_price, np.nan)
+    trades['exit_reason'] = np.where(entered, exit_reason, "NO_ENTRY")
+    trades['bars_held'] = np.where(entered, exit_k + 1, 0)
+    trades['pnl'] = np.where(entered, pnl, np.nan)
+    trades['pnl_pct'] = np.where(entered, pnl / entry_price * 100, np.nan)
+    trades['r_multiple'] = np.where(entered, r_multiple, np.nan)
+    trades['mae'] = np.where(entered, mae, np.nan)
+    trades['mfe'] = np.where(entered, mfe, np.nan)
+    return trades
+
+
+def summarize_trades(trades):
+    """
+    Returns:
+    --------
+    dict
+        signals, trades, wins, losses, win_rate, avg_r, expectancy (points),
+        total_pnl, avg_mae, avg_mfe, plus a count per exit_reason
+    """
+    taken = trades[trades['exit_reason'] != "NO_ENTRY"]
+    summary = {
+        "signals": len(trades),
+        "trades": len(taken),
+        "wins": int((taken['pnl'] > 0).sum()),
+        "losses": int((taken['pnl'] < 0).sum()),
+        "win_rate": float((taken['pnl'] > 0).mean()) if len(taken) else np.nan,
+        "avg_r": float(taken['r_multiple'].mean()) if len(taken) else np.nan,
+        "expectancy": float(taken['pnl'].mean()) if len(taken) else np.nan,
+        "total_pnl": float(taken['pnl'].sum()),
+        "avg_mae": float(taken['mae'].mean()) if len(taken) else np.nan,
+        "avg_mfe": float(taken['mfe'].mean()) if len(taken) else np.nan,
+    }
+    summary.update(trades['exit_reason'].value_counts().to_dict())
+    return summary
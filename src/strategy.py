@@ -2,6 +2,106 @@
 RSI Divergence Strategy Logic
 Implements the core divergence detection algorithms
 """
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Columns of the signal table returned by scan_divergences
+SIGNAL_COLUMNS = [
+    "index", "type", "strength", "p1_price", "p2_price", "p1_rsi", "p2_rsi",
+    "time", "p1_time", "confirmation_time", "confirmation_close",
+    "confirmation_high", "confirmation_low", "pattern", "bb_touched"
+]
+
+# Fields of a single signal (DivergenceSignal / check_divergence dict)
+SIGNAL_FIELDS = tuple(SIGNAL_COLUMNS[1:])
+
+
+class Candles:
+    """
+    Columnar candle container: one contiguous NumPy array per field.
+    
+    Indexing the arrays directly avoids building a pandas Series per candle.
+    `bbl` / `bbu` are None when Bollinger Bands were not calculated.
+    """
+    
+    __slots__ = ("time", "open", "high", "low", "close", "volume", "rsi", "bbl", "bbu")
+    
+    def __init__(self, time, open, high, low, close, volume, rsi, bbl=None, bbu=None):
+        self.time = time
+        self.open = np.asarray(open, dtype=float)
+        self.high = np.asarray(high, dtype=float)
+        self.low = np.asarray(low, dtype=float)
+        self.close = np.asarray(close, dtype=float)
+        self.volume = np.asarray(volume, dtype=float)
+        self.rsi = np.asarray(rsi, dtype=float)
+        self.bbl = None if bbl is None else np.asarray(bbl, dtype=float)
+        self.bbu = None if bbu is None else np.asarray(bbu, dtype=float)
+    
+    @classmethod
+    def from_frame(cls, df):
+        """Wrap DataFrame columns (no copy for float64 columns)"""
+        has_bb = 'BBU' in df.columns and 'BBL' in df.columns
+        return cls(
+            df['time'].array,  # keeps tz-aware timestamps intact
+            df['open'].to_numpy(dtype=float),
+            df['high'].to_numpy(dtype=float),
+            df['low'].to_numpy(dtype=float),
+            df['close'].to_numpy(dtype=float),
+            df['volume'].to_numpy(dtype=float),
+            df['rsi'].to_numpy(dtype=float),
+            df['BBL'].to_numpy(dtype=float) if has_bb else None,
+            df['BBU'].to_numpy(dtype=float) if has_bb else None,
+        )
+    
+    def __len__(self):
+        return len(self.close)
+    
+    def tail(self, n):
+        """View of the last n candles"""
+        cut = slice(max(len(self) - n, 0), None)
+        return Candles(
+            self.time[cut], self.open[cut], self.high[cut], self.low[cut], self.close[cut],
+            self.volume[cut], self.rsi[cut],
+            None if self.bbl is None else self.bbl[cut],
+            None if self.bbu is None else self.bbu[cut],
+        )
+
+
+@dataclass
+class DivergenceSignal:
+    """
+    One divergence signal. Supports signal['type'] style access so it can be
+    used wherever the signal dictionary is expected.
+    """
+    
+    __slots__ = SIGNAL_FIELDS
+    
+    type: str
+    strength: str
+    p1_price: float
+    p2_price: float
+    p1_rsi: float
+    p2_rsi: float
+    time: object
+    p1_time: object
+    confirmation_time: object
+    confirmation_close: float
+    confirmation_high: float
+    confirmation_low: float
+    pattern: str
+    bb_touched: bool
+    
+    def __getitem__(self, key):
+        return getattr(self, key)
+    
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+    
+    def to_dict(self):
+        return {field: getattr(self, field) for field in SIGNAL_FIELDS}
+
 
 def check_divergence(df):
     """
@@ -32,10 +132,14 @@ def check_divergence(df):
       * RSI: Higher Low (HL)
       * Signal: Potential upward reversal
     
+    DataFrame adapter over find_divergence: only the last MAX_CANDLES + 1
+    rows are converted, so the cost does not grow with the history length.
+    
     Parameters:
     -----------
-    df : pandas.DataFrame
+    df : pandas.DataFrame or Candles
         Historical candle data with columns: time, open, high, low, close, volume, rsi
+        and optionally BBL/BBU
         
     Returns:
     --------
@@ -44,141 +148,337 @@ def check_divergence(df):
     """
     if df is None or len(df) < 4:  # Minimum 3 candles + 1 confirmation candle
         return None
+    
+    from config.settings import MAX_CANDLES
+    
+    if isinstance(df, Candles):
+        candles = df.tail(MAX_CANDLES + 1)
+    else:
+        candles = Candles.from_frame(df.iloc[-(MAX_CANDLES + 1):])
+    
+    signal = find_divergence(candles)
+    return signal.to_dict() if signal else None
+
 
-    # Import here to avoid circular dependency
-    from config.settings import MIN_CANDLES, MAX_CANDLES
+def find_divergence(candles, min_candles=None, max_candles=None):
+    """
+    check_divergence on a Candles container.
     
-    # The LAST candle is the CONFIRMATION candle
-    # Point B is the SECOND-TO-LAST candle
-    confirmation_idx = len(df) - 1
-    current_idx = len(df) - 2  # Point B is now second-to-last
+    The LAST candle is the confirmation candle and the one before it is
+    Point B; Point A is searched shortest distance first (Rule 1).
     
-    if current_idx < 0:
+    Returns:
+    --------
+    DivergenceSignal or None
+    """
+    if min_candles is None or max_candles is None:
+        # Import here to avoid circular dependency
+        from config.settings import MIN_CANDLES, MAX_CANDLES
+        min_candles = MIN_CANDLES if min_candles is None else min_candles
+        max_candles = MAX_CANDLES if max_candles is None else max_candles
+    
+    n = len(candles)
+    if n < 4:  # Minimum 3 candles + 1 confirmation candle
         return None
     
-    confirmation_candle = df.iloc[confirmation_idx]
-    candle_b = df.iloc[current_idx]
+    # Only Point A at the maximum distance .. confirmation can matter.
+    # Plain Python lists of that window are the cheapest to index.
+    start = max(n - max_candles - 1, 0)
+    o = candles.open[start:].tolist()
+    h = candles.high[start:].tolist()
+    l = candles.low[start:].tolist()
+    c = candles.close[start:].tolist()
+    v = candles.volume[start:].tolist()
+    r = candles.rsi[start:].tolist()
+    has_bb = candles.bbl is not None and candles.bbu is not None
+    if has_bb:
+        bbl = candles.bbl[start:].tolist()
+        bbu = candles.bbu[start:].tolist()
     
-    # Determine Color of Confirmation Candle
-    confirmation_is_green = confirmation_candle['close'] > confirmation_candle['open']
-    confirmation_is_red = confirmation_candle['close'] < confirmation_candle['open']
+    conf = n - 1 - start   # confirmation candle
+    b = conf - 1           # Point B
     
-    # Determine Color of Candle B (based on closing prices)
-    # Green: Close > Open, Red: Close < Open
-    b_is_green = candle_b['close'] > candle_b['open']
-    b_is_red = candle_b['close'] < candle_b['open']
-
-    # Iterate backwards for Point A (Pivot)
-    # Distance = Index_B - Index_A + 1 (includes both points)
-    # Min Distance 3 => A = B - 2
-    # Max Distance 7 => A = B - 6
+    # Candle colours on closing basis: Green close > open, Red close < open
+    confirmation_is_green = c[conf] > o[conf]
+    confirmation_is_red = c[conf] < o[conf]
+    b_is_green = c[b] > o[b]
+    b_is_red = c[b] < o[b]
     
-    # Check shortest distance first (stronger divergence per Rule 1)
-    for dist in range(MIN_CANDLES, MAX_CANDLES + 1):
-        offset = dist - 1
-        prev_idx = current_idx - offset
-        
-        if prev_idx < 0:
+    # Distance = Index_B - Index_A + 1 (includes both points)
+    for dist in range(min_candles, max_candles + 1):
+        a = b - (dist - 1)
+        if a < 0:
             continue
         
-        candle_a = df.iloc[prev_idx]
+        a_is_green = c[a] > o[a]
+        a_is_red = c[a] < o[a]
         
-        # Determine Color of Candle A
-        a_is_green = candle_a['close'] > candle_a['open']
-        a_is_red = candle_a['close'] < candle_a['open']
-
-        # NEW RULE: Volume at Point A must be greater than Volume at Point B
-        # NOTE: For Index symbols (like Nifty 50), volume is often 0.
-        # We skip this check if volume data is missing.
-        if candle_a['volume'] > 0 and candle_b['volume'] > 0:
-            volume_valid = candle_a['volume'] > candle_b['volume']
+        # Volume at Point A must be greater than volume at Point B.
+        # Index symbols (Nifty 50) report 0 volume → rule skipped.
+        if v[a] > 0 and v[b] > 0:
+            volume_valid = v[a] > v[b]
         else:
             volume_valid = True
         
-        # NEW RULE: At least one candle in range [Point A, Point B] must touch BB
-        # Bearish (Top): Touch Upper Band (High >= BBU)
-        # Bullish (Bottom): Touch Lower Band (Low <= BBL)
+        # At least one candle in [A, B] must touch the band:
+        # Bearish (Top): High >= BBU, Bullish (Bottom): Low <= BBL
+        if has_bb:
+            if confirmation_is_red:
+                bb_touched = any(h[k] >= bbu[k] for k in range(a, b + 1))
+            elif confirmation_is_green:
+                bb_touched = any(l[k] <= bbl[k] for k in range(a, b + 1))
+            else:
+                bb_touched = False
+        else:
+            bb_touched = True  # BB not calculated → rule not applied
+        
+        if not (volume_valid and bb_touched):
+            continue
         
-        # Extract range of candles from A to B (inclusive)
-        # Indices in slice: 
-        # candle_a is at prev_idx
-        # candle_b is at current_idx
-        # We need all candles from prev_idx to current_idx
+        # --- BEARISH (Top): Green-Green + Red confirmation, HH price / LH RSI ---
+        if (b_is_green and a_is_green and confirmation_is_red
+                and c[b] > c[a] and r[b] < r[a]):
+            signal_type, pattern = "BEARISH", "Green-Green-Red"
+        # --- BULLISH (Bottom): Red-Red + Green confirmation, LL price / HL RSI ---
+        elif (b_is_red and a_is_red and confirmation_is_green
+                and c[b] < c[a] and r[b] > r[a]):
+            signal_type, pattern = "BULLISH", "Red-Red-Green"
+        else:
+            continue
         
-        # Check for BB columns existence first (in case not calculated)
-        has_bb = 'BBU' in df.columns and 'BBL' in df.columns
+        return DivergenceSignal(
+            signal_type, f"{dist} candles",
+            c[a], c[b], r[a], r[b],
+            candles.time[start + b], candles.time[start + a], candles.time[n - 1],
+            c[conf], h[conf], l[conf],
+            pattern, bb_touched
+        )
+    
+    return None
+
+
+def scan_divergences(df, min_candles=None, max_candles=None):
+    """
+    Vectorized whole-series version of check_divergence.
+    
+    Treats EVERY candle as a potential confirmation candle and evaluates all
+    (confirmation, Point B, Point A) combinations at once with NumPy arrays.
+    Row i of the result is exactly what check_divergence(df.iloc[:i+1]) returns,
+    including the shortest-distance-first priority (Rule 1).
+    
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Historical candle data with columns: time, open, high, low, close, volume, rsi
+        and optionally BBL/BBU
+    min_candles, max_candles : int, optional
+        Distance limits, default to MIN_CANDLES / MAX_CANDLES from settings
         
-        bb_touched = False
+    Returns:
+    --------
+    pandas.DataFrame
+        One row per signal (columns: SIGNAL_COLUMNS). 'index' is the positional
+        index of the confirmation candle.
+    """
+    if min_candles is None or max_candles is None:
+        from config.settings import MIN_CANDLES, MAX_CANDLES
+        min_candles = MIN_CANDLES if min_candles is None else min_candles
+        max_candles = MAX_CANDLES if max_candles is None else max_candles
+    
+    if df is None or len(df) < 4:
+        return pd.DataFrame(columns=SIGNAL_COLUMNS)
+    
+    n = len(df)
+    o = df['open'].to_numpy(dtype=float)
+    h = df['high'].to_numpy(dtype=float)
+    l = df['low'].to_numpy(dtype=float)
+    c = df['close'].to_numpy(dtype=float)
+    v = df['volume'].to_numpy(dtype=float)
+    r = df['rsi'].to_numpy(dtype=float)
+    
+    is_green = c > o
+    is_red = c < o
+    
+    # Prefix sums of BB touches -> touches in any window [A, B] in O(1)
+    has_bb = 'BBU' in df.columns and 'BBL' in df.columns
+    if has_bb:
+        upper_cs = np.concatenate(([0], np.cumsum(h >= df['BBU'].to_numpy(dtype=float))))
+        lower_cs = np.concatenate(([0], np.cumsum(l <= df['BBL'].to_numpy(dtype=float))))
+    
+    # Confirmation candles are i = 3 .. n-1, Point B is always i - 1
+    conf = np.arange(3, n)
+    b = conf - 1
+    
+    best_dist = np.zeros(len(conf), dtype=int)   # 0 = no signal yet
+    bb_flag = np.zeros(len(conf), dtype=bool)
+    
+    # Shortest distance first: only fill candles that have no signal yet
+    for dist in range(min_candles, max_candles + 1):
+        a = b - (dist - 1)
+        ok = (a >= 0) & (best_dist == 0)
+        if not ok.any():
+            continue
+        a_safe = np.where(ok, a, 0)
+        
+        # Volume rule (skipped when either volume is missing / zero)
+        va, vb = v[a_safe], v[b]
+        volume_valid = np.where((va > 0) & (vb > 0), va > vb, True)
+        
+        # BB touch rule, direction picked by the confirmation colour
         if has_bb:
-            # Slice from Point A to Point B
-            range_sq = df.iloc[prev_idx : current_idx + 1]
-            
-            if confirmation_is_red: # Bearish Divergence Logic
-                    # Check if ANY candle High >= Upper Band
-                    bb_touched = (range_sq['high'] >= range_sq['BBU']).any()
-            elif confirmation_is_green: # Bullish Divergence Logic
-                    # Check if ANY candle Low <= Lower Band
-                    bb_touched = (range_sq['low'] <= range_sq['BBL']).any()
+            up_touch = (upper_cs[b + 1] - upper_cs[a_safe]) > 0
+            low_touch = (lower_cs[b + 1] - lower_cs[a_safe]) > 0
+            bb_touched = np.where(is_red[conf], up_touch,
+                                  np.where(is_green[conf], low_touch, False))
         else:
-            # If BB not calculated, assume valid (or log warning)
-            # For safety, we can default to True if we don't have BB data, 
-            # but optimally we should have it.
-            bb_touched = True 
+            bb_touched = np.ones(len(conf), dtype=bool)
+        
+        common = ok & volume_valid & bb_touched
+        bearish = (common & is_green[b] & is_green[a_safe] & is_red[conf]
+                   & (c[b] > c[a_safe]) & (r[b] < r[a_safe]))
+        bullish = (common & is_red[b] & is_red[a_safe] & is_green[conf]
+                   & (c[b] < c[a_safe]) & (r[b] > r[a_safe]))
+        
+        hit = bearish | bullish
+        best_dist[hit] = dist
+        bb_flag[hit] = bb_touched[hit]
+    
+    found = best_dist > 0
+    conf = conf[found]
+    b = b[found]
+    dist = best_dist[found]
+    a = b - (dist - 1)
+    bearish = is_red[conf]
+    
+    times = df['time'].array  # keeps tz-aware timestamps intact
+    return pd.DataFrame({
+        "index": conf,
+        "type": np.where(bearish, "BEARISH", "BULLISH"),
+        "strength": [f"{d} candles" for d in dist],
+        "p1_price": c[a],
+        "p2_price": c[b],
+        "p1_rsi": r[a],
+        "p2_rsi": r[b],
+        "time": times[b],
+        "p1_time": times[a],
+        "confirmation_time": times[conf],
+        "confirmation_close": c[conf],
+        "confirmation_high": h[conf],
+        "confirmation_low": l[conf],
+        "pattern": np.where(bearish, "Green-Green-Red", "Red-Red-Green"),
+        "bb_touched": bb_flag[found],
+    }, columns=SIGNAL_COLUMNS)
 
-        # --- CHECK BEARISH DIVERGENCE (Top) ---
-        # Rule 4: Green to Green candles
-        # Rule 6: Confirmation candle must be RED
-        if b_is_green and a_is_green and confirmation_is_red:
-            # Price: Higher High (B > A)
-            price_higher = candle_b['close'] > candle_a['close']
-            # RSI: Lower High (B < A)
-            rsi_lower = candle_b['rsi'] < candle_a['rsi']
-            
-            if price_higher and rsi_lower and volume_valid and bb_touched:
-                return {
-                    "type": "BEARISH",
-                    "strength": f"{dist} candles",
-                    "p1_price": candle_a['close'],
-                    "p2_price": candle_b['close'],
-                    "p1_rsi": candle_a['rsi'],
-                    "p2_rsi": candle_b['rsi'],
-                    "time": candle_b['time'],
-                    "p1_time": candle_a['time'],
-                    "confirmation_time": confirmation_candle['time'],
-                    "confirmation_close": confirmation_candle['close'],
-                    "confirmation_high": confirmation_candle['high'],
-                    "confirmation_low": confirmation_candle['low'],
-                    # "entry_price": confirmation_candle['low'],  # SELL at LOW of confirmation (INACTIVE)
-                    "pattern": "Green-Green-Red",
-                    "bb_touched": bb_touched
-                }
 
-        # --- CHECK BULLISH DIVERGENCE (Bottom) ---
-        # Rule 4: Red to Red candles
-        # Rule 6: Confirmation candle must be GREEN
-        if b_is_red and a_is_red and confirmation_is_green:
-            # Price: Lower Low (B < A)
-            price_lower = candle_b['close'] < candle_a['close']
-            # RSI: Higher Low (B > A)
-            rsi_higher = candle_b['rsi'] > candle_a['rsi']
+class DivergenceDetector:
+    """
+    Streaming divergence detector with O(1) work per candle.
+    
+    Only the last MAX_CANDLES + 1 candles (Point A at the maximum distance up to
+    the confirmation candle) can influence a signal, so they are kept in a
+    fixed-size NumPy ring buffer. Pushing a closed candle returns the same
+    result check_divergence would return for the full history ending there.
+    """
+    
+    # Column layout of the ring buffer
+    FIELDS = ("open", "high", "low", "close", "volume", "rsi", "BBL", "BBU")
+    
+    def __init__(self, use_bb=True, min_candles=None, max_candles=None):
+        """
+        Parameters:
+        -----------
+        use_bb : bool
+            Apply the BB-touch rule (same as check_divergence with BBL/BBU columns)
+        min_candles, max_candles : int, optional
+            Distance limits, default to MIN_CANDLES / MAX_CANDLES from settings
+        """
+        if min_candles is None or max_candles is None:
+            from config.settings import MIN_CANDLES, MAX_CANDLES
+            min_candles = MIN_CANDLES if min_candles is None else min_candles
+            max_candles = MAX_CANDLES if max_candles is None else max_candles
+        
+        self.use_bb = use_bb
+        self.min_candles = min_candles
+        self.max_candles = max_candles
+        self.size = max_candles + 1
+        self._values = np.full((self.size, len(self.FIELDS)), np.nan)
+        self._times = [None] * self.size
+        self._head = 0    # slot of the next write
+        self.count = 0    # candles pushed so far (history length)
+    
+    @property
+    def last_time(self):
+        """Time of the newest buffered candle (None when empty)"""
+        if self.count == 0:
+            return None
+        return self._times[(self._head - 1) % self.size]
+    
+    def update(self, candle):
+        """
+        Push one candle and evaluate it as the confirmation candle.
+        
+        A candle with the same time as the newest buffered one replaces it,
+        so a forming candle can be revised without corrupting the history.
+        
+        Parameters:
+        -----------
+        candle : dict or pandas.Series
+            Keys: time, open, high, low, close, volume, rsi and optionally BBL/BBU
             
-            if price_lower and rsi_higher and volume_valid and bb_touched:
-                    return {
-                    "type": "BULLISH",
-                    "strength": f"{dist} candles",
-                    "p1_price": candle_a['close'],
-                    "p2_price": candle_b['close'],
-                    "p1_rsi": candle_a['rsi'],
-                    "p2_rsi": candle_b['rsi'],
-                    "time": candle_b['time'],
-                    "p1_time": candle_a['time'],
-                    "confirmation_time": confirmation_candle['time'],
-                    "confirmation_close": confirmation_candle['close'],
-                    "confirmation_high": confirmation_candle['high'],
-                    "confirmation_low": confirmation_candle['low'],
-                    # "entry_price": confirmation_candle['high'],  # BUY at HIGH of confirmation (INACTIVE)
-                    "pattern": "Red-Red-Green",
-                    "bb_touched": bb_touched
-                }
-                
-    return None
+        Returns:
+        --------
+        dict or None
+            Signal dictionary (same format as check_divergence) or None
+        """
+        if self.count and candle['time'] == self.last_time:
+            self._head = (self._head - 1) % self.size
+            self.count -= 1
+        
+        row = self._values[self._head]
+        for col, field in enumerate(self.FIELDS):
+            value = candle.get(field) if hasattr(candle, 'get') else candle[field]
+            row[col] = np.nan if value is None else value
+        self._times[self._head] = candle['time']
+        self._head = (self._head + 1) % self.size
+        self.count += 1
+        
+        return self._evaluate()
+    
+    def sync(self, df):
+        """
+        Push every row of df that is not older than the newest buffered candle.
+        
+        On the first call only the last MAX_CANDLES + 1 rows are pushed.
+        Returns the signal for the newest row (or None).
+        """
+        if df is None or df.empty:
+            return None
+        
+        if self.count == 0:
+            # Candles before the buffer window can never be Point A again,
+            # but they still count towards the history length
+            skipped = max(len(df) - self.size, 0)
+            self.count = skipped
+            new_rows = df.iloc[skipped:]
+        else:
+            new_rows = df[df['time'] >= self.last_time]
+        
+        signal = None
+        for _, candle in new_rows.iterrows():
+            signal = self.update(candle)
+        return signal
+    
+    def _evaluate(self):
+        if self.count < 4:  # Minimum 3 candles + 1 confirmation candle
+            return None
+        
+        # Chronological view of the buffer, oldest first; the last entry is
+        # the confirmation candle
+        available = min(self.count, self.size)
+        order = [(self._head + k) % self.size for k in range(self.size - available, self.size)]
+        values = self._values[order].T
+        bbl, bbu = (values[6], values[7]) if self.use_bb else (None, None)
+        candles = Candles([self._times[k] for k in order], *values[:6], bbl, bbu)
+        
+        signal = find_divergence(candles, self.min_candles, self.max_candles)
+        return signal.to_dict() if signal else None
@@ -0,0 +1,149 @@
+"""
+Multi-Timeframe Candle Engine
+Rolls a single 1-minute stream up into 5m / 15m / 1h / 1d candles
+"""
+from datetime import timedelta
+
+import pandas as pd
+
+from utils.market_session import session_bucket_bounds
+
+
+class CandleResampler:
+    """
+    Incremental OHLCV roll-up from base candles into one higher timeframe.
+
+    Buckets follow NSE sessions: intraday buckets are anchored at the open
+    (09:15) and the last one of the day is cut at the close (15:30), e.g. the
+    15:15 hourly candle closes at 15:30. Daily candles are labelled midnight.
+
+    A bucket closes as soon as a final base candle reaches its end, or when a
+    base candle of a later bucket arrives. The newest base candle may be
+    revised (same time) any number of times before it is final.
+    """
+
+    def __init__(self, minutes, base_minutes=1, session_open=(9, 15), session_close=(15, 30)):
+        self.minutes = minutes
+        self.base_step = timedelta(minutes=base_minutes)
+        self.session_open = session_open
+        self.session_close = session_close
+        self._start = None        # current bucket start / end
+        self._end = None
+        self._folded = None       # aggregate of all but the newest base candle
+        self._last = None         # newest (revisable) base candle
+        self._closed_until = None # end of the last emitted bucket
+
+    def bounds(self, ts):
+        """(start, end) of the bucket containing ts"""
+        return session_bucket_bounds(ts, self.minutes, self.session_open, self.session_close)
+
+    def update(self, candle, final=True):
+        """
+        Push one base candle (dict with time, open, high, low, close, volume).
+
+        Returns:
+        --------
+        list of dict
+            Higher-timeframe candles closed by this update (usually 0 or 1)
+        """
+        ts = candle['time']
+        if self._closed_until is not None and ts < self._closed_until:
+            return []  # belongs to a bucket that was already emitted
+
+        closed = []
+        start, end = self.bounds(ts)
+
+        if self._start is not None and start != self._start:
+            if start < self._start:
+                return []
+            closed.append(self._emit())
+
+        if self._start is None:
+            self._start, self._end = start, end
+            self._folded = None
+            self._last = candle
+        elif self._last['time'] == ts:
+            self._last = candle
+        else:
+            self._folded = _merge(self._folded, self._last)
+            self._last = candle
+
+        if final and ts + self.base_step >= self._end:
+            closed.append(self._emit())
+
+        return closed
+
+    def _emit(self):
+        merged = _merge(self._folded, self._last)
+        merged['time'] = pd.Timestamp(self._start)
+        self._closed_until = self._end
+        self._start = self._end = self._folded = self._last = None
+        return merged
+
+
+def _merge(agg, candle):
+    if agg is None:
+        return {key: candle[key] for key in ("time", "open", "high", "low", "close", "volume")}
+    return {
+        "time": agg['time'],
+        "open": agg['open'],
+        "high": max(agg['high'], candle['high']),
+        "low": min(agg['low'], candle['low']),
+        "close": candle['close'],
+        "volume": agg['volume'] + candle['volume'],
+    }
+
+
+class MultiTimeframeEngine:
+    """
+    One base (1-minute) stream for a symbol, rolled up into every strategy
+    timeframe at once.
+    """
+
+    def __init__(self, timeframes, base_minutes=1):
+        from config.settings import (
+            TIMEFRAME_MINUTES, MARKET_OPEN_HOUR, MARKET_OPEN_MINUTE,
+            MARKET_CLOSE_HOUR, MARKET_CLOSE_MINUTE
+        )
+        self.resamplers = {
+            tf: CandleResampler(
+                TIMEFRAME_MINUTES[tf], base_minutes,
+                (MARKET_OPEN_HOUR, MARKET_OPEN_MINUTE),
+                (MARKET_CLOSE_HOUR, MARKET_CLOSE_MINUTE)
+            )
+            for tf in timeframes
+        }
+        self.base_step = timedelta(minutes=base_minutes)
+        self.last_time = None
+
+    def update(self, candle, final=True):
+        """
+        Push one base candle.
+
+        Returns:
+        --------
+        list of (str, dict)
+            (timeframe, closed candle) pairs in timeframe order
+        """
+        self.last_time = candle['time']
+        closed = []
+        for tf, resampler in self.resamplers.items():
+            closed.extend((tf, c) for c in resampler.update(candle, final))
+        return closed
+
+    def sync(self, df, now=None):
+        """
+        Push every row of df not older than the newest base candle seen.
+
+        A row is final once its interval has ended by `now` (the fetch time);
+        a row still forming at `now` can be revised by the next sync. Without
+        `now` every row is a closed candle, as candle sources return them
+        after a candle close.
+        """
+        if self.last_time is not None:
+            df = df[df['time'] >= self.last_time]
+        closed = []
+        for candle in df.to_dict('records'):
+            final = now is None or candle['time'] + self.base_step <= now
+            closed.extend(self.update(candle, final))
+        return closed
@@ -6,17 +6,21 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pandas as pd
-import pandas_ta as ta
 from datetime import datetime, timedelta
 from logzero import logger
 
 from config.settings import (
     SYMBOL, SYMBOL_TOKEN, EXCHANGE, TIMEFRAME, RSI_PERIOD,
-    ANGEL_API_KEY, ANGEL_CLIENT_ID, ANGEL_PASSWORD, ANGEL_TOTP_SECRET,
-    BB_PERIOD, BB_STD_DEV
+    BB_PERIOD, BB_STD_DEV, ENABLE_CANDLE_STORE, CANDLE_STORE_PATH,
+    ENABLE_SESSION_CACHE, SESSION_CACHE_PATH
 )
-from utils.api_helpers import AngelOneApiHelper
-from src.strategy import check_divergence
+from utils.candle_source import open_candle_source, IST
+from utils.candle_store import CandleStore
+from utils.session_cache import SessionCache
+from utils.history_downloader import HistoryDownloader
+from src.strategy import scan_divergences
+from src.simulator import simulate_trades, summarize_trades
+from src.indicators import IndicatorEngine
 
 BACKTEST_DAYS = 2
 
@@ -28,38 +32,29 @@ def run_backtest():
     output.append(f"⏰ Timeframe: {TIMEFRAME}")
     output.append("=" * 100)
     
-    # Login
-    output.append("\n🔐 Logging in to Angel One...")
-    api = AngelOneApiHelper(ANGEL_API_KEY, ANGEL_CLIENT_ID, ANGEL_PASSWORD, ANGEL_TOTP_SECRET)
+    # Login (CANDLE_SOURCE=file runs offline without credentials)
+    store = CandleStore(CANDLE_STORE_PATH) if ENABLE_CANDLE_STORE else None
+    api = open_candle_source(candle_store=store,
+                             session_cache=SessionCache(SESSION_CACHE_PATH) if ENABLE_SESSION_CACHE else None)
+    output.append(f"\n🔐 Logging in to candle source '{api.name}'...")
     
     if not api.login():
-        output.append("❌ Failed to login to Angel One")
+        output.append(f"❌ Failed to login to '{api.name}'")
         return "\n".join(output)
     
     output.append("✅ Login successful!")
     
     # Fetch data
     output.append(f"\n📊 Fetching {BACKTEST_DAYS} days of historical data...")
-    df = api.fetch_candles(SYMBOL_TOKEN, EXCHANGE, TIMEFRAME, days=BACKTEST_DAYS + 2)
+    from_date = datetime.now(IST) - timedelta(days=BACKTEST_DAYS + 2)
+    df = HistoryDownloader(api).download(SYMBOL_TOKEN, EXCHANGE, TIMEFRAME, from_date)
     
     if df is None or df.empty:
         output.append("❌ Failed to fetch historical data")
         return "\n".join(output)
     
-    # Calculate RSI
-    df['rsi'] = ta.rsi(df['close'], length=RSI_PERIOD)
-
-    # Calculate Bollinger Bands
-    bb = ta.bbands(df['close'], length=BB_PERIOD, std=BB_STD_DEV)
-    
-    # Dynamically find the correct column names
-    # Expected pattern: BBL_length_std, but sometimes version specific
-    bbl_col = [c for c in bb.columns if c.startswith('BBL')][0]
-    bbu_col = [c for c in bb.columns if c.startswith('BBU')][0]
-    
-    # Assign specific columns
-    df['BBL'] = bb[bbl_col]
-    df['BBU'] = bb[bbu_col]
+    # Calculate RSI + Bollinger Bands
+    IndicatorEngine(RSI_PERIOD, BB_PERIOD, BB_STD_DEV).warm_up(df)
     
     # Filter for last BACKTEST_DAYS
     from datetime import timezone
@@ -75,17 +70,17 @@ def run_backtest():
     
     # Run backtest
     output.append(f"\n🔍 Scanning for divergence signals...")
-    signals = []
     start_index = RSI_PERIOD + 7
     
-    for i in range(start_index, len(df)):
-        current_slice = df.iloc[:i+1].copy()
-        signal = check_divergence(current_slice)
-        
-        if signal:
-            signal['index'] = i
-            signal['candle_time'] = df.iloc[i]['time']
-            signals.append(signal)
+    # Single vectorized pass over the whole series instead of one
+    # check_divergence call per growing prefix
+    found = scan_divergences(df)
+    found = found[found['index'] >= start_index]
+    trades = simulate_trades(df, found)
+    
+    signals = trades.to_dict('records')
+    for signal in signals:
+        signal['candle_time'] = signal['confirmation_time']
     
     # Report results
     output.append("\n" + "=" * 100)
@@ -128,6 +123,28 @@ def run_backtest():
                 output.append(f"   💡 Interpretation: Price made lower low but RSI made higher low → Potential upward reversal")
             else:
                 output.append(f"   💡 Interpretation: Price made higher high but RSI made lower high → Potential downward reversal")
+            
+            if s['exit_reason'] == "NO_ENTRY":
+                output.append(f"   🎯 Trade: not triggered")
+            else:
+                output.append(
+                    f"   🎯 Trade: {s['entry_price']:.2f} → {s['exit_price']:.2f} ({s['exit_reason']}, "
+                    f"{s['bars_held']} candles) | P&L {s['pnl']:+.2f} ({s['r_multiple']:+.2f}R) | "
+                    f"MAE {s['mae']:.2f} / MFE {s['mfe']:.2f}"
+                )
+        
+        # Trade outcomes
+        summary = summarize_trades(trades)
+        output.append("\n" + "=" * 100)
+        output.append("💼 TRADE OUTCOMES")
+        output.append("=" * 100)
+        output.append(f"Trades: {summary['trades']}/{summary['signals']} signals triggered")
+        if summary['trades']:
+            output.append(f"Win rate: {summary['win_rate'] * 100:.1f}% ({summary['wins']}W / {summary['losses']}L)")
+            output.append(f"Avg R: {summary['avg_r']:+.2f} | Expectancy: {summary['expectancy']:+.2f} pts | Total: {summary['total_pnl']:+.2f} pts")
+            output.append(f"Avg MAE: {summary['avg_mae']:.2f} | Avg MFE: {summary['avg_mfe']:.2f}")
+            exits = ", ".join(f"{r}={summary[r]}" for r in ("TARGET", "STOP", "TIME", "END_OF_DATA") if r in summary)
+            output.append(f"Exits: {exits}")
     
     output.append("\n" + "=" * 100)
     output.append("✅ Backtest Completed Successfully!")
@@ -0,0 +1,318 @@
+"""
+Benchmark Suite - times the strategy / indicator hot paths on synthetic candles
+
+Usage:
+    python tests/benchmark.py                                # 1k / 100k / 1M candles
+    python tests/benchmark.py --sizes 1000,100000 --only backtest,indicators_engine
+    python tests/benchmark.py --compare logs/benchmarks/<commit>.json
+    python tests/benchmark.py --sizes 0                      # import times only
+Results are saved as JSON (logs/benchmarks/<commit>.json by default).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+import logzero
+import numpy as np
+import pandas as pd
+
+from tests.synthetic import generate_candles, to_api_rows
+
+# A benchmark is slower than the baseline when its time grows by more than this
+REGRESSION_THRESHOLD = 1.2
+
+
+# ===== BENCHMARKS =====
+# Each takes the synthetic candles and returns a zero-argument callable to time.
+
+def bench_check_divergence(df):
+    """One check_divergence call (the newest candle as confirmation)"""
+    from src.strategy import check_divergence
+    df = _with_indicators(df)
+    return lambda: check_divergence(df)
+
+
+def bench_indicators_engine(df):
+    """RSI + Bollinger Bands warm-up as the scanner does it"""
+    from src.indicators import IndicatorEngine
+    from config.settings import RSI_PERIOD, BB_PERIOD, BB_STD_DEV
+    return lambda: IndicatorEngine(RSI_PERIOD, BB_PERIOD, BB_STD_DEV).warm_up(df.copy())
+
+
+def bench_indicators_batch(df):
+    """Batch RSI + Bollinger Bands over the whole series"""
+    from src.indicators import rsi, bollinger_bands
+    from config.settings import RSI_PERIOD, BB_PERIOD, BB_STD_DEV
+    close = df['close'].to_numpy()
+    return lambda: (rsi(close, RSI_PERIOD), bollinger_bands(close, BB_PERIOD, BB_STD_DEV))
+
+
+def bench_indicators_panel(df):
+    """Panel RSI + Bollinger Bands: the same candles as 100 symbols in one pass"""
+    from src.indicators import rsi_panel, bollinger_panel
+    from config.settings import RSI_PERIOD, BB_PERIOD, BB_STD_DEV
+    close = df['close'].to_numpy()
+    panel = close[:len(close) // 100 * 100].reshape(100, -1)
+    return lambda: (rsi_panel(panel, RSI_PERIOD), bollinger_panel(panel, BB_PERIOD, BB_STD_DEV))
+
+
+def bench_backtest(df):
+    """Full backtest loop: indicators + divergence scan over every candle"""
+    from src.indicators import IndicatorEngine
+    from src.strategy import scan_divergences
+    from config.settings import RSI_PERIOD, BB_PERIOD, BB_STD_DEV
+
+    def run():
+        data = IndicatorEngine(RSI_PERIOD, BB_PERIOD, BB_STD_DEV).warm_up(df.copy())
+        return scan_divergences(data)
+    return run
+
+
+def bench_detector_stream(df):
+    """Streaming DivergenceDetector, one candle at a time"""
+    from src.strategy import DivergenceDetector
+    records = _with_indicators(df).to_dict('records')
+
+    def run():
+        detector = DivergenceDetector()
+        for candle in records:
+            detector.update(candle)
+    return run
+
+
+def bench_fetch_candles(df):
+    """fetch_candles_range DataFrame construction from a raw API response"""
+    from utils.api_helpers import AngelOneApiHelper, IST
+    from utils.rate_limiter import RateLimiter
+
+    class ReplayApi:
+        rows = to_api_rows(df)
+
+        def getCandleData(self, params):
+            return {"status": True, "data": self.rows}
+
+    api = AngelOneApiHelper("key", "client", "pwd", "totp",
+                            rate_limiter=RateLimiter([(10 ** 9, 1)]))
+    api.smart_api = ReplayApi()
+    api.auth_token = "token"
+    start = datetime.now(IST)
+    return lambda: api.fetch_candles_range("99926000", "NSE", "FIVE_MINUTE", start, start)
+
+
+def bench_decode_candles(df):
+    """getCandleData rows → typed arrays → DataFrame (utils.candle_decoder)"""
+    from utils.candle_decoder import decode_candle_data, candles_frame
+    rows = to_api_rows(df)
+    return lambda: candles_frame(*decode_candle_data(rows))
+
+
+def bench_decode_candles_pandas(df):
+    """Reference: the column-by-column pandas parsing the decoder replaced"""
+    rows = to_api_rows(df)
+
+    def run():
+        data = pd.DataFrame(rows, columns=["time", "open", "high", "low", "close", "volume"])
+        data["time"] = pd.to_datetime(data["time"])
+        for col in ["open", "high", "low", "close", "volume"]:
+            data[col] = pd.to_numeric(data[col])
+        return data.sort_values("time").reset_index(drop=True)
+    return run
+
+
+def bench_simulate_trades(df):
+    """Trade simulation of the backtest's signals, repeated to 50k signals"""
+    from src.simulator import simulate_trades
+    from src.strategy import scan_divergences
+    data = _with_indicators(df)
+    signals = scan_divergences(data)
+    if len(signals):
+        signals = pd.concat([signals] * max(1, 50000 // len(signals)), ignore_index=True)
+    return lambda: simulate_trades(data, signals, entry_window=3, max_hold=50, risk_reward=2.0)
+
+
+BENCHMARKS = {
+    "check_divergence": bench_check_divergence,
+    "indicators_engine": bench_indicators_engine,
+    "indicators_batch": bench_indicators_batch,
+    "indicators_panel": bench_indicators_panel,
+    "backtest": bench_backtest,
+    "detector_stream": bench_detector_stream,
+    "fetch_candles": bench_fetch_candles,
+    "decode_candles": bench_decode_candles,
+    "decode_candles_pandas": bench_decode_candles_pandas,
+    "simulate_trades": bench_simulate_trades,
+}
+
+
+# Cold import time of the entry points (fresh interpreter each run)
+IMPORT_MODULES = ("config.settings", "src.strategy", "src.scanner", "utils.api_helpers", "src.main")
+
+
+def _with_indicators(df):
+    from src.indicators import IndicatorEngine
+    from config.settings import RSI_PERIOD, BB_PERIOD, BB_STD_DEV
+    return IndicatorEngine(RSI_PERIOD, BB_PERIOD, BB_STD_DEV).warm_up(df.copy())
+
+
+# ===== RUNNER =====
+
+def time_call(fn, min_seconds=0.2, max_repeat=5):
+    """
+    Best wall time of fn over several runs. Fast calls are batched in
+    loops long enough to time reliably.
+    """
+    started = time.perf_counter()
+    fn()
+    first = time.perf_counter() - started
+
+    loops = max(1, int(min_seconds / max(first, 1e-9)))
+    repeat = max_repeat if first * loops < 2 else 1
+    best = first
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - started) / loops)
+    return best, loops * repeat + 1
+
+
+def run_benchmarks(sizes, names=None, seed=42, zero_volume=True, log=print):
+    """
+    Returns:
+    --------
+    dict
+        {benchmark: {size: {"seconds": ..., "runs": ...}}}
+    """
+    names = names or list(BENCHMARKS)
+    results = {name: {} for name in names}
+    for size in sizes:
+        df = generate_candles(size, seed=seed, zero_volume=zero_volume)
+        for name in names:
+            fn = BENCHMARKS[name](df)
+            seconds, runs = time_call(fn)
+            results[name][str(size)] = {"seconds": seconds, "runs": runs}
+            log(f"{name:<20} {size:>9,} candles  {_format_seconds(seconds):>10}")
+    return results
+
+
+def measure_imports(modules=IMPORT_MODULES, repeat=5, log=print):
+    """
+    Cold import time per module: best of `repeat` fresh interpreters, minus
+    the bare interpreter startup. Angel One credentials are removed from the
+    environment, so this also checks that imports do not require them.
+
+    Returns:
+    --------
+    dict
+        {"import:<module>": {"cold": {"seconds": ..., "runs": ...}}}
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {k: v for k, v in os.environ.items() if not k.startswith("ANGEL_")}
+
+    def best(code):
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], cwd=root, env=env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            times.append(time.perf_counter() - started)
+        return min(times)
+
+    baseline = best("pass")
+    results = {}
+    for module in modules:
+        seconds = max(best(f"import {module}") - baseline, 0.0)
+        results[f"import:{module}"] = {"cold": {"seconds": seconds, "runs": repeat}}
+        log(f"{'import ' + module:<30} {_format_seconds(seconds):>10}")
+    return results
+
+
+def compare(results, baseline):
+    """
+    Ratios current / baseline for every benchmark present in both.
+
+    Returns:
+    --------
+    list of (str, str, float)
+        (benchmark, size, ratio)
+    """
+    rows = []
+    for name, sizes in results.items():
+        for size, current in sizes.items():
+            previous = baseline.get(name, {}).get(size)
+            if previous:
+                rows.append((name, size, current["seconds"] / previous["seconds"]))
+    return rows
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def _format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Strategy / indicator benchmarks")
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--only", help="Comma-separated benchmark names: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--with-volume", action="store_true", help="Equity-like volume instead of index data")
+    parser.add_argument("--output", help="JSON path (default logs/benchmarks/<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--no-imports", action="store_true", help="Skip the cold import benchmark")
+    args = parser.parse_args()
+
+    logzero.loglevel(logging.WARNING)  # per-call fetch logs would dominate the timings
+    sizes = [int(s) for s in args.sizes.split(",") if int(s) > 0]
+    names = args.only.split(",") if args.only else None
+    meta = environment()
+
+    print(f"⏱️  Benchmarks @ {meta['commit']} (python {meta['python']}, pandas {meta['pandas']})")
+    results = run_benchmarks(sizes, names, seed=args.seed, zero_volume=not args.with_volume) if sizes else {}
+    if not args.no_imports:
+        results.update(measure_imports())
+
+    output = args.output or os.path.join("logs", "benchmarks", f"{meta['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({**meta, "seed": args.seed, "results": results}, f, indent=2)
+    print(f"📄 Results saved to: {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\n📊 vs {baseline.get('commit', args.compare)}")
+        for name, size, ratio in compare(results, baseline["results"]):
+            flag = "⚠️  slower" if ratio > REGRESSION_THRESHOLD else ""
+            label = f"{int(size):>9,} candles" if size.isdigit() else f"{size:>17}"
+            print(f"{name:<30} {label}  {ratio:6.2f}x  {flag}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Replay Runner - drives the real polling loop over recorded candles on a virtual clock
+
+Usage:
+    python tests/replay.py                              # every watchlist series in the candle store
+    python tests/replay.py --from 2024-01-01 --to 2024-02-01
+    python tests/replay.py --synthetic 22 --symbols 50  # 22 sessions of synthetic candles, 50 symbols
+    python tests/replay.py --files data/candles --24x7  # CSV / Parquet files (e.g. Delta Exchange candles)
+No login and no Telegram messages; alerts are collected and reported.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+import logzero
+
+from config.settings import (
+    CANDLE_STORE_PATH, TIMEFRAME, TIMEFRAME_MINUTES, STRATEGY_TIMEFRAMES, EXCHANGE
+)
+from utils.candle_source import SESSION_24X7
+from utils.candle_store import CandleStore
+from utils.replay import ReplayApiHelper, ReplayClock, IST
+from src.scanner import load_watchlist, BASE_TIMEFRAME
+from src.main import build_scanner, run_replay
+from tests.synthetic import generate_candles
+
+
+def synthetic_frames(watchlist, timeframe, sessions):
+    """One seeded random walk per watchlist symbol"""
+    minutes = TIMEFRAME_MINUTES.get(timeframe, 5)
+    n = sessions * -(-375 // minutes)
+    return {
+        (item["token"], timeframe): generate_candles(n, seed=i, timeframe_minutes=minutes,
+                                                     start=datetime(2024, 1, 1, tzinfo=IST))
+        for i, item in enumerate(watchlist)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded candles through the polling loop")
+    parser.add_argument("--from", dest="from_date", help="Start date YYYY-MM-DD (default: first candle)")
+    parser.add_argument("--to", dest="to_date", help="End date YYYY-MM-DD (default: last candle)")
+    parser.add_argument("--synthetic", type=int, metavar="SESSIONS",
+                        help="Replay synthetic candles instead of the candle store")
+    parser.add_argument("--symbols", type=int, default=None,
+                        help="Synthetic watchlist size (default: the watchlist)")
+    parser.add_argument("--files", metavar="DIR",
+                        help="Replay <token>_<TIMEFRAME>.csv / .parquet files instead of the candle store")
+    parser.add_argument("--24x7", dest="round_the_clock", action="store_true",
+                        help="Round-the-clock market (crypto) instead of NSE hours")
+    parser.add_argument("--verbose", action="store_true", help="Keep the loop's INFO logs")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logzero.loglevel(logging.WARNING)
+
+    watchlist = load_watchlist()
+    if args.synthetic and args.symbols:
+        watchlist = [{"symbol": f"SYN{i}", "token": str(i), "exchange": EXCHANGE}
+                     for i in range(args.symbols)]
+
+    # Interval the scanner requests: 1m roll-ups or TIMEFRAME
+    timeframe = BASE_TIMEFRAME if STRATEGY_TIMEFRAMES else TIMEFRAME
+    clock = ReplayClock(datetime.now(IST))
+    session = SESSION_24X7 if args.round_the_clock else None
+    if args.synthetic:
+        api = ReplayApiHelper(clock, frames=synthetic_frames(watchlist, timeframe, args.synthetic),
+                              session=session)
+    elif args.files:
+        api = ReplayApiHelper(clock, path=args.files, session=session)
+    else:
+        api = ReplayApiHelper(clock, candle_store=CandleStore(CANDLE_STORE_PATH), session=session)
+
+    first, last = api.candle_span(watchlist, timeframe)
+    if first is None:
+        print(f"❌ No {timeframe} candles to replay")
+        return
+    start = datetime.strptime(args.from_date, "%Y-%m-%d").replace(tzinfo=IST) if args.from_date else first
+    end = (datetime.strptime(args.to_date, "%Y-%m-%d").replace(tzinfo=IST) if args.to_date
+           else last + timedelta(minutes=TIMEFRAME_MINUTES.get(timeframe, 5)))
+    clock.start = start
+    scanner = build_scanner(api, watchlist)
+
+    print(f"▶️  Replaying {len(watchlist)} symbol(s) {start:%Y-%m-%d %H:%M} → {end:%Y-%m-%d %H:%M}...")
+    report = run_replay(api, scanner, clock, end)
+
+    print(f"✅ {report['cycles']} cycles / {report['candles']} candles in {report['seconds']:.2f}s "
+          f"({report['cycles_per_second']:.0f} cycles/s, {report['candles_per_second']:.0f} candles/s)")
+    print(f"🔔 {len(report['alerts'])} alert(s)")
+    for r in report['alerts']:
+        s = r["signal"]
+        print(f"   {s['confirmation_time']:%Y-%m-%d %H:%M} | {r['item']['symbol']:<12} | "
+              f"{r['timeframe']:<15} | {s['type']:<8} | {s['strength']:<8} | {s['pattern']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Universe Screener - end-of-day divergence scan of every watchlist symbol on several timeframes
+
+Usage:
+    python tests/screener.py                                   # watchlist × SCREENER_TIMEFRAMES from the candle store
+    python tests/screener.py --watchlist config/nifty500.csv --timeframes ONE_HOUR,ONE_DAY --recent 3
+    python tests/screener.py --synthetic 500 --candles 5000    # load test on synthetic candles
+Results are saved to logs/screener_results.csv (ranked).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+from config.settings import CANDLE_STORE_PATH, SCREENER_TIMEFRAMES, EXCHANGE
+from src.scanner import load_watchlist
+from src.screener import screen_universe, load_universe, frame_to_array
+from tests.synthetic import generate_candles
+
+
+def synthetic_universe(symbols, candles, timeframes):
+    """Seeded random walks shaped like load_universe output (same walk on every timeframe)"""
+    universe = [{"symbol": f"SYN{i}", "token": str(i), "exchange": EXCHANGE} for i in range(symbols)]
+    arrays = [frame_to_array(generate_candles(candles, seed=i)) for i in range(symbols)]
+    return universe, {timeframe: arrays for timeframe in timeframes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen a universe for recent RSI divergences")
+    parser.add_argument("--watchlist", help="Watchlist CSV (default: WATCHLIST_FILE)")
+    parser.add_argument("--timeframes", default=",".join(SCREENER_TIMEFRAMES))
+    parser.add_argument("--recent", type=int, default=None, help="Confirmed within the last N candles")
+    parser.add_argument("--days", type=int, default=None, help="History per symbol (default SCREENER_DAYS)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--synthetic", type=int, metavar="SYMBOLS", help="Screen synthetic candles")
+    parser.add_argument("--candles", type=int, default=5000, help="Synthetic candles per symbol")
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--output", default="logs/screener_results.csv")
+    args = parser.parse_args()
+
+    timeframes = [tf.strip() for tf in args.timeframes.split(",") if tf.strip()]
+
+    started = time.perf_counter()
+    if args.synthetic:
+        universe, candles = synthetic_universe(args.synthetic, args.candles, timeframes)
+    else:
+        from utils.candle_store import CandleStore
+        universe = load_watchlist(args.watchlist)
+        candles = load_universe(CandleStore(CANDLE_STORE_PATH), universe, timeframes, args.days)
+    loaded = time.perf_counter()
+    total = sum(a.shape[1] for arrays in candles.values() for a in arrays if a is not None)
+    print(f"📥 Loaded {total} candles ({len(universe)} symbols × {len(timeframes)} timeframes) "
+          f"in {loaded - started:.2f}s")
+
+    table = screen_universe(universe, candles, recent=args.recent, workers=args.workers)
+    elapsed = time.perf_counter() - loaded
+    print(f"🔍 Screened in {elapsed:.2f}s | {len(table)} divergence(s), "
+          f"{int((table['bars_ago'] == 0).sum())} on the latest candle")
+
+    if len(table):
+        print(table.head(args.top)[["rank", "symbol", "timeframe", "bars_ago", "type", "strength",
+                                    "confirmation_time", "rsi_change", "bb_touched"]].to_string(index=False))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    table.to_csv(args.output, index=False)
+    print(f"\n📄 Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Parameter Sweep Runner - evaluates RSI / Bollinger / distance settings in parallel
+
+Each combination is scored like the backtest report: every signal is
+simulated as a trade (src.simulator: entry trigger, stop, target) and ranked
+by average R. Raw close-to-close forward returns are listed alongside.
+
+Usage:
+    python tests/sweep.py --csv data/nifty_5m.csv --rsi 7,14,21 --bb 20 --std 1.5,2,2.5 --max 5,7,9
+    python tests/sweep.py --days 365          # candles from the local candle store
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from src.indicators import rsi, bollinger_bands
+from src.simulator import simulate_trades, summarize_trades
+from src.strategy import scan_divergences
+
+# Raw forward returns (in candles) measured after each signal
+HORIZONS = (5, 10, 20)
+
+# Trade summary fields reported per combination (summarize_trades keys)
+TRADE_STATS = ("trades", "win_rate", "avg_r", "expectancy", "total_pnl")
+
+# Candle data + precomputed indicators + trade rules, set once per worker process
+_candles = None
+_rsi = None
+_bands = None
+_sim = None
+
+
+def parse_list(text, cast):
+    return [cast(x) for x in text.split(",") if x.strip()]
+
+
+def build_grid(rsi_periods, bb_periods, bb_stds, min_candles, max_candles):
+    """All valid parameter combinations as dicts"""
+    grid = []
+    for r, bp, bs, lo, hi in itertools.product(rsi_periods, bb_periods, bb_stds, min_candles, max_candles):
+        if lo <= hi:
+            grid.append({"rsi_period": r, "bb_period": bp, "bb_std": bs,
+                         "min_candles": lo, "max_candles": hi})
+    return grid
+
+
+def precompute_indicators(close, grid):
+    """Indicators once per distinct RSI period and Bollinger (period, std)"""
+    rsi_values = {p: rsi(close, p) for p in {g["rsi_period"] for g in grid}}
+    bands = {(p, s): bollinger_bands(close, p, s)
+             for p, s in {(g["bb_period"], g["bb_std"]) for g in grid}}
+    return rsi_values, bands
+
+
+def _init_worker(candles, rsi_values, bands, sim):
+    global _candles, _rsi, _bands, _sim
+    _candles, _rsi, _bands, _sim = candles, rsi_values, bands, sim
+
+
+def evaluate(params):
+    """Signal counts, simulated trade stats and raw forward returns for one combination"""
+    df = _candles.copy()
+    df['rsi'] = _rsi[params["rsi_period"]]
+    df['BBL'], df['BBU'] = _bands[(params["bb_period"], params["bb_std"])]
+
+    signals = scan_divergences(df, params["min_candles"], params["max_candles"])
+    row = dict(params)
+    row["signals"] = len(signals)
+    row["bullish"] = int((signals["type"] == "BULLISH").sum())
+    row["bearish"] = int((signals["type"] == "BEARISH").sum())
+
+    summary = summarize_trades(simulate_trades(df, signals, **_sim))
+    row.update((key, summary[key]) for key in TRADE_STATS)
+
+    close = df['close'].to_numpy()
+    entry = signals["index"].to_numpy(dtype=int)
+    direction = np.where(signals["type"] == "BULLISH", 1.0, -1.0)
+    for h in HORIZONS:
+        exit_idx = entry + h
+        valid = exit_idx < len(close)
+        moves = direction[valid] * (close[exit_idx[valid]] / close[entry[valid]] - 1) * 100
+        row[f"win_rate_{h}"] = float((moves > 0).mean()) if len(moves) else np.nan
+        row[f"avg_return_{h}"] = float(moves.mean()) if len(moves) else np.nan
+    return row
+
+
+def run_sweep(candles, grid, workers=None, chunksize=8, entry_window=None, max_hold=None,
+              risk_reward=None):
+    """
+    Evaluate every combination of grid over a process pool.
+
+    Parameters:
+    -----------
+    candles : pandas.DataFrame
+        time, open, high, low, close, volume
+    grid : list of dict
+        Output of build_grid
+    entry_window, max_hold, risk_reward : optional
+        Trade rules for simulate_trades, default to the SIM_* settings
+
+    Returns:
+    --------
+    pandas.DataFrame
+        One row per combination, sorted by simulated avg_r (as in the backtest
+        report); avg_return_* / win_rate_* are raw forward returns
+    """
+    from config.settings import SIM_ENTRY_WINDOW, SIM_MAX_HOLD, SIM_RISK_REWARD
+
+    sim = {
+        "entry_window": SIM_ENTRY_WINDOW if entry_window is None else entry_window,
+        "max_hold": SIM_MAX_HOLD if max_hold is None else max_hold,
+        "risk_reward": SIM_RISK_REWARD if risk_reward is None else risk_reward,
+    }
+    candles = candles[["time", "open", "high", "low", "close", "volume"]].reset_index(drop=True)
+    rsi_values, bands = precompute_indicators(candles['close'].to_numpy(dtype=float), grid)
+
+    if workers == 1:
+        _init_worker(candles, rsi_values, bands, sim)
+        rows = [evaluate(p) for p in grid]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(candles, rsi_values, bands, sim)) as pool:
+            rows = list(pool.map(evaluate, grid, chunksize=chunksize))
+
+    return pd.DataFrame(rows).sort_values("avg_r", ascending=False, na_position="last").reset_index(drop=True)
+
+
+def load_candles(args):
+    if args.csv:
+        df = pd.read_csv(args.csv)
+        df['time'] = pd.to_datetime(df['time'])
+        return df
+
+    from config.settings import SYMBOL_TOKEN, EXCHANGE, TIMEFRAME, CANDLE_STORE_PATH
+    from utils.candle_store import CandleStore
+    start = datetime.now(timezone.utc) - timedelta(days=args.days)
+    return CandleStore(CANDLE_STORE_PATH).load(
+        args.token or SYMBOL_TOKEN, args.exchange or EXCHANGE, args.timeframe or TIMEFRAME, start=start
+    )
+
+
+def main():
+    from config.settings import RSI_PERIOD, BB_PERIOD, BB_STD_DEV, MIN_CANDLES, MAX_CANDLES
+
+    parser = argparse.ArgumentParser(description="RSI divergence parameter sweep")
+    parser.add_argument("--csv", help="Candle CSV (time, open, high, low, close, volume)")
+    parser.add_argument("--days", type=int, default=365, help="History from the candle store")
+    parser.add_argument("--token")
+    parser.add_argument("--exchange")
+    parser.add_argument("--timeframe")
+    parser.add_argument("--rsi", default=str(RSI_PERIOD))
+    parser.add_argument("--bb", default=str(BB_PERIOD))
+    parser.add_argument("--std", default=str(BB_STD_DEV))
+    parser.add_argument("--min", default=str(MIN_CANDLES))
+    parser.add_argument("--max", default=str(MAX_CANDLES))
+    parser.add_argument("--entry-window", type=int, default=None, help="Default: SIM_ENTRY_WINDOW")
+    parser.add_argument("--max-hold", type=int, default=None, help="Default: SIM_MAX_HOLD")
+    parser.add_argument("--rr", type=float, default=None, help="Risk:reward, default: SIM_RISK_REWARD")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="logs/sweep_results.csv")
+    args = parser.parse_args()
+
+    candles = load_candles(args)
+    if candles is None or candles.empty:
+        print("❌ No candle data")
+        return
+
+    grid = build_grid(parse_list(args.rsi, int), parse_list(args.bb, int), parse_list(args.std, float),
+                      parse_list(args.min, int), parse_list(args.max, int))
+
+    print(f"🔄 Sweeping {len(grid)} combinations over {len(candles)} candles...")
+    started = time.perf_counter()
+    results = run_sweep(candles, grid, workers=args.workers, entry_window=args.entry_window,
+                        max_hold=args.max_hold, risk_reward=args.rr)
+    elapsed = time.perf_counter() - started
+
+    print(results.head(20).to_string(index=False))
+    print("\nRanked by simulated avg_r (entry trigger, stop, target as in the backtest); "
+          "avg_return_* / win_rate_* are raw close-to-close forward returns")
+    print(f"\n⏱️  {len(grid)} combinations in {elapsed:.1f}s")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    results.to_csv(args.output, index=False)
+    print(f"📄 Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
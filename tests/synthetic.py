@@ -0,0 +1,75 @@
+"""
+Synthetic Candle Generator
+Seeded random-walk OHLCV data on NSE session timestamps for tests and benchmarks
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def session_times(n, timeframe_minutes=5, start=None):
+    """
+    n candle open times inside NSE sessions (09:15-15:30, Monday-Friday).
+    """
+    start = start or datetime(2020, 1, 1, tzinfo=IST)
+    per_day = max(1, -(-375 // timeframe_minutes))  # 375 minutes per session
+    days = pd.bdate_range(start.date(), periods=-(-n // per_day))
+    offsets = pd.to_timedelta(9 * 60 + 15 + np.arange(per_day) * timeframe_minutes, unit="min")
+    if timeframe_minutes >= 1440:
+        offsets = pd.to_timedelta([0], unit="min")
+    times = (days.tz_localize(start.tzinfo).values[:, None] + offsets.values[None, :]).ravel()[:n]
+    return pd.Series(pd.DatetimeIndex(times, tz="UTC").tz_convert(start.tzinfo))
+
+
+def generate_candles(n, seed=0, start_price=22000.0, volatility=0.001, volume=50000,
+                     zero_volume=False, timeframe_minutes=5, start=None):
+    """
+    Random-walk OHLCV candles.
+
+    Parameters:
+    -----------
+    n : int
+        Number of candles
+    seed : int
+        Same seed → same candles
+    volatility : float
+        Standard deviation of the per-candle log return
+    volume : float
+        Mean volume per candle (log-normal)
+    zero_volume : bool
+        Volume 0 on every candle, like index data (NIFTY 50)
+
+    Returns:
+    --------
+    pandas.DataFrame
+        time, open, high, low, close, volume
+    """
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    open_ = np.empty(n)
+    open_[0] = start_price
+    open_[1:] = close[:-1] * (1 + rng.normal(0, volatility / 4, n - 1))
+    wick = np.abs(rng.normal(0, volatility / 2, (2, n))) * close
+    if zero_volume:
+        volumes = np.zeros(n)
+    else:
+        volumes = np.round(rng.lognormal(np.log(volume), 0.5, n))
+
+    return pd.DataFrame({
+        "time": session_times(n, timeframe_minutes, start),
+        "open": open_,
+        "high": np.maximum(open_, close) + wick[0],
+        "low": np.minimum(open_, close) - wick[1],
+        "close": close,
+        "volume": volumes,
+    })
+
+
+def to_api_rows(df):
+    """Candles as getCandleData returns them: [iso time, o, h, l, c, v] lists"""
+    times = df['time'].dt.strftime("%Y-%m-%dT%H:%M:%S+05:30")
+    return [list(row) for row in zip(times, df['open'], df['high'], df['low'],
+                                     df['close'], df['volume'].astype(int))]
@@ -0,0 +1,85 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from utils.telegram_helper import AlertDispatcher
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body or {}
+        self.text = str(self._body)
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    """Records posted texts; optional delay and scripted status codes"""
+
+    def __init__(self, delay=0.0, statuses=None):
+        self.delay = delay
+        self.statuses = list(statuses or [])
+        self.posts = []
+        self.lock = threading.Lock()
+
+    def post(self, url, json=None, timeout=None):
+        time.sleep(self.delay)
+        with self.lock:
+            self.posts.append(json["text"])
+            status = self.statuses.pop(0) if self.statuses else 200
+        if status == 429:
+            return FakeResponse(429, {"parameters": {"retry_after": 0.01}})
+        return FakeResponse(status)
+
+
+def make_dispatcher(session, **kwargs):
+    return AlertDispatcher(bot_token="token", chat_id="chat", session=session, **kwargs).start()
+
+
+class TestAlertDispatcher(unittest.TestCase):
+
+    def test_send_never_blocks_on_slow_api(self):
+        session = FakeSession(delay=0.3)
+        dispatcher = make_dispatcher(session, batch_window=0)
+        started = time.monotonic()
+        for i in range(5):
+            self.assertTrue(dispatcher.send(f"alert {i}"))
+        self.assertLess(time.monotonic() - started, 0.05)
+        dispatcher.stop()
+        self.assertEqual(dispatcher.stats()["sent"], 5)
+
+    def test_burst_is_batched(self):
+        session = FakeSession()
+        dispatcher = make_dispatcher(session, batch_window=0.2, max_batch=10)
+        for i in range(25):
+            dispatcher.send(f"alert {i}")
+        dispatcher.stop()
+        stats = dispatcher.stats()
+        self.assertEqual(stats["sent"], 25)
+        self.assertEqual(len(session.posts), 3)
+        self.assertIn("latency_p50", stats)
+
+    def test_retries_on_throttle_and_server_error(self):
+        session = FakeSession(statuses=[429, 502, 200])
+        dispatcher = make_dispatcher(session, batch_window=0)
+        with mock.patch("utils.telegram_helper.time.sleep"):
+            dispatcher.send("alert")
+            dispatcher.stop()
+        stats = dispatcher.stats()
+        self.assertEqual((stats["sent"], stats["retries"], stats["failed"]), (1, 2, 0))
+
+    def test_full_queue_drops_and_counts(self):
+        session = FakeSession(delay=0.2)
+        dispatcher = make_dispatcher(session, max_queue=2, max_batch=1, batch_window=0)
+        accepted = [dispatcher.send(f"alert {i}") for i in range(6)]
+        dispatcher.stop()
+        stats = dispatcher.stats()
+        self.assertIn(False, accepted)
+        self.assertEqual(stats["dropped"], accepted.count(False))
+        self.assertEqual(stats["sent"], accepted.count(True))
+
+if __name__ == '__main__':
+    unittest.main()
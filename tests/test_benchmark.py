@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+
+from tests.synthetic import generate_candles
+from tests.benchmark import run_benchmarks, compare
+
+
+class TestSyntheticCandles(unittest.TestCase):
+
+    def test_seeded_and_consistent(self):
+        a = generate_candles(2000, seed=7)
+        b = generate_candles(2000, seed=7)
+        self.assertTrue(a.equals(b))
+        self.assertTrue((a['high'] >= a[['open', 'close']].max(axis=1)).all())
+        self.assertTrue((a['low'] <= a[['open', 'close']].min(axis=1)).all())
+        self.assertTrue((a['volume'] > 0).all())
+        self.assertFalse(generate_candles(2000, seed=8)['close'].equals(a['close']))
+
+    def test_session_timestamps(self):
+        df = generate_candles(300, zero_volume=True)
+        self.assertTrue((df['volume'] == 0).all())
+        times = df['time']
+        self.assertTrue(times.is_monotonic_increasing)
+        self.assertTrue((times.dt.weekday < 5).all())
+        minutes = times.dt.hour * 60 + times.dt.minute
+        self.assertTrue(((minutes >= 9 * 60 + 15) & (minutes < 15 * 60 + 30)).all())
+        self.assertEqual(len(times.dt.date.unique()), 4)  # 75 five-minute candles a day
+
+    def test_volatility(self):
+        returns = np.diff(np.log(generate_candles(50000, volatility=0.002)['close']))
+        self.assertAlmostEqual(returns.std(), 0.002, delta=0.0001)
+
+
+class TestBenchmarkRunner(unittest.TestCase):
+
+    def test_runs_and_compares(self):
+        results = run_benchmarks([300], ["backtest", "indicators_batch"], log=lambda _: None)
+        self.assertGreater(results["backtest"]["300"]["seconds"], 0)
+        baseline = {"backtest": {"300": {"seconds": results["backtest"]["300"]["seconds"] / 2}}}
+        self.assertEqual(compare(results, baseline), [("backtest", "300", 2.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
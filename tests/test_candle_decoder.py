@@ -0,0 +1,64 @@
+import random
+import unittest
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from tests.synthetic import generate_candles, to_api_rows
+from utils.candle_decoder import decode_candle_data, candles_frame, IST
+
+
+def pandas_reference(rows):
+    """The former fetch_candles_range parsing"""
+    df = pd.DataFrame(rows, columns=["time", "open", "high", "low", "close", "volume"])
+    df["time"] = pd.to_datetime(df["time"], format="ISO8601")
+    for col in ["open", "high", "low", "close", "volume"]:
+        df[col] = pd.to_numeric(df[col])
+    return df.sort_values("time").reset_index(drop=True)
+
+
+class TestCandleDecoder(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = to_api_rows(generate_candles(2000, seed=5))
+
+    def assert_matches_reference(self, rows):
+        df = candles_frame(*decode_candle_data(rows))
+        expected = pandas_reference(rows)
+        self.assertEqual(list(df.columns), list(expected.columns))
+        self.assertEqual(str(df['time'].dt.tz), str(IST))
+        self.assertTrue((df['time'] == expected['time']).all())
+        for col in ["open", "high", "low", "close", "volume"]:
+            self.assertEqual(df[col].dtype, np.float64)
+            np.testing.assert_array_equal(df[col].to_numpy(), expected[col].to_numpy(dtype=float))
+
+    def test_matches_pandas_parsing(self):
+        self.assert_matches_reference(self.rows)
+
+    def test_unsorted_rows_are_sorted(self):
+        rows = self.rows[:]
+        random.Random(1).shuffle(rows)
+        epochs, values = decode_candle_data(rows)
+        self.assertTrue((np.diff(epochs) > 0).all())
+        np.testing.assert_array_equal(values, decode_candle_data(self.rows)[1])
+
+    def test_other_time_formats_fall_back(self):
+        rows = [["2024-01-01T09:15:00+05:30", 1, 2, 0, 1, 5],
+                ["2024-01-01T03:50:00Z", "1.5", "2", "0", "1", "5"],
+                ["2024-01-01T09:25:00.000+05:30", 1, 2, 0, 1, 5]]
+        df = candles_frame(*decode_candle_data(rows))
+        self.assertEqual(df['time'].tolist(), [datetime(2024, 1, 1, 9, m, tzinfo=IST) for m in (15, 20, 25)])
+        self.assertEqual(df['open'].tolist(), [1.0, 1.5, 1.0])
+
+    def test_other_offset_and_empty(self):
+        rows = [["2024-01-01T00:00:00-04:00", 1, 2, 0, 1, 5]]
+        epochs, _ = decode_candle_data(rows)
+        self.assertEqual(epochs[0], int(datetime(2024, 1, 1, 4, 0, tzinfo=timezone.utc).timestamp()))
+
+        epochs, values = decode_candle_data([])
+        self.assertEqual((epochs.shape, values.shape), ((0,), (5, 0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,237 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import logzero
+import pandas as pd
+import requests
+
+from src.indicators import IndicatorEngine
+from src.main import build_scanner, run_replay
+from src.strategy import scan_divergences
+from tests.synthetic import generate_candles
+from utils.candle_source import CandleSource, open_candle_source, SESSION_24X7, IST
+from utils.delta_api_helper import DeltaApiHelper, resolution_of
+from utils.file_source import FileCandleSource
+from utils.history_downloader import HistoryDownloader, split_range
+from utils.rate_limiter import RateLimiter
+from utils.replay import ReplayApiHelper, ReplayClock
+
+NOW = datetime(2024, 1, 7, 12, 2, tzinfo=IST)
+
+
+def round_the_clock(n, seed=0, minutes=5, start=None):
+    """Synthetic candles every `minutes`, day and night"""
+    df = generate_candles(n, seed=seed, start_price=40000.0)
+    start = start or datetime(2024, 1, 1, tzinfo=IST)
+    df['time'] = pd.Series(pd.date_range(start, periods=n, freq=f"{minutes}min"))
+    return df
+
+
+class FakeResponse:
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+class FakeHttp:
+    """history/candles stand-in serving 5-minute candles (newest first, like Delta)"""
+
+    def __init__(self, candles, responses=None):
+        self.candles = candles
+        self.responses = list(responses or [])  # served before any candles
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, dict(params or {})))
+        if self.responses:
+            return self.responses.pop(0)
+        if url.endswith("/v2/products"):
+            return FakeResponse(200, {"success": True, "result": [
+                {"symbol": "BTCUSD", "contract_type": "perpetual_futures"},
+                {"symbol": "C-BTC-90000-310124", "contract_type": "call_options"},
+            ]})
+        rows = [c for c in self.candles if params["start"] <= c["time"] <= params["end"]]
+        return FakeResponse(200, {"success": True, "result": rows[::-1]})
+
+
+def delta_rows(df):
+    epochs = (df['time'] - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)
+    return [{"time": int(t), "open": o, "high": h, "low": low, "close": c, "volume": v}
+            for t, o, h, low, c, v in zip(epochs, df['open'], df['high'], df['low'],
+                                           df['close'], df['volume'])]
+
+
+class TestDeltaApiHelper(unittest.TestCase):
+
+    def setUp(self):
+        self.df = round_the_clock(2000)  # 2024-01-01 00:00 → 2024-01-07 22:35 IST
+        self.http = FakeHttp(delta_rows(self.df))
+        self.api = DeltaApiHelper(rate_limiter=RateLimiter([(1000, 1)], backoff_base=0.01), http=self.http)
+        self.api.now = lambda: NOW
+
+    def test_resolution_names(self):
+        self.assertEqual(resolution_of("FIFTEEN_MINUTE"), ("15m", 900))
+        self.assertEqual(resolution_of("1h"), ("1h", 3600))
+        with self.assertRaises(ValueError):
+            resolution_of("SEVEN_MINUTE")
+
+    @mock.patch("config.settings.DELTA_MAX_CANDLES_PER_REQUEST", 500)
+    def test_paginates_and_serves_closed_candles_only(self):
+        df = self.api.fetch_candles_range("BTCUSD", "DELTA", "FIVE_MINUTE",
+                                          datetime(2024, 1, 1, tzinfo=IST), datetime(2024, 1, 8, tzinfo=IST))
+        # 12:00 is still forming at 12:02
+        expected = self.df[self.df['time'] <= datetime(2024, 1, 7, 11, 55, tzinfo=IST)]
+        self.assertEqual(len(self.http.calls), 4)
+        self.assertEqual(self.http.calls[0][1]["resolution"], "5m")
+        self.assertEqual(df['time'].tolist(), expected['time'].tolist())
+        self.assertEqual(df['close'].tolist(), expected['close'].tolist())
+        self.assertEqual(str(df['time'].dt.tz), str(IST))
+
+    def test_fetch_candles_days_window(self):
+        df = self.api.fetch_candles("BTCUSD", "DELTA", "FIVE_MINUTE", days=1)
+        self.assertEqual(df['time'].iloc[0], datetime(2024, 1, 6, 12, 5, tzinfo=IST))
+        self.assertEqual(len(df), 287)
+        self.assertEqual(len(self.http.calls), 1)
+
+    def test_throttle_retried_and_client_error_not(self):
+        self.http.responses = [FakeResponse(429, {"success": False}),
+                               FakeResponse(500, {"success": False, "error": {"code": "internal"}})]
+        df = self.api.fetch_candles("BTCUSD", "DELTA", "FIVE_MINUTE", days=1)
+        self.assertEqual(len(df), 287)
+        self.assertEqual(self.api.rate_limiter.snapshot()["throttled"], 1)
+
+        self.http.responses = [FakeResponse(400, {"success": False, "error": {"code": "invalid_symbol"}})]
+        self.assertIsNone(self.api.fetch_candles("NOPE", "DELTA", "FIVE_MINUTE", days=1))
+
+    def test_products_and_history_windows(self):
+        self.assertEqual([p["symbol"] for p in self.api.products(["perpetual_futures"])], ["BTCUSD"])
+        self.assertAlmostEqual(self.api.max_request_days("FIVE_MINUTE"), 2000 * 5 / 1440)
+
+        start = datetime(2024, 1, 1, tzinfo=IST)
+        with mock.patch("config.settings.DELTA_MAX_CANDLES_PER_REQUEST", 500):
+            df = HistoryDownloader(self.api, max_workers=2).download("BTCUSD", "DELTA", "FIVE_MINUTE", start, NOW)
+            windows = split_range(start, NOW, self.api.max_request_days("FIVE_MINUTE"))
+        self.assertEqual(len(self.http.calls), 1 + len(windows))  # one page per window
+        self.assertEqual(len(df), len(self.df[self.df['time'] <= datetime(2024, 1, 7, 11, 55, tzinfo=IST)]))
+        self.assertTrue(df['time'].is_monotonic_increasing)
+
+
+class TestFileCandleSource(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.df = generate_candles(150, seed=2, start=datetime(2024, 1, 1, tzinfo=IST))
+        self.df.to_csv(os.path.join(self.tmp.name, "1_FIVE_MINUTE.csv"), index=False)
+        self.source = FileCandleSource(self.tmp.name, now=lambda: datetime(2024, 1, 2, 10, 2, tzinfo=IST))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_csv_closed_candles_in_range(self):
+        df = self.source.fetch_candles_range("1", "NSE", "FIVE_MINUTE",
+                                             datetime(2024, 1, 2, tzinfo=IST), datetime(2024, 1, 3, tzinfo=IST))
+        self.assertEqual(df['time'].iloc[0], datetime(2024, 1, 2, 9, 15, tzinfo=IST))
+        self.assertEqual(df['time'].iloc[-1], datetime(2024, 1, 2, 9, 55, tzinfo=IST))
+        self.assertIsNone(self.source.fetch_candles("2", "NSE", "FIVE_MINUTE"))
+
+    def test_file_reread_when_changed_and_epoch_times(self):
+        path = os.path.join(self.tmp.name, "1_FIVE_MINUTE.csv")
+        self.assertEqual(len(self.source.fetch_candles("1", "NSE", "FIVE_MINUTE")), 84)
+
+        df = self.df.copy()
+        df['time'] = (df['time'] - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)
+        df.iloc[:10].to_csv(path, index=False)
+        os.utime(path, (1, 1))
+        fetched = self.source.fetch_candles("1", "NSE", "FIVE_MINUTE")
+        self.assertEqual(fetched['time'].tolist(), self.df['time'].iloc[:10].tolist())
+
+    def test_parquet(self):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest("pyarrow not installed")
+        self.df.to_parquet(os.path.join(self.tmp.name, "2_FIVE_MINUTE.parquet"))
+        self.assertEqual(len(self.source.fetch_candles("2", "NSE", "FIVE_MINUTE")), 84)
+
+
+class TestOpenCandleSource(unittest.TestCase):
+
+    def test_sources_from_settings(self):
+        self.assertIsInstance(open_candle_source("file"), FileCandleSource)
+        delta = open_candle_source("delta")
+        self.assertIsInstance(delta, CandleSource)
+        self.assertEqual(delta.session, SESSION_24X7)
+        with self.assertRaises(ValueError):
+            open_candle_source("unknown")
+
+    def test_source_without_fetch_fails_on_creation(self):
+        class Incomplete(CandleSource):
+            name = "incomplete"
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    @mock.patch("config.settings.ANGEL_API_KEY", "")
+    def test_angel_requires_credentials(self):
+        with self.assertRaises(ValueError):
+            open_candle_source("angel")
+
+
+class TestPooledSmartConnect(unittest.TestCase):
+
+    @mock.patch("requests.request", side_effect=AssertionError("unpooled request"))
+    def test_requests_go_through_pooled_adapter(self, _):
+        from config.settings import HTTP_POOL_SIZE
+        from utils.smart_connect import PooledSmartConnect
+
+        smart = PooledSmartConnect(api_key="key")
+        adapter = smart.reqsession.get_adapter(smart.root)
+        self.assertEqual(adapter._pool_maxsize, HTTP_POOL_SIZE)
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({"status": True, "data": [["2024-01-01T09:15:00+05:30", 1, 2, 0, 1, 5]]}).encode()
+        with mock.patch.object(adapter, "send", return_value=response) as send:
+            data = smart.getCandleData({"exchange": "NSE", "symboltoken": "1", "interval": "FIVE_MINUTE",
+                                        "fromdate": "2024-01-01 09:15", "todate": "2024-01-01 09:20"})
+        self.assertEqual(send.call_count, 1)
+        self.assertTrue(send.call_args[0][0].url.endswith("/getCandleData"))
+        self.assertEqual(data["data"][0][1], 1)
+
+
+class TestRoundTheClockReplay(unittest.TestCase):
+
+    def setUp(self):
+        logzero.loglevel(logging.WARNING)
+
+    def tearDown(self):
+        logzero.loglevel(logging.DEBUG)
+
+    def test_loop_runs_unchanged_on_24x7_candles(self):
+        df = round_the_clock(600, seed=7)
+        clock = ReplayClock(df['time'].iloc[0])
+        api = ReplayApiHelper(clock, frames={("BTCUSD", "FIVE_MINUTE"): df}, session=SESSION_24X7)
+        scanner = build_scanner(api, [{"symbol": "BTCUSD", "token": "BTCUSD", "exchange": "DELTA"}])
+
+        report = run_replay(api, scanner, clock, df['time'].iloc[-1] + timedelta(minutes=5))
+
+        # Every candle is scanned once (the first wakeup, 00:00, has no candle yet)
+        self.assertEqual(report["candles"], len(df))
+        expected = scan_divergences(IndicatorEngine().warm_up(df.copy()))
+        replayed = [(r["signal"]["confirmation_time"], r["signal"]["type"]) for r in report["alerts"]]
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(replayed, list(zip(expected['confirmation_time'], expected['type'])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from utils.api_helpers import AngelOneApiHelper, IST
+from utils.candle_store import CandleStore, find_gaps, to_ist
+from utils.file_source import index_candles
+
+
+class FakeSmartApi:
+    """getCandleData stand-in serving 5-minute candles for two trading days"""
+
+    def __init__(self):
+        self.calls = []
+        self.candles = []
+        for day in (datetime(2024, 1, 1, tzinfo=IST), datetime(2024, 1, 2, tzinfo=IST)):
+            t = day.replace(hour=9, minute=15)
+            while t.hour < 15 or (t.hour == 15 and t.minute < 30):
+                price = 100 + len(self.candles)
+                self.candles.append([t.isoformat(), price, price + 1, price - 1, price + 0.5, 10])
+                t += timedelta(minutes=5)
+
+    def getCandleData(self, params):
+        start = datetime.strptime(params["fromdate"], "%Y-%m-%d %H:%M").replace(tzinfo=IST)
+        end = datetime.strptime(params["todate"], "%Y-%m-%d %H:%M").replace(tzinfo=IST)
+        self.calls.append((start, end))
+        data = [c for c in self.candles if start <= datetime.fromisoformat(c[0]) <= end]
+        return {"status": True, "data": data}
+
+
+class TestCandleStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = CandleStore(os.path.join(self.tmp.name, "candles.sqlite3"))
+        self.api = AngelOneApiHelper("key", "client", "pwd", "totp", candle_store=self.store)
+        self.api.smart_api = FakeSmartApi()
+        self.api.auth_token = "token"
+        self.key = ("99926000", "NSE", "FIVE_MINUTE")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def fetch(self, from_date, to_date):
+        return self.api._fetch_candles_delta(*self.key, from_date, to_date)
+
+    def test_second_fetch_requests_only_new_candles(self):
+        start = datetime(2024, 1, 1, 9, 0, tzinfo=IST)
+        first = self.fetch(start, datetime(2024, 1, 2, 12, 0, tzinfo=IST))
+        second = self.fetch(start, datetime(2024, 1, 2, 12, 30, tzinfo=IST))
+
+        calls = self.api.smart_api.calls
+        self.assertEqual(len(calls), 2)
+        # The 12:00 candle was still forming at the first fetch → fetched again
+        self.assertEqual(calls[1][0], datetime(2024, 1, 2, 12, 0, tzinfo=IST))
+        self.assertEqual(len(second), len(first) + 6)
+        self.assertTrue(second['time'].is_monotonic_increasing)
+        self.assertFalse(second['time'].duplicated().any())
+
+    def test_intraday_gap_is_backfilled(self):
+        start = datetime(2024, 1, 1, 9, 0, tzinfo=IST)
+        end = datetime(2024, 1, 2, 15, 30, tzinfo=IST)
+        full = self.fetch(start, end)
+
+        gap_start = int(datetime(2024, 1, 1, 11, 0, tzinfo=IST).timestamp())
+        gap_end = int(datetime(2024, 1, 1, 11, 20, tzinfo=IST).timestamp())
+        self.store._conn.execute("DELETE FROM candles WHERE time BETWEEN ? AND ?", (gap_start, gap_end))
+        self.assertEqual(len(find_gaps(self.store.load(*self.key), 5)), 1)
+
+        refreshed = self.fetch(start, end)
+        self.assertIn(
+            (datetime(2024, 1, 1, 11, 0, tzinfo=IST), datetime(2024, 1, 1, 11, 20, tzinfo=IST)),
+            self.api.smart_api.calls
+        )
+        pd.testing.assert_frame_equal(refreshed, full)
+
+    def test_overnight_break_is_not_a_gap(self):
+        df = self.fetch(datetime(2024, 1, 1, 9, 0, tzinfo=IST), datetime(2024, 1, 2, 15, 30, tzinfo=IST))
+        self.assertEqual(find_gaps(df, 5), [])
+
+    def test_naive_times_are_utc_everywhere(self):
+        naive = pd.DataFrame({"time": pd.date_range("2024-01-01 03:45", periods=3, freq="5min"),
+                              "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10.0})
+        self.store.save(*self.key, naive, 5, fetched_at=datetime(2024, 1, 2, tzinfo=IST))
+        stored = self.store.load(*self.key)
+        self.assertEqual(stored['time'].iloc[0], datetime(2024, 1, 1, 9, 15, tzinfo=IST))
+        self.assertEqual(stored['time'].tolist(), to_ist(naive['time']).tolist())
+        self.assertEqual(index_candles(naive)[0]['time'].tolist(), stored['time'].tolist())
+
+if __name__ == '__main__':
+    unittest.main()
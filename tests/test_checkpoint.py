@@ -0,0 +1,97 @@
+import os
+import tempfile
+import time
+import unittest
+
+from src.scanner import WatchlistScanner
+from tests.test_scan import make_candles
+from utils.checkpoint import Checkpoint
+
+
+class GrowingApi:
+    """fetch_candles stand-in returning the first `n` candles of a fixed series"""
+
+    def __init__(self, n):
+        self.n = n
+        self.candles = {
+            token: make_candles(500, seed=int(token))[["time", "open", "high", "low", "close", "volume"]]
+            for token in ("1", "2", "3")
+        }
+
+    def fetch_candles(self, symbol_token, exchange, timeframe, days=5):
+        return self.candles[symbol_token].iloc[:self.n].copy()
+
+
+WATCHLIST = [{"symbol": f"SYM{i}", "token": str(i), "exchange": "NSE"} for i in (1, 2, 3)]
+
+
+def signals(results):
+    return {r["item"]["token"]: r["signal"] for r in results}
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.checkpoint = Checkpoint(os.path.join(self.tmp.name, "checkpoint.pkl"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_restart_continues_like_uninterrupted_run(self):
+        api = GrowingApi(300)
+        reference = WatchlistScanner(api, WATCHLIST, timeframe="FIVE_MINUTE")
+        crashed = WatchlistScanner(api, WATCHLIST, timeframe="FIVE_MINUTE")
+        reference.scan_cycle()
+        crashed.scan_cycle()
+        self.checkpoint.save(crashed.snapshot(), crashed.fingerprint())
+
+        restarted = WatchlistScanner(api, WATCHLIST, timeframe="FIVE_MINUTE")
+        self.assertEqual(restarted.restore(self.checkpoint.load(restarted.fingerprint())), 3)
+
+        for n in range(301, 420):
+            api.n = n
+            self.assertEqual(signals(restarted.scan_cycle()), signals(reference.scan_cycle()))
+
+    def test_no_duplicate_alert_after_restart(self):
+        # Stop right after a candle that produced a signal
+        api = GrowingApi(0)
+        scanner = WatchlistScanner(api, WATCHLIST[:1], timeframe="FIVE_MINUTE")
+        for n in range(30, 500):
+            api.n = n
+            if scanner.scan_cycle()[0]["signal"]:
+                break
+        self.checkpoint.save(scanner.snapshot(), scanner.fingerprint())
+
+        restarted = WatchlistScanner(api, WATCHLIST[:1], timeframe="FIVE_MINUTE")
+        restarted.restore(self.checkpoint.load(restarted.fingerprint()))
+        self.assertIsNone(restarted.scan_cycle()[0]["signal"])
+
+        fresh = WatchlistScanner(api, WATCHLIST[:1], timeframe="FIVE_MINUTE")
+        self.assertIsNotNone(fresh.scan_cycle()[0]["signal"])  # what a cold start would resend
+
+    def test_rejects_mismatched_stale_or_corrupt(self):
+        scanner = WatchlistScanner(GrowingApi(300), WATCHLIST, timeframe="FIVE_MINUTE")
+        self.checkpoint.save(scanner.snapshot(), scanner.fingerprint())
+        self.assertIsNotNone(self.checkpoint.load(scanner.fingerprint(), max_age=60))
+        self.assertIsNone(self.checkpoint.load(("ONE_HOUR",) + scanner.fingerprint()[1:]))
+        time.sleep(0.05)
+        self.assertIsNone(self.checkpoint.load(scanner.fingerprint(), max_age=0.01))
+
+        with open(self.checkpoint.path, "wb") as f:
+            f.write(b"not a pickle")
+        self.assertIsNone(self.checkpoint.load(scanner.fingerprint()))
+
+    def test_gap_after_stale_state_rebuilds(self):
+        api = GrowingApi(300)
+        scanner = WatchlistScanner(api, WATCHLIST[:1], timeframe="FIVE_MINUTE")
+        scanner.scan_cycle()
+        # History now starts after the newest candle the state has seen
+        api.candles["1"] = api.candles["1"].iloc[350:].reset_index(drop=True)
+        api.n = 100
+        reference = WatchlistScanner(api, WATCHLIST[:1], timeframe="FIVE_MINUTE")
+        self.assertEqual(scanner.scan_cycle()[0]["rsi"], reference.scan_cycle()[0]["rsi"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from utils.api_helpers import AngelOneApiHelper, IST
+from utils.candle_store import CandleStore
+from utils.history_downloader import HistoryDownloader, split_range
+from utils.rate_limiter import RateLimiter
+
+
+class FakeSmartApi:
+    """getCandleData stand-in with 5-minute candles on every weekday"""
+
+    def __init__(self, fail_windows=0):
+        self.calls = []
+        self.fail_windows = fail_windows
+        self._lock = threading.Lock()
+
+    def getCandleData(self, params):
+        start = datetime.strptime(params["fromdate"], "%Y-%m-%d %H:%M").replace(tzinfo=IST)
+        end = datetime.strptime(params["todate"], "%Y-%m-%d %H:%M").replace(tzinfo=IST)
+        with self._lock:
+            self.calls.append((start, end))
+            if self.fail_windows:
+                self.fail_windows -= 1
+                return {"status": False, "message": "Something went wrong"}
+        assert end - start <= timedelta(days=100), "range exceeds the FIVE_MINUTE limit"
+
+        data = []
+        day = start.replace(hour=0, minute=0)
+        while day <= end:
+            if day.weekday() < 5:
+                t = day.replace(hour=9, minute=15)
+                while t.hour < 15 or (t.hour == 15 and t.minute < 30):
+                    if start <= t <= end:
+                        data.append([t.isoformat(), 100, 101, 99, 100.5, 10])
+                    t += timedelta(minutes=5)
+            day += timedelta(days=1)
+        return {"status": True, "data": data}
+
+
+class TestSplitRange(unittest.TestCase):
+
+    def test_windows_cover_range_without_overlap(self):
+        start = datetime(2021, 3, 7, 10, 0, tzinfo=IST)
+        end = datetime(2023, 11, 2, 15, 30, tzinfo=IST)
+        windows = split_range(start, end, 100)
+        self.assertEqual(windows[0][0], start)
+        self.assertEqual(windows[-1][1], end)
+        for (_, prev_end), (next_start, _) in zip(windows, windows[1:]):
+            self.assertEqual(next_start - prev_end, timedelta(minutes=1))
+        self.assertTrue(all(e - s < timedelta(days=100) for s, e in windows))
+
+    def test_grid_is_stable_across_start_dates(self):
+        end = datetime(2024, 1, 1, tzinfo=IST)
+        a = split_range(datetime(2022, 1, 1, tzinfo=IST), end, 100)
+        b = split_range(datetime(2022, 2, 1, tzinfo=IST), end, 100)
+        self.assertNotEqual(a[0], b[0])
+        self.assertEqual(a[1:], b[1:])
+
+
+class TestHistoryDownloader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = CandleStore(os.path.join(self.tmp.name, "candles.sqlite3"))
+        self.api = AngelOneApiHelper("key", "client", "pwd", "totp", candle_store=self.store,
+                                     rate_limiter=RateLimiter([(1000, 1)], backoff_base=0.01))
+        self.api.auth_token = "token"
+        self.key = ("99926000", "NSE", "FIVE_MINUTE")
+        self.start = datetime(2023, 1, 2, tzinfo=IST)
+        self.end = datetime(2023, 12, 29, 15, 30, tzinfo=IST)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_downloads_year_in_windows(self):
+        self.api.smart_api = FakeSmartApi()
+        df = HistoryDownloader(self.api).download(*self.key, self.start, self.end)
+        self.assertEqual(len(self.api.smart_api.calls), 4)
+        self.assertEqual(len(df), 260 * 75)
+        self.assertTrue(df['time'].is_monotonic_increasing)
+        self.assertFalse(df['time'].duplicated().any())
+
+    def test_resumes_after_failed_windows(self):
+        # Each failing window uses up all three retries
+        self.api.smart_api = FakeSmartApi(fail_windows=3)
+        downloader = HistoryDownloader(self.api, max_workers=1)
+        self.assertIsNone(downloader.download(*self.key, self.start, self.end))
+
+        self.api.smart_api = FakeSmartApi()
+        df = downloader.download(*self.key, self.start, self.end)
+        self.assertEqual(len(self.api.smart_api.calls), 1)
+        self.assertEqual(len(df), 260 * 75)
+
+    def test_later_start_inside_downloaded_window_is_skipped(self):
+        self.api.smart_api = FakeSmartApi()
+        downloader = HistoryDownloader(self.api)
+        downloader.download(*self.key, self.start, self.end)
+
+        self.api.smart_api = FakeSmartApi()  # e.g. --days N a few seconds later
+        df = downloader.download(*self.key, self.start + timedelta(seconds=37), self.end)
+        self.assertEqual(self.api.smart_api.calls, [])
+        self.assertEqual(len(df), 260 * 75)
+
+    def test_without_store_stitches_in_memory(self):
+        self.api.candle_store = None
+        self.api.smart_api = FakeSmartApi()
+        df = HistoryDownloader(self.api).download(*self.key, self.start, self.end)
+        self.assertEqual(len(df), 260 * 75)
+
+
+if __name__ == '__main__':
+    unittest.main()
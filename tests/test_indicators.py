@@ -0,0 +1,139 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.indicators import (
+    IncrementalRSI, IncrementalBollinger, IndicatorEngine, rsi, bollinger_bands,
+    rsi_panel, bollinger_panel
+)
+
+try:
+    import pandas_ta as ta
+except ImportError:
+    ta = None
+
+
+def reference_rsi(close, length):
+    """pandas_ta.rsi (native pandas path) written out with plain pandas"""
+    change = close.diff()
+    gain = change.clip(lower=0)
+    loss = (-change).clip(lower=0)
+    gain_avg = gain.ewm(alpha=1 / length, min_periods=length).mean()
+    loss_avg = loss.ewm(alpha=1 / length, min_periods=length).mean()
+    return 100 * gain_avg / (gain_avg + loss_avg)
+
+
+def reference_bbands(close, length, std):
+    """pandas_ta.bbands (sma, ddof=0) written out with plain pandas"""
+    mid = close.rolling(length).mean()
+    deviation = std * close.rolling(length).std(ddof=0)
+    return mid - deviation, mid + deviation
+
+
+def random_closes(n, seed=0, start=22000.0):
+    rng = np.random.default_rng(seed)
+    return pd.Series(start + np.cumsum(rng.normal(0, 15, n)))
+
+
+class TestIncrementalIndicators(unittest.TestCase):
+
+    def test_rsi_matches_reference(self):
+        close = random_closes(5000, seed=1)
+        rsi = IncrementalRSI(14).warm_up(close)
+        np.testing.assert_allclose(rsi, reference_rsi(close, 14), atol=1e-8, equal_nan=True)
+        self.assertTrue(np.isnan(rsi[:14]).all())
+        self.assertFalse(np.isnan(rsi[14]))
+
+    def test_bbands_matches_reference(self):
+        close = random_closes(5000, seed=2)
+        lower, upper = IncrementalBollinger(20, 2.0).warm_up(close)
+        ref_lower, ref_upper = reference_bbands(close, 20, 2.0)
+        np.testing.assert_allclose(lower, ref_lower, atol=1e-6, equal_nan=True)
+        np.testing.assert_allclose(upper, ref_upper, atol=1e-6, equal_nan=True)
+
+    def test_batch_functions_match_incremental(self):
+        close = random_closes(3000, seed=6)
+        np.testing.assert_allclose(rsi(close, 14), IncrementalRSI(14).warm_up(close), atol=1e-8, equal_nan=True)
+        for batch, incremental in zip(bollinger_bands(close, 20, 2.0), IncrementalBollinger(20, 2.0).warm_up(close)):
+            np.testing.assert_allclose(batch, incremental, atol=1e-6, equal_nan=True)
+
+    @unittest.skipIf(ta is None, "pandas_ta not installed")
+    def test_matches_pandas_ta(self):
+        close = random_closes(2000, seed=3)
+        df = IndicatorEngine(14, 20, 2.0).warm_up(pd.DataFrame({"time": close.index, "close": close}))
+        bb = ta.bbands(close, length=20, std=2.0)
+        np.testing.assert_allclose(df['rsi'], ta.rsi(close, length=14), atol=1e-8, equal_nan=True)
+        np.testing.assert_allclose(df['BBL'], bb[[c for c in bb.columns if c.startswith('BBL')][0]], atol=1e-6, equal_nan=True)
+        np.testing.assert_allclose(df['BBU'], bb[[c for c in bb.columns if c.startswith('BBU')][0]], atol=1e-6, equal_nan=True)
+
+    def test_revising_last_candle(self):
+        close = random_closes(300, seed=4)
+        engine = IndicatorEngine(14, 20, 2.0)
+        for t, c in enumerate(close):
+            engine.update(t, c + 50)  # forming value
+            values = engine.update(t, c)  # final close replaces it
+        self.assertAlmostEqual(values['rsi'], reference_rsi(close, 14).iloc[-1], places=8)
+        self.assertAlmostEqual(values['BBU'], reference_bbands(close, 20, 2.0)[1].iloc[-1], places=6)
+
+    def test_apply_processes_only_new_candles(self):
+        close = random_closes(400, seed=5)
+        df = pd.DataFrame({"time": range(400), "close": close})
+        engine = IndicatorEngine(14, 20, 2.0)
+        self.assertEqual(len(engine.apply(df.iloc[:300])), 300)
+        new = engine.apply(df.iloc[50:])
+        self.assertEqual(list(new['time']), list(range(299, 400)))
+        self.assertAlmostEqual(new['rsi'].iloc[-1], reference_rsi(close, 14).iloc[-1], places=8)
+
+
+class TestPanelIndicators(unittest.TestCase):
+
+    def ragged_panel(self):
+        """Rows of different lengths, NaN-padded on the left (aligned at the newest candle)"""
+        lengths = [600, 450, 30, 15, 0, 600]
+        panel = np.full((len(lengths), 600), np.nan)
+        for i, n in enumerate(lengths):
+            if n:
+                panel[i, 600 - n:] = random_closes(n, seed=10 + i)
+        return panel, lengths
+
+    def test_rows_match_reference(self):
+        panel, lengths = self.ragged_panel()
+        rsi_values = rsi_panel(panel, 14)
+        lower, upper = bollinger_panel(panel, 20, 2.0)
+        for i, n in enumerate(lengths):
+            self.assertTrue(np.isnan(rsi_values[i, :600 - n]).all())
+            self.assertTrue(np.isnan(upper[i, :600 - n]).all())
+            if not n:
+                continue
+            close = pd.Series(panel[i, 600 - n:])
+            ref_lower, ref_upper = reference_bbands(close, 20, 2.0)
+            np.testing.assert_allclose(rsi_values[i, 600 - n:], reference_rsi(close, 14), atol=1e-8, equal_nan=True)
+            np.testing.assert_allclose(lower[i, 600 - n:], ref_lower, atol=1e-6, equal_nan=True)
+            np.testing.assert_allclose(upper[i, 600 - n:], ref_upper, atol=1e-6, equal_nan=True)
+
+    def test_trailing_padding_and_flat_rows(self):
+        panel = np.full((2, 100), np.nan)
+        panel[0, :80] = random_closes(80, seed=20)
+        panel[1, :] = 100.0
+        rsi_values = rsi_panel(panel, 14)
+        lower, _ = bollinger_panel(panel, 20, 2.0)
+        np.testing.assert_allclose(rsi_values[0, :80], rsi(panel[0, :80], 14), atol=1e-8, equal_nan=True)
+        self.assertTrue(np.isnan(rsi_values[0, 80:]).all())
+        self.assertTrue(np.isnan(lower[0, 80:]).all())
+        self.assertTrue(np.isnan(rsi_values[1]).all())  # 0/0 like pandas_ta
+        np.testing.assert_allclose(lower[1, 19:], 100.0)
+
+    def test_short_panel(self):
+        lower, upper = bollinger_panel(random_closes(5).to_numpy()[None, :], 20, 2.0)
+        self.assertTrue(np.isnan(lower).all() and np.isnan(upper).all())
+
+    @unittest.skipIf(ta is None, "pandas_ta not installed")
+    def test_panel_matches_pandas_ta(self):
+        panel, lengths = self.ragged_panel()
+        rsi_values = rsi_panel(panel, 14)
+        for i, n in enumerate(lengths[:2]):
+            close = pd.Series(panel[i, 600 - n:])
+            np.testing.assert_allclose(rsi_values[i, 600 - n:], ta.rsi(close, length=14), atol=1e-8, equal_nan=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from utils.instrument_master import InstrumentMaster, parse_instrument
+from src.scanner import load_watchlist
+
+MASTER = [
+    {"token": "99926000", "symbol": "Nifty 50", "name": "NIFTY", "expiry": "", "strike": "0.000000",
+     "lotsize": "1", "instrumenttype": "AMXIDX", "exch_seg": "NSE", "tick_size": "0.000000"},
+    {"token": "2885", "symbol": "RELIANCE-EQ", "name": "RELIANCE", "expiry": "", "strike": "-1.000000",
+     "lotsize": "1", "instrumenttype": "", "exch_seg": "NSE", "tick_size": "5.000000"},
+    {"token": "500325", "symbol": "RELIANCE", "name": "RELIANCE", "expiry": "", "strike": "-1.000000",
+     "lotsize": "1", "instrumenttype": "", "exch_seg": "BSE", "tick_size": "5.000000"},
+    {"token": "35001", "symbol": "NIFTY26DEC24FUT", "name": "NIFTY", "expiry": "26DEC2024",
+     "strike": "-1.000000", "lotsize": "25", "instrumenttype": "FUTIDX", "exch_seg": "NFO", "tick_size": "10.000000"},
+    {"token": "35002", "symbol": "NIFTY30JAN25FUT", "name": "NIFTY", "expiry": "30JAN2025",
+     "strike": "-1.000000", "lotsize": "25", "instrumenttype": "FUTIDX", "exch_seg": "NFO", "tick_size": "10.000000"},
+]
+for expiry, code in (("19DEC2024", "19DEC24"), ("26DEC2024", "26DEC24")):
+    for strike in (23900, 24000, 24100):
+        for side, token in (("CE", 1), ("PE", 2)):
+            MASTER.append({
+                "token": f"{code}{strike}{token}", "symbol": f"NIFTY{code}{strike}{side}", "name": "NIFTY",
+                "expiry": expiry, "strike": f"{strike * 100}.000000", "lotsize": "25",
+                "instrumenttype": "OPTIDX", "exch_seg": "NFO", "tick_size": "5.000000"
+            })
+
+
+class TestInstrumentMaster(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.master_path = os.path.join(self.tmp.name, "OpenAPIScripMaster.json")
+        self.index_path = os.path.join(self.tmp.name, "instruments.sqlite3")
+        with open(self.master_path, "w") as f:
+            json.dump(MASTER, f)
+        self.master = InstrumentMaster(self.index_path, self.master_path)
+
+    def tearDown(self):
+        self.master.close()
+        self.tmp.cleanup()
+
+    def test_parse_converts_paise_and_expiry(self):
+        row = dict(zip(["exchange", "token", "symbol", "name", "instrument_type", "expiry",
+                        "strike", "option_type", "lot_size", "tick_size"], parse_instrument(MASTER[-1])))
+        self.assertEqual(row["expiry"], "2024-12-26")
+        self.assertEqual(row["strike"], 24100.0)
+        self.assertEqual(row["option_type"], "PE")
+        self.assertEqual(row["lot_size"], 25)
+        self.assertEqual(row["tick_size"], 0.05)
+
+    def test_lookup_by_token_and_symbol(self):
+        self.assertEqual(self.master.count(), len(MASTER))
+        self.assertEqual(self.master.by_token("2885")["symbol"], "RELIANCE-EQ")
+        self.assertEqual(self.master.by_symbol("NIFTY 50", "NSE")["token"], "99926000")
+        self.assertEqual(self.master.by_symbol("RELIANCE", "NSE")["token"], "2885")
+        self.assertEqual(self.master.by_symbol("RELIANCE", "BSE")["token"], "500325")
+        self.assertIsNone(self.master.by_symbol("UNKNOWN"))
+        self.assertIsNone(self.master.by_token("1", "NSE"))
+
+    def test_expiries_futures_and_chain(self):
+        self.assertEqual(self.master.expiries("NIFTY"), ["2024-12-19", "2024-12-26", "2025-01-30"])
+        self.assertEqual(self.master.expiries("NIFTY", instrument_type="OPT"), ["2024-12-19", "2024-12-26"])
+        self.assertEqual([f["symbol"] for f in self.master.futures("NIFTY")],
+                         ["NIFTY26DEC24FUT", "NIFTY30JAN25FUT"])
+
+        chain = self.master.option_chain("NIFTY", "2024-12-26", strikes=(24000, 24100))
+        self.assertEqual([(c["strike"], c["option_type"]) for c in chain],
+                         [(24000.0, "CE"), (24000.0, "PE"), (24100.0, "CE"), (24100.0, "PE")])
+        # Nearest expiry by default (both sample expiries are past → earliest)
+        self.assertEqual({c["expiry"] for c in self.master.option_chain("NIFTY")}, {"2024-12-19"})
+
+    def test_index_reused_until_master_changes(self):
+        self.master.close()
+        with mock.patch.object(InstrumentMaster, "build") as build:
+            self.master = InstrumentMaster(self.index_path, self.master_path)
+            build.assert_not_called()
+        self.assertEqual(self.master.count(), len(MASTER))
+
+        with open(self.master_path, "w") as f:
+            json.dump(MASTER[:2], f)
+        os.utime(self.master_path, (time.time() + 5, time.time() + 5))
+        self.assertTrue(self.master.refresh())
+        self.assertEqual(self.master.count(), 2)
+
+    def test_watchlist_tokens_resolved_by_symbol(self):
+        path = os.path.join(self.tmp.name, "watchlist.csv")
+        with open(path, "w") as f:
+            f.write("symbol,token,exchange\nNIFTY 50,99926000,NSE\nRELIANCE,,NSE\nUNKNOWN,,NSE\n")
+        with mock.patch("src.scanner.open_instrument_master", return_value=self.master):
+            watchlist = load_watchlist(path)
+        self.assertEqual([(w["symbol"], w["token"]) for w in watchlist],
+                         [("NIFTY 50", "99926000"), ("RELIANCE", "2885")])
+
+
+if __name__ == '__main__':
+    unittest.main()
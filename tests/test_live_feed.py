@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from src.scanner import WatchlistScanner
+from utils.live_feed import LiveFeed, ReplayWebSocket, CandleAggregator, IST
+
+
+def record_ticks(path, tokens, start, minutes, every_seconds=10):
+    """Write SmartWebSocketV2-style QUOTE ticks; price walks up then down"""
+    ticks = []
+    for step in range(minutes * 60 // every_seconds):
+        ts = start + timedelta(seconds=step * every_seconds)
+        for n, token in enumerate(tokens):
+            price = 100 + n + (step % 37) - (step % 11) * 0.5
+            ticks.append({
+                "token": token,
+                "exchange_timestamp": int(ts.timestamp() * 1000),
+                "last_traded_price": int(round(price * 100)),
+                "volume_trade_for_the_day": (step + 1) * 10,
+            })
+    with open(path, "w", encoding="utf-8") as f:
+        for tick in ticks:
+            f.write(json.dumps(tick) + "\n")
+    return ticks
+
+
+class TestLiveFeed(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "ticks.jsonl")
+        self.start = datetime(2024, 1, 1, 9, 15, tzinfo=IST)
+        self.ticks = record_ticks(self.path, ["99926000", "2885"], self.start, minutes=30)
+        self.watchlist = [
+            {"symbol": "NIFTY 50", "token": "99926000", "exchange": "NSE"},
+            {"symbol": "RELIANCE-EQ", "token": "2885", "exchange": "NSE"},
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def replay(self):
+        feed = LiveFeed(None, self.watchlist, 5, ws_factory=lambda: ReplayWebSocket(self.path),
+                        flush_interval=None)
+        feed.start()
+        feed.join(timeout=10)
+        feed.aggregator.flush(self.start + timedelta(minutes=30))
+        candles = []
+        while not feed.candles.empty():
+            candles.append(feed.candles.get())
+        return feed, candles
+
+    def test_replayed_ticks_build_candles(self):
+        feed, candles = self.replay()
+        self.assertEqual(feed.ticks, len(self.ticks))
+        nifty = [c for token, c in candles if token == "99926000"]
+        self.assertEqual(len(nifty), 6)
+        self.assertEqual([c['time'].strftime('%H:%M') for c in nifty],
+                         ["09:15", "09:20", "09:25", "09:30", "09:35", "09:40"])
+
+        first = [t for t in self.ticks if t["token"] == "99926000"][:30]
+        prices = [t["last_traded_price"] / 100 for t in first]
+        self.assertEqual(nifty[0]['open'], prices[0])
+        self.assertEqual(nifty[0]['close'], prices[-1])
+        self.assertEqual(nifty[0]['high'], max(prices))
+        self.assertEqual(nifty[0]['low'], min(prices))
+        self.assertEqual(nifty[1]['volume'], 300)
+
+    def test_closed_candles_feed_the_strategy(self):
+        _, candles = self.replay()
+        scanner = WatchlistScanner(None, self.watchlist, timeframe="FIVE_MINUTE")
+        results = [scanner.on_candle(token, candle) for token, candle in candles]
+        self.assertTrue(all(results))
+        self.assertEqual(scanner.states["2885"]["FIVE_MINUTE"].detector.count, 6)
+
+    def test_hourly_buckets_anchor_to_session_open(self):
+        aggregator = CandleAggregator(60, lambda *a: None)
+        ts = datetime(2024, 1, 1, 10, 14, tzinfo=IST)
+        self.assertEqual(aggregator.bucket_start(ts), datetime(2024, 1, 1, 9, 15, tzinfo=IST))
+        ts = datetime(2024, 1, 1, 10, 15, tzinfo=IST)
+        self.assertEqual(aggregator.bucket_start(ts), ts)
+
+    def test_last_hourly_bucket_is_cut_at_session_close(self):
+        closed = []
+        aggregator = CandleAggregator(60, lambda token, candle: closed.append(candle))
+        aggregator.add_tick("1", datetime(2024, 1, 1, 15, 20, tzinfo=IST), 100.0)
+        aggregator.add_tick("1", datetime(2024, 1, 1, 15, 29, tzinfo=IST), 101.0)
+        aggregator.add_tick("1", datetime(2024, 1, 1, 15, 35, tzinfo=IST), 99.0)  # after the close
+
+        aggregator.flush(datetime(2024, 1, 1, 15, 30, 5, tzinfo=IST), grace_seconds=10)
+        self.assertEqual(closed, [])
+        aggregator.flush(datetime(2024, 1, 1, 15, 30, 10, tzinfo=IST), grace_seconds=10)
+        self.assertEqual(len(closed), 1)
+        self.assertEqual(closed[0]['time'], datetime(2024, 1, 1, 15, 15, tzinfo=IST))
+        self.assertEqual((closed[0]['low'], closed[0]['close']), (100.0, 101.0))
+
+class TestRunLiveFeed(unittest.TestCase):
+
+    def test_warm_up_signals_are_reported(self):
+        from src import main
+
+        warm_up = [{"item": {"symbol": "NIFTY 50", "token": "1"}, "timeframe": "FIVE_MINUTE",
+                    "signal": {"type": "BULLISH"}}]
+        scanner = mock.Mock(watchlist=[], fetch_timeframe="FIVE_MINUTE")
+        scanner.scan_cycle.return_value = warm_up
+        feed = mock.Mock()
+        feed.candles.get.side_effect = KeyboardInterrupt
+        with mock.patch("utils.live_feed.LiveFeed", return_value=feed), \
+                mock.patch.object(main, "report_result") as report:
+            main.run_live_feed(None, scanner)
+        report.assert_called_once_with(warm_up[0])
+        feed.stop.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
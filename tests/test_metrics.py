@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from utils.metrics import LatencyMetrics
+
+
+class TestLatencyMetrics(unittest.TestCase):
+
+    def test_rolling_percentiles(self):
+        metrics = LatencyMetrics(window=100)
+        for value in range(1, 201):  # only the last 100 (101..200) are kept
+            metrics.observe("fetch", value / 1000)
+        stats = metrics.snapshot()["latency"]["fetch"]
+        self.assertEqual(stats["count"], 200)
+        self.assertAlmostEqual(stats["p50"], 0.150)
+        self.assertAlmostEqual(stats["p95"], 0.195)
+        self.assertAlmostEqual(stats["p99"], 0.199)
+        self.assertAlmostEqual(stats["max"], 0.200)
+        self.assertAlmostEqual(stats["last"], 0.200)
+
+    def test_span_and_counters_from_threads(self):
+        metrics = LatencyMetrics()
+
+        def work():
+            for _ in range(50):
+                with metrics.span("strategy"):
+                    time.sleep(0.001)
+                metrics.increment("fetch_retries")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        snap = metrics.snapshot()
+        self.assertEqual(snap["latency"]["strategy"]["count"], 200)
+        self.assertGreaterEqual(snap["latency"]["strategy"]["p50"], 0.001)
+        self.assertEqual(snap["counters"]["fetch_retries"], 200)
+
+    def test_exports(self):
+        metrics = LatencyMetrics()
+        metrics.observe("wait", 12.5)
+        metrics.increment("fetch_requests", 3)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.jsonl")
+            metrics.export(path, cycle_seconds=0.4)
+            metrics.export(path, cycle_seconds=0.5)
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual([line["cycle_seconds"] for line in lines], [0.4, 0.5])
+            self.assertEqual(lines[0]["latency"]["wait"]["p99"], 12.5)
+
+            prom = os.path.join(tmp, "bot.prom")
+            metrics.export(prom, "prometheus")
+            with open(prom) as f:
+                text = f.read()
+        self.assertIn('rsi_bot_stage_seconds{stage="wait",quantile="0.95"} 12.500000', text)
+        self.assertIn('rsi_bot_stage_seconds_count{stage="wait"} 1', text)
+        self.assertIn("rsi_bot_fetch_requests_total 3", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import threading
+import time
+import unittest
+
+from utils.rate_limiter import RateLimiter, PRIORITY_LIVE, PRIORITY_BACKFILL, is_throttle_message
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_sustained_rate_respects_limit(self):
+        limiter = RateLimiter([(5, 0.5)])
+        started = time.monotonic()
+        for _ in range(15):
+            limiter.acquire()
+        elapsed = time.monotonic() - started
+        # 5 burst tokens, then 10 more at 10/s
+        self.assertGreaterEqual(elapsed, 0.9)
+        self.assertLess(elapsed, 1.5)
+        self.assertEqual(limiter.snapshot()["requests"], 15)
+        self.assertEqual(limiter.snapshot()["queued"], 10)
+
+    def test_live_lane_overtakes_backfill(self):
+        limiter = RateLimiter([(1, 0.2)])
+        limiter.acquire()  # empty the bucket
+        order = []
+
+        def worker(priority, label):
+            limiter.acquire(priority)
+            order.append(label)
+
+        threads = [threading.Thread(target=worker, args=(PRIORITY_BACKFILL, f"backfill{i}")) for i in range(3)]
+        for t in threads:
+            t.start()
+        time.sleep(0.01)
+        live = threading.Thread(target=worker, args=(PRIORITY_LIVE, "live"))
+        live.start()
+        for t in threads + [live]:
+            t.join()
+        self.assertEqual(order[0], "live")
+
+    def test_throttle_pauses_all_callers(self):
+        limiter = RateLimiter([(100, 1)], backoff_base=0.2)
+        delay = limiter.record_throttle(attempt=0)
+        self.assertTrue(0.1 <= delay <= 0.2)
+        started = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, delay * 0.9)
+        self.assertEqual(limiter.snapshot()["throttled"], 1)
+
+    def test_throttle_message_detection(self):
+        self.assertTrue(is_throttle_message("Access denied because of exceeding access rate"))
+        self.assertFalse(is_throttle_message("Invalid Token"))
+
+if __name__ == '__main__':
+    unittest.main()
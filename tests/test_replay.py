@@ -0,0 +1,69 @@
+import unittest
+from datetime import datetime, timedelta
+
+import logging
+import logzero
+
+from src.indicators import IndicatorEngine
+from src.main import build_scanner, run_replay
+from src.strategy import scan_divergences
+from tests.synthetic import generate_candles
+from utils.replay import ReplayApiHelper, ReplayClock, IST
+
+WATCHLIST = [{"symbol": "SYN", "token": "1", "exchange": "NSE"}]
+
+
+class TestReplayApiHelper(unittest.TestCase):
+
+    def setUp(self):
+        self.df = generate_candles(150, seed=3, start=datetime(2024, 1, 1, tzinfo=IST))
+        self.clock = ReplayClock(datetime(2024, 1, 1, 9, 15, tzinfo=IST))
+        self.api = ReplayApiHelper(self.clock, frames={("1", "FIVE_MINUTE"): self.df})
+
+    def test_only_closed_candles_are_served(self):
+        self.clock.sleep(12 * 60)  # 09:27: the 09:25 candle is still forming
+        df = self.api.fetch_candles("1", "NSE", "FIVE_MINUTE", days=5)
+        self.assertEqual(len(df), 2)
+        self.assertEqual(df['time'].iloc[-1], datetime(2024, 1, 1, 9, 20, tzinfo=IST))
+        self.assertEqual(self.api.rate_limiter.snapshot()["requests"], 1)
+
+    def test_days_window_and_unknown_series(self):
+        self.clock.sleep(2 * 86400)  # Wednesday 09:15
+        df = self.api.fetch_candles("1", "NSE", "FIVE_MINUTE", days=1)
+        self.assertEqual(df['time'].iloc[0], datetime(2024, 1, 2, 9, 15, tzinfo=IST))
+        self.assertIsNone(self.api.fetch_candles("2", "NSE", "FIVE_MINUTE"))
+
+    def test_candle_span(self):
+        first, last = self.api.candle_span(WATCHLIST, "FIVE_MINUTE")
+        self.assertEqual(first, self.df['time'].iloc[0])
+        self.assertEqual(last, self.df['time'].iloc[-1])
+
+
+class TestRunReplay(unittest.TestCase):
+
+    def setUp(self):
+        logzero.loglevel(logging.WARNING)
+
+    def tearDown(self):
+        logzero.loglevel(logging.DEBUG)
+
+    def test_alerts_match_backtest_scan(self):
+        df = generate_candles(3 * 75, seed=7, start=datetime(2024, 1, 1, tzinfo=IST))
+        clock = ReplayClock(df['time'].iloc[0])
+        api = ReplayApiHelper(clock, frames={("1", "FIVE_MINUTE"): df})
+        scanner = build_scanner(api, WATCHLIST)
+
+        report = run_replay(api, scanner, clock, df['time'].iloc[-1] + timedelta(minutes=5))
+
+        self.assertEqual(report["cycles"], len(df))
+        self.assertEqual(report["candles"], len(df))
+        self.assertEqual(len(report["messages"]), len(report["alerts"]))
+
+        expected = scan_divergences(IndicatorEngine().warm_up(df.copy()))
+        replayed = [(r["signal"]["confirmation_time"], r["signal"]["type"]) for r in report["alerts"]]
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(replayed, list(zip(expected['confirmation_time'], expected['type'])))
+
+
+if __name__ == '__main__':
+    unittest.main()
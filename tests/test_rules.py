@@ -1,10 +1,10 @@
 import pandas as pd
 import unittest
-from bot import check_divergence
+from src.strategy import check_divergence
 
 class TestRSIDivergence(unittest.TestCase):
     
-    def create_candle(self, open_p, close_p, rsi, time="2024-01-01 12:00:00"):
+    def create_candle(self, open_p, close_p, rsi, time="2024-01-01 12:00:00", volume=0):
         return {
             "time": time,
             "open": open_p, 
@@ -12,7 +12,7 @@ class TestRSIDivergence(unittest.TestCase):
             "rsi": rsi, 
             "high": max(open_p, close_p) + 10, 
             "low": min(open_p, close_p) - 10,
-            "volume": 100
+            "volume": volume  # 0 = index data, volume rule skipped
         }
 
     def test_bullish_divergence_valid(self):
@@ -24,7 +24,9 @@ class TestRSIDivergence(unittest.TestCase):
             self.create_candle(100, 90, 30), 
             self.create_candle(92, 95, 35), # Noise
             # B (Red, Lower Price, Higher RSI)
-            self.create_candle(88, 85, 32)  
+            self.create_candle(88, 85, 32),
+            # Confirmation (Green)
+            self.create_candle(86, 90, 40)
         ]
         df = pd.DataFrame(data)
         result = check_divergence(df)
@@ -43,7 +45,9 @@ class TestRSIDivergence(unittest.TestCase):
             self.create_candle(100, 110, 70), 
             self.create_candle(108, 105, 65), # Noise
             # B (Green, Higher Price, Lower RSI)
-            self.create_candle(112, 115, 68)  
+            self.create_candle(112, 115, 68),
+            # Confirmation (Red)
+            self.create_candle(114, 111, 60)
         ]
         df = pd.DataFrame(data)
         result = check_divergence(df)
@@ -63,9 +67,10 @@ class TestRSIDivergence(unittest.TestCase):
             self.create_candle(90, 100, 30), 
             self.create_candle(95, 92, 35), 
             # B (Red, Lower Close than A, Higher RSI than A)
-            self.create_candle(98, 95, 32)
+            self.create_candle(98, 95, 32),
             # wait, Close A=100, Close B=95. Higher RSI check: 32 > 30.
             # Divergence exists mathematically, but Color Rule checks A/B match.
+            self.create_candle(94, 99, 40)  # Confirmation (Green)
         ]
         df = pd.DataFrame(data)
         result = check_divergence(df)
@@ -82,13 +87,31 @@ class TestRSIDivergence(unittest.TestCase):
             data.append(self.create_candle(90, 90, 35))
         # B
         data.append(self.create_candle(88, 85, 32))
+        # Confirmation (Green)
+        data.append(self.create_candle(86, 90, 40))
 
         df = pd.DataFrame(data)
-        # Total len = 1 + 6 + 1 = 8
+        # Total len = 1 + 6 + 1 = 8 (+ confirmation)
         
         result = check_divergence(df)
         self.assertIsNone(result)
         print("✅ test_distance_too_long Passed")
 
+    def test_volume_rule(self):
+        """
+        With volume data, Point A volume must exceed Point B volume
+        """
+        data = [
+            self.create_candle(100, 90, 30, volume=500),  # A
+            self.create_candle(92, 95, 35, volume=300),
+            self.create_candle(88, 85, 32, volume=800),   # B (more volume than A)
+            self.create_candle(86, 90, 40, volume=300)    # Confirmation
+        ]
+        self.assertIsNone(check_divergence(pd.DataFrame(data)))
+
+        data[2]['volume'] = 200
+        self.assertIsNotNone(check_divergence(pd.DataFrame(data)))
+        print("✅ test_volume_rule Passed")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.strategy import (
+    check_divergence, scan_divergences, DivergenceDetector, Candles, DivergenceSignal, find_divergence
+)
+
+
+def make_candles(n, seed=0, with_bb=True, zero_volume=False):
+    """Random candles with noisy RSI / BB columns so that many signals fire."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 1, n)
+    df = pd.DataFrame({
+        "time": pd.date_range("2024-01-01 09:15", periods=n, freq="5min"),
+        "open": open_,
+        "high": np.maximum(open_, close) + rng.uniform(0, 1, n),
+        "low": np.minimum(open_, close) - rng.uniform(0, 1, n),
+        "close": close,
+        "volume": np.zeros(n) if zero_volume else rng.integers(0, 1000, n).astype(float),
+        "rsi": rng.uniform(20, 80, n),
+    })
+    df.loc[:5, "rsi"] = np.nan
+    if with_bb:
+        df["BBU"] = df["close"] + rng.uniform(-0.5, 2, n)
+        df["BBL"] = df["close"] - rng.uniform(-0.5, 2, n)
+    return df
+
+
+class TestScanDivergences(unittest.TestCase):
+
+    def assert_parity(self, df):
+        table = scan_divergences(df).set_index("index")
+        expected = {}
+        for i in range(len(df)):
+            signal = check_divergence(df.iloc[:i + 1])
+            if signal:
+                expected[i] = signal
+
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(sorted(expected), list(table.index))
+        for i, signal in expected.items():
+            row = table.loc[i]
+            for key, value in signal.items():
+                self.assertEqual(row[key], value, f"{key} differs at candle {i}")
+
+    def test_parity_with_bollinger_bands(self):
+        self.assert_parity(make_candles(600, seed=1))
+
+    def test_parity_without_bollinger_bands(self):
+        self.assert_parity(make_candles(400, seed=2, with_bb=False))
+
+    def test_parity_zero_volume_index(self):
+        self.assert_parity(make_candles(400, seed=3, zero_volume=True))
+
+    def test_short_input(self):
+        self.assertTrue(scan_divergences(make_candles(3)).empty)
+        self.assertTrue(scan_divergences(None).empty)
+
+
+class TestDivergenceDetector(unittest.TestCase):
+
+    def assert_streaming_parity(self, df, use_bb=True):
+        detector = DivergenceDetector(use_bb=use_bb)
+        fired = 0
+        for i in range(len(df)):
+            signal = detector.update(df.iloc[i])
+            expected = check_divergence(df.iloc[:i + 1])
+            self.assertEqual(signal, expected, f"candle {i}")
+            fired += signal is not None
+        self.assertGreater(fired, 0)
+
+    def test_streaming_parity(self):
+        self.assert_streaming_parity(make_candles(500, seed=4))
+
+    def test_streaming_parity_without_bb(self):
+        self.assert_streaming_parity(make_candles(300, seed=5, with_bb=False), use_bb=False)
+
+    def test_sync_matches_full_history(self):
+        df = make_candles(400, seed=6)
+        detector = DivergenceDetector()
+        detector.sync(df.iloc[:200])
+        for end in range(201, len(df) + 1):
+            self.assertEqual(detector.sync(df.iloc[:end]), check_divergence(df.iloc[:end]))
+
+    def test_revised_candle_replaces_newest(self):
+        df = make_candles(300, seed=7)
+        detector = DivergenceDetector()
+        detector.sync(df.iloc[:100])
+        forming = df.iloc[100].copy()
+        forming['close'] = forming['open']
+        detector.update(forming)
+        self.assertEqual(detector.update(df.iloc[100]), check_divergence(df.iloc[:101]))
+        self.assertEqual(detector.count, 101)
+
+
+class TestColumnarCandles(unittest.TestCase):
+
+    def test_candles_match_dataframe(self):
+        df = make_candles(600, seed=21)
+        candles = Candles.from_frame(df)
+        fired = 0
+        for i in range(4, len(df) + 1):
+            expected = check_divergence(df.iloc[:i])
+            signal = find_divergence(Candles.from_frame(df.iloc[:i]))
+            self.assertEqual(signal.to_dict() if signal else None, expected)
+            fired += expected is not None
+        self.assertGreater(fired, 0)
+        self.assertEqual(check_divergence(candles), check_divergence(df))
+        self.assertEqual(find_divergence(candles.tail(8)), find_divergence(candles))
+
+    def test_signal_is_slotted_and_subscriptable(self):
+        df = make_candles(600, seed=21)
+        table = scan_divergences(df)
+        i = int(table["index"].iloc[0])
+        signal = find_divergence(Candles.from_frame(df.iloc[:i + 1]))
+        self.assertIsInstance(signal, DivergenceSignal)
+        self.assertFalse(hasattr(signal, "__dict__"))
+        self.assertEqual(signal["type"], signal.type)
+        self.assertEqual(signal.get("missing", 1), 1)
+        self.assertEqual(signal["confirmation_time"], df['time'].iloc[i])
+
+if __name__ == '__main__':
+    unittest.main()
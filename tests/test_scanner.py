@@ -0,0 +1,64 @@
+import time
+import unittest
+
+from src.scanner import WatchlistScanner, to_ist
+from src.strategy import check_divergence
+from src.indicators import IndicatorEngine
+from tests.test_scan import make_candles
+from utils.metrics import LatencyMetrics
+
+
+class FakeApi:
+    """fetch_candles stand-in with a fixed network delay"""
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+
+    def fetch_candles(self, symbol_token, exchange, timeframe, days=5):
+        time.sleep(self.delay)
+        df = make_candles(300, seed=int(symbol_token))
+        return df[["time", "open", "high", "low", "close", "volume"]]
+
+
+class TestWatchlistScanner(unittest.TestCase):
+
+    def test_cycle_is_concurrent_and_matches_strategy(self):
+        watchlist = [{"symbol": f"SYM{i}", "token": str(i), "exchange": "NSE"} for i in range(40)]
+        scanner = WatchlistScanner(FakeApi(), watchlist, timeframe="FIVE_MINUTE", max_workers=20)
+
+        results = scanner.scan_cycle()
+
+        self.assertEqual(len(results), 40)
+        self.assertLess(scanner.last_cycle_seconds, 1.5)  # serial would take 4s
+        for result in results:
+            df = make_candles(300, seed=int(result["item"]["token"]))
+            df = df[["time", "open", "high", "low", "close", "volume"]].copy()
+            df['time'] = to_ist(df['time'])
+            IndicatorEngine().warm_up(df)
+            self.assertEqual(result["signal"], check_divergence(df))
+
+    def test_failing_symbol_does_not_stop_cycle(self):
+        class BrokenApi(FakeApi):
+            def fetch_candles(self, symbol_token, *args, **kwargs):
+                if symbol_token == "1":
+                    raise RuntimeError("boom")
+                return super().fetch_candles(symbol_token, *args, **kwargs)
+
+        watchlist = [{"symbol": f"SYM{i}", "token": str(i), "exchange": "NSE"} for i in range(3)]
+        results = WatchlistScanner(BrokenApi(delay=0), watchlist, timeframe="FIVE_MINUTE").scan_cycle()
+        self.assertEqual(sorted(r["item"]["token"] for r in results), ["0", "2"])
+
+    def test_stage_spans_are_recorded(self):
+        metrics = LatencyMetrics()
+        watchlist = [{"symbol": f"SYM{i}", "token": str(i), "exchange": "NSE"} for i in range(4)]
+        WatchlistScanner(FakeApi(delay=0.05), watchlist, timeframe="FIVE_MINUTE",
+                         metrics=metrics).scan_cycle()
+        latency = metrics.snapshot()["latency"]
+        self.assertEqual(latency["fetch"]["count"], 4)
+        self.assertGreaterEqual(latency["fetch"]["p50"], 0.05)
+        self.assertEqual(latency["indicators"]["count"], 4)
+        self.assertEqual(latency["strategy"]["count"], 4)
+        self.assertEqual(latency["scan_cycle"]["count"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+from datetime import datetime, timedelta
+
+from utils.candle_source import SESSION_24X7
+from utils.metrics import LatencyMetrics
+from utils.scheduler import CandleCloseScheduler, session_closes, IST
+
+
+class FakeClock:
+    """Wall clock and monotonic clock that only move when sleep() is called"""
+
+    def __init__(self, start, drift=0.0):
+        self.wall = start
+        self.mono = 1000.0
+        self.drift = drift  # extra seconds each sleep overshoots by
+        self.sleeps = []
+
+    def now(self):
+        return self.wall
+
+    def monotonic(self):
+        return self.mono
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        seconds += self.drift
+        self.mono += seconds
+        self.wall += timedelta(seconds=seconds)
+
+
+def ist(*args):
+    return datetime(*args, tzinfo=IST)
+
+
+class TestSessionCloses(unittest.TestCase):
+
+    def test_hourly_last_candle_cut_at_close(self):
+        closes = session_closes(ist(2024, 1, 8).date(), 60)
+        self.assertEqual([c.strftime("%H:%M") for c in closes],
+                         ["10:15", "11:15", "12:15", "13:15", "14:15", "15:15", "15:30"])
+
+    def test_five_minute_and_daily(self):
+        closes = session_closes(ist(2024, 1, 8).date(), 5)
+        self.assertEqual(len(closes), 75)
+        self.assertEqual(closes[0], ist(2024, 1, 8, 9, 20))
+        self.assertEqual(session_closes(ist(2024, 1, 8).date(), 1440), [ist(2024, 1, 8, 15, 30)])
+
+    def test_round_the_clock_session_ends_next_day(self):
+        closes = session_closes(ist(2024, 1, 6).date(), 60, (5, 30), (5, 30))
+        self.assertEqual(len(closes), 24)
+        self.assertEqual(closes[0], ist(2024, 1, 6, 6, 30))
+        self.assertEqual(closes[-1], ist(2024, 1, 7, 5, 30))
+
+
+class TestCandleCloseScheduler(unittest.TestCase):
+
+    def make(self, start, timeframes=("FIVE_MINUTE", "FIFTEEN_MINUTE", "ONE_HOUR"), drift=0.0,
+             session=None):
+        clock = FakeClock(start, drift)
+        metrics = LatencyMetrics()
+        scheduler = CandleCloseScheduler(list(timeframes), buffer_seconds=15, metrics=metrics,
+                                         now=clock.now, monotonic=clock.monotonic, sleep=clock.sleep,
+                                         session=session)
+        return scheduler, clock, metrics
+
+    def test_coinciding_closes_fire_together(self):
+        scheduler, clock, _ = self.make(ist(2024, 1, 8, 10, 11))  # Monday
+        close, timeframes, late = scheduler.wait()
+        self.assertEqual(close, ist(2024, 1, 8, 10, 15))
+        self.assertEqual(timeframes, ["FIVE_MINUTE", "FIFTEEN_MINUTE", "ONE_HOUR"])
+        self.assertEqual(clock.wall, ist(2024, 1, 8, 10, 15, 15))
+        self.assertEqual(late, 0)
+
+        close, timeframes, _ = scheduler.wait()
+        self.assertEqual(close, ist(2024, 1, 8, 10, 20))
+        self.assertEqual(timeframes, ["FIVE_MINUTE"])
+
+    def test_long_waits_are_not_skipped(self):
+        scheduler, clock, _ = self.make(ist(2024, 1, 8, 10, 16), timeframes=["ONE_HOUR"])
+        close, _, _ = scheduler.wait()
+        self.assertEqual(close, ist(2024, 1, 8, 11, 15))
+        self.assertEqual(clock.wall, ist(2024, 1, 8, 11, 15, 15))
+        self.assertTrue(all(s <= 60 for s in clock.sleeps))
+
+    def test_overnight_and_weekend(self):
+        scheduler, _, _ = self.make(ist(2024, 1, 12, 15, 31))  # Friday after close
+        close, timeframes = scheduler.next_event()
+        self.assertEqual(close, ist(2024, 1, 15, 9, 20))  # Monday
+        self.assertEqual(timeframes, ["FIVE_MINUTE"])
+
+        close, _ = scheduler.next_event(ist(2024, 1, 15, 15, 15))
+        self.assertEqual(close, ist(2024, 1, 15, 15, 20))
+
+    def test_round_the_clock_market(self):
+        timeframes = ["FIVE_MINUTE", "ONE_HOUR", "ONE_DAY"]
+        scheduler, _, _ = self.make(ist(2024, 1, 7, 2, 1), timeframes, session=SESSION_24X7)  # Sunday night
+        self.assertEqual(scheduler.next_event(), (ist(2024, 1, 7, 2, 5), ["FIVE_MINUTE"]))
+        # Hourly / daily candles follow UTC boundaries (xx:30 IST, daily at 05:30 IST)
+        self.assertEqual(scheduler.next_event(ist(2024, 1, 7, 2, 25)),
+                         (ist(2024, 1, 7, 2, 30), ["FIVE_MINUTE", "ONE_HOUR"]))
+        self.assertEqual(scheduler.next_event(ist(2024, 1, 7, 5, 25)),
+                         (ist(2024, 1, 7, 5, 30), timeframes))
+
+    def test_session_close_ends_every_timeframe(self):
+        scheduler, _, _ = self.make(ist(2024, 1, 8, 15, 26),
+                                    timeframes=["FIVE_MINUTE", "ONE_HOUR", "ONE_DAY"])
+        close, timeframes = scheduler.next_event()
+        self.assertEqual(close, ist(2024, 1, 8, 15, 30))
+        self.assertEqual(timeframes, ["FIVE_MINUTE", "ONE_HOUR", "ONE_DAY"])
+
+    def test_within_buffer_fires_immediately(self):
+        scheduler, clock, _ = self.make(ist(2024, 1, 8, 10, 15, 5))
+        close, _, _ = scheduler.wait()
+        self.assertEqual(close, ist(2024, 1, 8, 10, 15))
+        self.assertEqual(clock.wall, ist(2024, 1, 8, 10, 15, 15))
+
+    def test_wakeup_lateness_recorded(self):
+        scheduler, _, metrics = self.make(ist(2024, 1, 8, 10, 19), drift=0.5)
+        _, _, late = scheduler.wait()
+        self.assertGreater(late, 0)
+        self.assertEqual(metrics.snapshot()["latency"]["wakeup_late"]["count"], 1)
+
+    def test_callbacks_per_timeframe(self):
+        scheduler, _, _ = self.make(ist(2024, 1, 8, 10, 26))
+        fired = []
+        scheduler.on_close("FIVE_MINUTE", lambda tf, t: fired.append((tf, t.strftime("%H:%M"))))
+        scheduler.on_close("FIFTEEN_MINUTE", lambda tf, t: fired.append((tf, t.strftime("%H:%M"))))
+        scheduler.run_once()
+        scheduler.run_once()
+        self.assertEqual(fired, [("FIVE_MINUTE", "10:30"), ("FIFTEEN_MINUTE", "10:30"),
+                                 ("FIVE_MINUTE", "10:35")])
+
+
+if __name__ == '__main__':
+    unittest.main()
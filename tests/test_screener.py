@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from src.indicators import IndicatorEngine
+from src.screener import frame_to_array, load_universe, screen_universe, SCREEN_COLUMNS
+from src.strategy import scan_divergences
+from tests.synthetic import generate_candles
+from utils.candle_store import CandleStore, IST
+
+SYMBOLS = 12
+RECENT = 40
+
+
+def universe_and_candles(n=600):
+    universe = [{"symbol": f"SYN{i}", "token": str(i), "exchange": "NSE"} for i in range(SYMBOLS)]
+    frames = [generate_candles(n - 7 * i, seed=i) for i in range(SYMBOLS)]
+    return universe, frames
+
+
+class TestScreener(unittest.TestCase):
+
+    def setUp(self):
+        self.universe, self.frames = universe_and_candles()
+        arrays = [frame_to_array(df) for df in self.frames]
+        arrays[3] = None  # symbol without candles
+        self.candles = {"FIVE_MINUTE": arrays, "ONE_HOUR": arrays[:6] + [None] * (SYMBOLS - 6)}
+
+    def expected(self, i):
+        df = IndicatorEngine().warm_up(self.frames[i].copy())
+        signals = scan_divergences(df)
+        signals = signals[signals['index'] >= len(df) - RECENT]
+        return sorted((len(df) - 1 - k, t) for k, t in zip(signals['index'], signals['type']))
+
+    def test_matches_full_history_scan(self):
+        table = screen_universe(self.universe, self.candles, recent=RECENT, workers=1)
+        self.assertEqual(list(table.columns), SCREEN_COLUMNS)
+        self.assertGreater(len(table), 0)
+
+        five = table[table['timeframe'] == "FIVE_MINUTE"]
+        for i in range(SYMBOLS):
+            got = sorted(zip(five[five['token'] == str(i)]['bars_ago'], five[five['token'] == str(i)]['type']))
+            self.assertEqual(got, [] if i == 3 else self.expected(i), f"symbol {i}")
+
+        row = five.iloc[0]
+        df = self.frames[int(row['token'])]
+        self.assertEqual(row['confirmation_time'], df['time'].iloc[len(df) - 1 - row['bars_ago']])
+        self.assertEqual(row['last_close'], df['close'].iloc[-1])
+
+    def test_ranked_newest_first(self):
+        table = screen_universe(self.universe, self.candles, recent=RECENT, workers=1)
+        self.assertEqual(list(table['rank']), list(range(1, len(table) + 1)))
+        self.assertTrue(table['bars_ago'].is_monotonic_increasing)
+
+    def test_shared_memory_workers_match_in_process(self):
+        single = screen_universe(self.universe, self.candles, recent=RECENT, workers=1)
+        pooled = screen_universe(self.universe, self.candles, recent=RECENT, workers=2)
+        self.assertTrue(single.equals(pooled))
+
+    def test_empty_universe(self):
+        table = screen_universe(self.universe, {"FIVE_MINUTE": [None] * SYMBOLS}, workers=1)
+        self.assertTrue(table.empty)
+        self.assertEqual(list(table.columns), SCREEN_COLUMNS)
+
+
+class TestLoadUniverse(unittest.TestCase):
+
+    def test_loads_packed_arrays_from_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CandleStore(os.path.join(tmp, "candles.sqlite3"))
+            df = generate_candles(50, seed=1, start=datetime.now(IST) - timedelta(days=10))
+            store.save("1", "NSE", "FIVE_MINUTE", df, 5, datetime.now(IST))
+            universe = [{"symbol": "A", "token": "1", "exchange": "NSE"},
+                        {"symbol": "B", "token": "2", "exchange": "NSE"}]
+
+            candles = load_universe(store, universe, ["FIVE_MINUTE"], days=30)
+            store.close()
+
+        arrays = candles["FIVE_MINUTE"]
+        self.assertIsNone(arrays[1])
+        self.assertEqual(arrays[0].shape, (6, 50))
+        self.assertEqual(arrays[0].tolist(), frame_to_array(df).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
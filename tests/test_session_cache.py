@@ -0,0 +1,98 @@
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from utils.api_helpers import AngelOneApiHelper
+from utils.session_cache import SessionCache, token_expiry
+
+
+def make_jwt(expires_in=3600, tag="a"):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": time.time() + expires_in, "tag": tag}).encode())
+    return f"header.{payload.decode().rstrip('=')}.signature"
+
+
+class FakeSmartConnect:
+    """Counts logins / refreshes instead of calling Angel One"""
+    sessions = 0
+    refreshes = 0
+
+    def __init__(self, api_key=None, userId=None):
+        self.access_token = None
+
+    def generateSession(self, clientCode, password, totp):
+        FakeSmartConnect.sessions += 1
+        return {"status": True, "data": {
+            "jwtToken": "Bearer " + make_jwt(tag="login"), "refreshToken": "refresh-1", "feedToken": "feed-1"}}
+
+    def generateToken(self, refresh_token):
+        FakeSmartConnect.refreshes += 1
+        time.sleep(0.05)  # slow enough for callers to pile up
+        return {"status": True, "data": {"jwtToken": make_jwt(tag="refresh"), "feedToken": "feed-2"}}
+
+    def setAccessToken(self, token):
+        self.access_token = token
+
+    def setRefreshToken(self, token):
+        self.refresh_token = token
+
+    def setFeedToken(self, token):
+        self.feed_token = token
+
+
+@mock.patch("utils.smart_connect.PooledSmartConnect", FakeSmartConnect)
+@mock.patch("pyotp.TOTP", mock.Mock())
+class TestSessionCache(unittest.TestCase):
+
+    def setUp(self):
+        FakeSmartConnect.sessions = FakeSmartConnect.refreshes = 0
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "session.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_api(self):
+        return AngelOneApiHelper("key", "C123", "pwd", "totp", session_cache=SessionCache(self.path))
+
+    def test_restart_reuses_cached_session(self):
+        first = self.make_api()
+        self.assertTrue(first.login())
+        second = self.make_api()
+        self.assertTrue(second.login())
+
+        self.assertEqual(FakeSmartConnect.sessions, 1)
+        self.assertEqual(second.auth_token, first.auth_token)
+        self.assertEqual(second.feed_token, "feed-1")
+        self.assertEqual(second.smart_api.access_token, first.auth_token.replace("Bearer ", ""))
+
+    def test_expired_session_triggers_login(self):
+        SessionCache(self.path).save("C123", make_jwt(expires_in=10), "r", "f")
+        self.assertTrue(self.make_api().login())
+        self.assertEqual(FakeSmartConnect.sessions, 1)
+
+    def test_concurrent_renewals_share_one_refresh(self):
+        api = self.make_api()
+        api.login()
+        stale = api.auth_token
+
+        threads = [threading.Thread(target=api.renew_session, args=(stale,)) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(FakeSmartConnect.refreshes, 1)
+        self.assertEqual(FakeSmartConnect.sessions, 1)
+        self.assertEqual(api.feed_token, "feed-2")
+        self.assertEqual(SessionCache(self.path).load("C123")["jwt_token"], api.auth_token)
+
+    def test_token_expiry_fallback(self):
+        self.assertGreater(token_expiry("not-a-jwt"), time.time())
+
+if __name__ == '__main__':
+    unittest.main()
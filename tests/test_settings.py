@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from config import settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestSettings(unittest.TestCase):
+
+    def test_import_without_credentials(self):
+        env = {k: v for k, v in os.environ.items() if not k.startswith("ANGEL_")}
+        code = "import src.main, src.strategy, tests.backtest"
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_credentials_checked_on_demand(self):
+        with mock.patch.object(settings, "ANGEL_API_KEY", ""):
+            with self.assertRaises(ValueError):
+                settings.require_angel_credentials()
+        with mock.patch.multiple(settings, ANGEL_API_KEY="k", ANGEL_CLIENT_ID="c", ANGEL_PASSWORD="p"):
+            settings.require_angel_credentials()
+
+    def test_smartapi_not_imported_eagerly(self):
+        code = "import sys, src.main; print('SmartApi' in sys.modules, 'requests' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(result.stdout.split(), ["False", "False"], result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
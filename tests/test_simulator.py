@@ -0,0 +1,104 @@
+import unittest
+
+import pandas as pd
+
+from src.indicators import IndicatorEngine
+from src.simulator import simulate_trades, summarize_trades
+from src.strategy import scan_divergences
+from tests.synthetic import generate_candles
+
+
+def reference_trade(df, signal, entry_window, max_hold, risk_reward):
+    """Straightforward per-signal loop over the same rules"""
+    o, h, l, c = (df[col].to_numpy() for col in ("open", "high", "low", "close"))
+    i = signal['index']
+    long = signal['type'] == "BULLISH"
+    level = h[i] if long else l[i]
+    stop = l[i] if long else h[i]
+
+    for e in range(i + 1, min(i + 1 + entry_window, len(df))):
+        if (h[e] >= level) if long else (l[e] <= level):
+            break
+    else:
+        return {"exit_reason": "NO_ENTRY"}
+
+    entry = max(level, o[e]) if long else min(level, o[e])
+    risk = (entry - stop) if long else (stop - entry)
+    target = entry + risk_reward * risk if long else entry - risk_reward * risk
+    best, worst = entry, entry
+    last = min(e + max_hold, len(df)) - 1
+    for k in range(e, last + 1):
+        best = max(best, h[k]) if long else min(best, l[k])
+        worst = min(worst, l[k]) if long else max(worst, h[k])
+        stopped = (l[k] <= stop) if long else (h[k] >= stop)
+        hit = (h[k] >= target) if long else (l[k] <= target)
+        if stopped or hit:
+            exit_price, reason = (stop, "STOP") if stopped else (target, "TARGET")
+            break
+    else:
+        exit_price = c[last]
+        reason = "TIME" if last == e + max_hold - 1 else "END_OF_DATA"
+    side = 1 if long else -1
+    return {"entry_index": e, "entry_price": entry, "exit_index": k if reason in ("STOP", "TARGET") else last,
+            "exit_price": exit_price, "exit_reason": reason, "pnl": side * (exit_price - entry),
+            "mfe": side * (best - entry), "mae": side * (entry - worst)}
+
+
+def signals_for(n, seed):
+    df = IndicatorEngine(14, 20, 2.0).warm_up(generate_candles(n, seed=seed, volatility=0.002))
+    return df, scan_divergences(df)
+
+
+class TestSimulator(unittest.TestCase):
+
+    def test_matches_per_signal_loop(self):
+        df, signals = signals_for(20000, seed=11)
+        self.assertGreater(len(signals), 50)
+        trades = simulate_trades(df, signals, entry_window=3, max_hold=20, risk_reward=2.0)
+        self.assertEqual(len(trades), len(signals))
+        reasons = set()
+        for trade, (_, signal) in zip(trades.to_dict('records'), signals.iterrows()):
+            expected = reference_trade(df, signal, 3, 20, 2.0)
+            reasons.add(expected["exit_reason"])
+            for key, value in expected.items():
+                if isinstance(value, str):
+                    self.assertEqual(trade[key], value)
+                else:
+                    self.assertAlmostEqual(trade[key], value, places=8, msg=key)
+        self.assertTrue({"STOP", "TARGET", "NO_ENTRY"} <= reasons)
+
+    def test_hand_built_long_trade(self):
+        # confirmation at 1 (H=102, L=98); candle 3 gaps to 103 → risk 5, target 113
+        df = pd.DataFrame({
+            "open":  [100, 99, 101, 103, 106, 109],
+            "high":  [101, 102, 101.5, 106, 109, 114],
+            "low":   [99, 98, 100, 102, 105, 108],
+            "close": [99.5, 101, 101, 105, 108, 110],
+        })
+        signals = pd.DataFrame({"index": [1], "type": ["BULLISH"]})
+        trade = simulate_trades(df, signals, entry_window=3, max_hold=10, risk_reward=2.0).iloc[0]
+        self.assertEqual(trade['entry_index'], 3)
+        self.assertEqual(trade['entry_price'], 103)  # gapped above 102 → open
+        self.assertEqual(trade['exit_reason'], "TARGET")
+        self.assertEqual(trade['exit_index'], 5)
+        self.assertAlmostEqual(trade['r_multiple'], 2.0)
+        self.assertEqual(trade['mae'], 1)
+        self.assertEqual(summarize_trades(simulate_trades(df, signals.iloc[:0], 3, 10, 2.0))["trades"], 0)
+
+    def test_rejects_empty_windows(self):
+        df, signals = signals_for(400, seed=1)
+        for entry_window, max_hold in [(0, 10), (3, 0)]:
+            with self.assertRaises(ValueError):
+                simulate_trades(df, signals, entry_window, max_hold, 2.0)
+
+    def test_summary_counts_repeated_signals(self):
+        df, signals = signals_for(20000, seed=5)
+        signals = pd.concat([signals] * 20, ignore_index=True)
+        trades = simulate_trades(df, signals, entry_window=3, max_hold=50, risk_reward=2.0)
+        summary = summarize_trades(trades)
+        self.assertEqual(summary["signals"], len(signals))
+        self.assertEqual(summary["trades"], int((trades['exit_reason'] != "NO_ENTRY").sum()))
+
+
+if __name__ == '__main__':
+    unittest.main()
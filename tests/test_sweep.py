@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+from src.indicators import rsi, bollinger_bands
+from src.simulator import simulate_trades, summarize_trades
+from src.strategy import scan_divergences
+from tests.test_scan import make_candles
+from tests.sweep import build_grid, run_sweep
+
+
+class TestSweep(unittest.TestCase):
+
+    def test_grid_skips_inverted_ranges(self):
+        grid = build_grid([14], [20], [2.0], [2, 6], [5, 7])
+        self.assertEqual([(g["min_candles"], g["max_candles"]) for g in grid], [(2, 5), (2, 7), (6, 7)])
+
+    def test_pool_matches_serial(self):
+        df = make_candles(1500, seed=3, with_bb=False)
+        grid = build_grid([7, 14], [20], [1.0, 2.0], [2], [5, 9])
+        serial = run_sweep(df, grid, workers=1)
+        pooled = run_sweep(df, grid, workers=2)
+        self.assertEqual(len(serial), len(grid))
+        self.assertGreater(serial["signals"].sum(), 0)
+        key = ["rsi_period", "bb_std", "max_candles"]
+        np.testing.assert_allclose(
+            serial.sort_values(key)["avg_return_10"].to_numpy(),
+            pooled.sort_values(key)["avg_return_10"].to_numpy(), equal_nan=True
+        )
+
+    def test_scored_with_trade_simulator(self):
+        df = make_candles(1500, seed=3, with_bb=False)
+        params = {"rsi_period": 14, "bb_period": 20, "bb_std": 2.0, "min_candles": 2, "max_candles": 9}
+        row = run_sweep(df, [params], workers=1, entry_window=3, max_hold=20, risk_reward=2.0).iloc[0]
+
+        data = df[["time", "open", "high", "low", "close", "volume"]].copy()
+        data['rsi'] = rsi(data['close'].to_numpy(dtype=float), 14)
+        data['BBL'], data['BBU'] = bollinger_bands(data['close'].to_numpy(dtype=float), 20, 2.0)
+        summary = summarize_trades(simulate_trades(data, scan_divergences(data, 2, 9), 3, 20, 2.0))
+        self.assertGreater(summary["trades"], 0)
+        self.assertEqual(row["trades"], summary["trades"])
+        self.assertAlmostEqual(row["avg_r"], summary["avg_r"])
+        self.assertAlmostEqual(row["expectancy"], summary["expectancy"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.indicators import IndicatorEngine
+from src.scanner import WatchlistScanner, IST
+from src.strategy import scan_divergences
+from src.timeframes import CandleResampler, MultiTimeframeEngine
+
+
+def minute_candles(days=3, seed=0):
+    """1-minute NSE session candles (09:15-15:29) for consecutive weekdays"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for day in pd.bdate_range("2024-01-01", periods=days):
+        start = pd.Timestamp(day).tz_localize(IST) + pd.Timedelta(hours=9, minutes=15)
+        frames.append(pd.Series(pd.date_range(start, periods=375, freq="1min")))
+    times = pd.concat(frames, ignore_index=True)
+    n = len(times)
+    close = 22000 + np.cumsum(rng.normal(0, 5, n))
+    open_ = close + rng.normal(0, 3, n)
+    return pd.DataFrame({
+        "time": times,
+        "open": open_,
+        "high": np.maximum(open_, close) + rng.uniform(0, 2, n),
+        "low": np.minimum(open_, close) - rng.uniform(0, 2, n),
+        "close": close,
+        "volume": rng.integers(1, 500, n).astype(float),
+    })
+
+
+def pandas_rollup(df, rule):
+    """Reference roll-up with pandas, session anchored at 09:15"""
+    if rule == "1D":
+        grouped = df.set_index("time").resample(rule)
+    else:
+        grouped = df.set_index("time").resample(rule, offset="9h15min", origin="start_day")
+    out = grouped.agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+    return out.dropna().reset_index()
+
+
+class TestCandleResampler(unittest.TestCase):
+
+    def roll(self, df, minutes):
+        resampler = CandleResampler(minutes)
+        closed = []
+        for candle in df.to_dict('records'):
+            closed.extend(resampler.update(candle))
+        return pd.DataFrame(closed)
+
+    def test_matches_pandas_resample(self):
+        df = minute_candles()
+        for minutes, rule in [(5, "5min"), (15, "15min"), (60, "60min"), (1440, "1D")]:
+            ours = self.roll(df, minutes)
+            expected = pandas_rollup(df, rule)
+            pd.testing.assert_frame_equal(ours[expected.columns], expected, check_dtype=False,
+                                          check_freq=False, obj=rule)
+
+    def test_last_hour_is_cut_at_session_close(self):
+        hours = self.roll(minute_candles(days=1), 60)
+        self.assertEqual(hours['time'].dt.strftime('%H:%M').iloc[-1], "15:15")
+        self.assertEqual(len(hours), 7)
+
+    def test_forming_candle_is_revised_not_duplicated(self):
+        df = minute_candles(days=1).iloc[:12]
+        engine = MultiTimeframeEngine(["FIVE_MINUTE"])
+        at = lambda k: df['time'].iloc[k] + pd.Timedelta(seconds=30)  # during candle k
+        closed = engine.sync(df.iloc[:7], at(6))           # 09:21 still forming
+        closed += engine.sync(df.iloc[:10], at(9))         # revises 09:21, adds up to 09:24 (forming)
+        closed += engine.sync(df, at(11))                  # 09:24 now final → 09:20 bucket closes
+        times = [c['time'].strftime('%H:%M') for _, c in closed]
+        self.assertEqual(times, ["09:15", "09:20"])
+        self.assertEqual(closed[1][1]['close'], df['close'].iloc[9])
+
+    def test_session_end_closes_on_last_candle(self):
+        df = minute_candles(days=1)
+        engine = MultiTimeframeEngine(["FIFTEEN_MINUTE", "ONE_HOUR", "ONE_DAY"])
+        close_fetch = df['time'].iloc[-1] + pd.Timedelta(minutes=1, seconds=15)  # 15:30:15
+        closed = engine.sync(df.iloc[:-15], df['time'].iloc[-15])
+        closed += engine.sync(df, close_fetch)
+        last = {tf: c['time'].strftime('%H:%M') for tf, c in closed}
+        self.assertEqual(last, {"FIFTEEN_MINUTE": "15:15", "ONE_HOUR": "15:15", "ONE_DAY": "00:00"})
+        day = [c for tf, c in closed if tf == "ONE_DAY"][0]
+        self.assertEqual(day['close'], df['close'].iloc[-1])
+        self.assertEqual(day['volume'], df['volume'].sum())
+
+
+class TestMultiTimeframeScanner(unittest.TestCase):
+
+    def test_signals_per_timeframe_match_direct_strategy(self):
+        df = minute_candles(days=5, seed=3)
+        watchlist = [{"symbol": "NIFTY 50", "token": "99926000", "exchange": "NSE"}]
+        scanner = WatchlistScanner(None, watchlist, timeframes=["FIVE_MINUTE", "FIFTEEN_MINUTE"])
+
+        fired = {"FIVE_MINUTE": [], "FIFTEEN_MINUTE": []}
+        for candle in df.to_dict('records'):
+            for result in scanner.on_candle("99926000", candle):
+                if result["signal"]:
+                    fired[result["timeframe"]].append(result["signal"]["confirmation_time"])
+
+        for tf, rule in [("FIVE_MINUTE", "5min"), ("FIFTEEN_MINUTE", "15min")]:
+            bars = pandas_rollup(df, rule)
+            IndicatorEngine().warm_up(bars)
+            expected = list(scan_divergences(bars)["confirmation_time"])
+            self.assertEqual(fired[tf], expected, tf)
+        self.assertTrue(fired["FIVE_MINUTE"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,20 +2,48 @@
 API Helpers for Angel One Smart API
 """
 import time  # ✅ FIX: required for sleep
-import pyotp
+import threading
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from logzero import logger
-from SmartApi import SmartConnect
+from utils.candle_decoder import decode_candle_data, candles_frame
+from utils.candle_source import CandleSource
+from utils.candle_store import find_gaps
+from utils.metrics import get_metrics
+from utils.rate_limiter import (
+    RateLimiter, PRIORITY_LIVE, PRIORITY_BACKFILL, is_throttle_message
+)
 
+IST = timezone(timedelta(hours=5, minutes=30))
 
-class AngelOneApiHelper:
+_historical_limiter = None
+
+
+def get_historical_limiter():
+    """Rate limiter shared by every AngelOneApiHelper (getCandleData limits)"""
+    global _historical_limiter
+    if _historical_limiter is None:
+        from config.settings import ANGEL_HISTORICAL_RATE_LIMITS
+        _historical_limiter = RateLimiter(ANGEL_HISTORICAL_RATE_LIMITS)
+    return _historical_limiter
+
+
+class AngelOneApiHelper(CandleSource):
     """Helper class for Angel One Smart API interactions"""
     
-    def __init__(self, api_key, client_id, password, totp_secret):
+    name = "angel"
+    tick_feed = True
+    
+    def __init__(self, api_key, client_id, password, totp_secret, candle_store=None,
+                 rate_limiter=None, session_cache=None):
         """
         Initialize Angel One API client
+        
+        candle_store: optional CandleStore for delta-only fetching
+        rate_limiter: defaults to the process-wide historical API limiter
+        session_cache: optional SessionCache to reuse tokens across restarts
         """
+        super().__init__(candle_store, rate_limiter or get_historical_limiter())
         self.api_key = api_key
         self.client_id = client_id
         self.password = password
@@ -24,14 +52,47 @@ class AngelOneApiHelper:
         self.auth_token = None
         self.refresh_token = None
         self.feed_token = None
+        self._checked_gaps = set()
+        self.session_cache = session_cache
+        self._session_lock = threading.RLock()
         
     def login(self):
         """
-        Login to Angel One and get authentication tokens
+        Login to Angel One and get authentication tokens.
+        Reuses a cached session while it is still valid.
         """
+        with self._session_lock:
+            if self._restore_session():
+                return True
+            return self._generate_session()
+    
+    def _restore_session(self):
+        if self.session_cache is None:
+            return False
+        
+        session = self.session_cache.load(self.client_id)
+        if session is None:
+            return False
+        
+        try:
+            from utils.smart_connect import PooledSmartConnect  # imported on first login (slow)
+            self.smart_api = PooledSmartConnect(api_key=self.api_key, userId=self.client_id)
+            self._set_tokens(session['jwt_token'], session['refresh_token'],
+                             session['feed_token'], persist=False)
+            logger.info("[INFO] Reusing cached Angel One session")
+            return True
+        except Exception as e:
+            logger.error(f"[ERROR] Exception restoring session: {e}")
+            return False
+    
+    def _generate_session(self):
+        """Full login with password + TOTP"""
         try:
-            # Initialize SmartConnect
-            self.smart_api = SmartConnect(api_key=self.api_key)
+            import pyotp
+            from utils.smart_connect import PooledSmartConnect  # imported on first login (slow)
+            
+            # Initialize SmartConnect (keep-alive session sized for concurrent fetches)
+            self.smart_api = PooledSmartConnect(api_key=self.api_key)
             
             # Generate TOTP
             totp = pyotp.TOTP(self.totp_secret).now()
@@ -44,9 +105,11 @@ class AngelOneApiHelper:
             )
             
             if data['status']:
-                self.auth_token = data['data']['jwtToken']
-                self.refresh_token = data['data']['refreshToken']
-                self.feed_token = data['data']['feedToken']
+                self._set_tokens(
+                    data['data']['jwtToken'],
+                    data['data']['refreshToken'],
+                    data['data']['feedToken']
+                )
                 
                 logger.info("[INFO] Successfully logged in to Angel One")
                 return True
@@ -58,9 +121,59 @@ class AngelOneApiHelper:
             logger.error(f"[ERROR] Exception during login: {e}")
             return False
     
+    def renew_session(self, stale_token=None):
+        """
+        Renew an expired session, preferring the refresh token over a full login.
+        
+        Concurrent callers share one renewal: a caller whose `stale_token` was
+        already replaced by another thread returns immediately.
+        """
+        with self._session_lock:
+            if stale_token is not None and self.auth_token != stale_token:
+                return True
+            
+            if self.smart_api and self.refresh_token:
+                try:
+                    response = self.smart_api.generateToken(self.refresh_token)
+                    if response and response.get('status'):
+                        self._set_tokens(
+                            response['data']['jwtToken'],
+                            response['data'].get('refreshToken') or self.refresh_token,
+                            response['data']['feedToken']
+                        )
+                        logger.info("[INFO] Session renewed with refresh token")
+                        return True
+                    logger.warning("[WARN] Refresh token rejected")
+                except Exception as e:
+                    logger.warning(f"[WARN] Refresh token renewal failed: {e}")
+            
+            if self.session_cache is not None:
+                self.session_cache.clear(self.client_id)
+            return self._generate_session()
+    
+    def _set_tokens(self, jwt_token, refresh_token, feed_token, persist=True):
+        jwt_token = jwt_token.replace("Bearer ", "")
+        self.auth_token = "Bearer " + jwt_token
+        self.refresh_token = refresh_token
+        self.feed_token = feed_token
+        
+        self.smart_api.setAccessToken(jwt_token)
+        self.smart_api.setRefreshToken(refresh_token)
+        self.smart_api.setFeedToken(feed_token)
+        
+        if persist and self.session_cache is not None:
+            try:
+                self.session_cache.save(self.client_id, self.auth_token, refresh_token, feed_token)
+            except OSError as e:
+                logger.warning(f"[WARN] Could not save session cache: {e}")
+    
     def fetch_candles(self, symbol_token, exchange, timeframe, days=5):
         """
-        Fetches historical candles from Angel One
+        Fetches historical candles from Angel One.
+        
+        With a candle store attached, only the candles after the last stored
+        complete candle (plus any intraday gaps) are requested; the result is
+        merged into the store and the full window is read back from it.
         """
         try:
             # Ensure we're logged in
@@ -69,74 +182,150 @@ class AngelOneApiHelper:
                 if not self.login():
                     return None
             
-            # Calculate date range
-            to_date = datetime.now()
+            # Calculate date range (Angel One expects IST)
+            to_date = datetime.now(IST)
             from_date = to_date - timedelta(days=days)
             
-            # Format dates
-            from_date_str = from_date.strftime("%Y-%m-%d %H:%M")
-            to_date_str = to_date.strftime("%Y-%m-%d %H:%M")
+            if self.candle_store is None:
+                return self.fetch_candles_range(
+                    symbol_token, exchange, timeframe, from_date, to_date
+                )
             
-            params = {
-                "exchange": exchange,
-                "symboltoken": symbol_token,
-                "interval": timeframe,
-                "fromdate": from_date_str,
-                "todate": to_date_str
-            }
+            return self._fetch_candles_delta(
+                symbol_token, exchange, timeframe, from_date, to_date
+            )
+                
+        except Exception as e:
+            logger.error(f"[ERROR] Exception fetching candles: {e}")
+            return None
+    
+    def _fetch_candles_delta(self, symbol_token, exchange, timeframe, from_date, to_date):
+        """
+        Bring the candle store up to date for [from_date, to_date] and return
+        that window from the store.
+        """
+        from config.settings import TIMEFRAME_MINUTES
+        
+        store = self.candle_store
+        step = TIMEFRAME_MINUTES.get(timeframe, 5)
+        key = (symbol_token, exchange, timeframe)
+        
+        ranges = []  # (start, end, priority)
+        resume = store.resume_point(*key, step)
+        covered_from = store.coverage_start(*key)
+        
+        if resume is None or covered_from is None or resume < from_date:
+            # Nothing usable cached → one full request
+            ranges.append((from_date, to_date, PRIORITY_LIVE))
+        else:
+            ranges.append((resume, to_date, PRIORITY_LIVE))
+            if from_date < covered_from:
+                ranges.append((from_date, covered_from, PRIORITY_BACKFILL))
             
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    response = self.smart_api.getCandleData(params)
+            # Backfill missing candles inside trading days (once per process)
+            cached = store.load(*key, start=from_date)
+            for gap in find_gaps(cached, step):
+                if (key, gap) not in self._checked_gaps:
+                    self._checked_gaps.add((key, gap))
+                    ranges.append((*gap, PRIORITY_BACKFILL))
+        
+        for range_start, range_end, priority in ranges:
+            df = self.fetch_candles_range(
+                symbol_token, exchange, timeframe, range_start, range_end,
+                priority=priority
+            )
+            if df is None:
+                return None
+            store.save(*key, df, step, fetched_at=to_date)
+        store.extend_coverage(*key, from_date)
+        
+        df = store.load(*key, start=from_date)
+        logger.info(
+            f"[INFO] Candle store: {len(df)} candles, "
+            f"{len(ranges)} range request(s) from {min(r[0] for r in ranges).strftime('%Y-%m-%d %H:%M')}"
+        )
+        return df
+    
+    def fetch_candles_range(self, symbol_token, exchange, timeframe, from_date, to_date,
+                            priority=PRIORITY_LIVE):
+        """
+        Fetches candles between two datetimes with retries.
+        Returns an empty DataFrame if the range holds no candles, None on failure.
+        
+        Every request goes through the shared rate limiter; `priority` picks the
+        lane (PRIORITY_LIVE before PRIORITY_BACKFILL).
+        """
+        params = {
+            "exchange": exchange,
+            "symboltoken": symbol_token,
+            "interval": timeframe,
+            "fromdate": from_date.strftime("%Y-%m-%d %H:%M"),
+            "todate": to_date.strftime("%Y-%m-%d %H:%M")
+        }
+        cols = ["time", "open", "high", "low", "close", "volume"]
+        
+        max_retries = 3
+        metrics = get_metrics()
+        for attempt in range(max_retries):
+            metrics.increment("fetch_requests")
+            if attempt:
+                metrics.increment("fetch_retries")
+            try:
+                token = self.auth_token
+                self.rate_limiter.acquire(priority)
+                response = self.smart_api.getCandleData(params)
+                
+                if response is None:
+                    logger.warning(
+                        f"[WARN] Attempt {attempt+1}/{max_retries}: API returned None"
+                    )
+                    time.sleep(self.rate_limiter.backoff_delay(attempt))
+                    continue
                     
-                    if response is None:
-                        logger.warning(
-                            f"[WARN] Attempt {attempt+1}/{max_retries}: API returned None"
-                        )
-                        time.sleep(2)
-                        continue
-                        
-                    if response.get('status') and response.get('data'):
-                        data = response['data']
-                        
-                        cols = ["time", "open", "high", "low", "close", "volume"]
-                        df = pd.DataFrame(data, columns=cols)
-                        
-                        df["time"] = pd.to_datetime(df["time"])
-                        
-                        for col in ["open", "high", "low", "close", "volume"]:
-                            df[col] = pd.to_numeric(df[col])
-                        
-                        df = df.sort_values("time").reset_index(drop=True)
-                        
-                        logger.info(f"[INFO] Fetched {len(df)} candles from Angel One")
-                        return df
-                    else:
-                        msg = response.get('message', 'Unknown error')
-                        logger.warning(
-                            f"[WARN] Attempt {attempt+1}/{max_retries} failed: {msg}"
-                        )
-                        
-                        # Token invalid → re-login
-                        if any(x in str(msg).lower() for x in ["token", "auth", "unauthorized"]):
-                            logger.info("[INFO] Token issue detected. Re-logging in...")
-                            if self.login():
-                                continue
-                        
-                        time.sleep(2 * (attempt + 1))
-                        
-                except Exception as e:
-                    logger.error(
-                        f"[ERROR] Exception on attempt {attempt+1}: {e}"
+                if response.get('status') and response.get('data'):
+                    # Typed arrays → DataFrame (IST times, sorted only if needed)
+                    df = candles_frame(*decode_candle_data(response['data']))
+                    
+                    logger.info(f"[INFO] Fetched {len(df)} candles from Angel One")
+                    return df
+                elif response.get('status'):
+                    # Valid response without candles (holiday, empty gap)
+                    return pd.DataFrame(columns=cols)
+                else:
+                    msg = response.get('message', 'Unknown error')
+                    logger.warning(
+                        f"[WARN] Attempt {attempt+1}/{max_retries} failed: {msg}"
                     )
-                    time.sleep(2)
                     
-            return None
+                    # Throttled → back off (pauses every caller of the limiter)
+                    if is_throttle_message(msg):
+                        delay = self.rate_limiter.record_throttle(attempt)
+                        logger.warning(f"[WARN] Rate limited. Backing off {delay:.1f}s")
+                        continue
+                    
+                    # Token invalid → renew (refresh token first, shared by all callers)
+                    if any(x in str(msg).lower() for x in ["token", "auth", "unauthorized"]):
+                        logger.info("[INFO] Token issue detected. Renewing session...")
+                        if self.renew_session(stale_token=token):
+                            continue
+                    
+                    time.sleep(self.rate_limiter.backoff_delay(attempt))
+                    
+            except Exception as e:
+                logger.error(
+                    f"[ERROR] Exception on attempt {attempt+1}: {e}"
+                )
+                if is_throttle_message(e):
+                    self.rate_limiter.record_throttle(attempt)
+                else:
+                    time.sleep(self.rate_limiter.backoff_delay(attempt))
                 
-        except Exception as e:
-            logger.error(f"[ERROR] Exception fetching candles: {e}")
-            return None
+        return None
+    
+    def max_request_days(self, timeframe):
+        """Longest range a single getCandleData request may span"""
+        from config.settings import ANGEL_MAX_DAYS_PER_REQUEST
+        return ANGEL_MAX_DAYS_PER_REQUEST.get(timeframe, 30)
     
     def is_market_open(self):
         """
@@ -151,7 +340,6 @@ class AngelOneApiHelper:
         
         # PythonAnywhere uses UTC time. We need to convert it to IST.
         # IST = UTC + 5:30
-        from datetime import timezone
         now_utc = datetime.now(timezone.utc)
         now_ist = now_utc + timedelta(hours=5, minutes=30)
         
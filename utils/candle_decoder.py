@@ -0,0 +1,102 @@
+"""
+Candle Response Decoder
+Parses getCandleData payloads ([iso time, open, high, low, close, volume]
+rows) straight into typed NumPy arrays, without intermediate object columns
+"""
+import itertools
+from datetime import timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from utils.candle_store import CANDLE_COLUMNS
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Angel One timestamps: "2024-01-05T09:15:00+05:30"
+STAMP_LENGTH = 25
+_SEPARATORS = {4: "-", 7: "-", 10: "T", 13: ":", 16: ":", 22: ":"}
+# Character positions of year, month, day, hour, minute, second digits
+_FIELDS = ((0, 4), (5, 7), (8, 10), (11, 13), (14, 16), (17, 19))
+_DIGITS = [k for start, end in _FIELDS for k in range(start, end)]
+# Positions every row must share with the first: separators and UTC offset
+_LAYOUT = [k for k in _SEPARATORS if k < 19] + list(range(19, STAMP_LENGTH))
+
+
+def decode_candle_data(data):
+    """
+    Decode getCandleData rows in one pass.
+
+    The rows are flattened once into a preallocated object array; prices and
+    volume are cast to float64 in one go and the fixed-width timestamps are
+    read digit by digit from their UCS-4 code points (falling back to pandas
+    for any other time format). Rows are sorted only if they are not already
+    in time order.
+
+    Returns:
+    --------
+    (numpy.ndarray, numpy.ndarray)
+        int64 epoch seconds (n,), float64 open/high/low/close/volume (5, n)
+    """
+    n = len(data)
+    flat = np.fromiter(itertools.chain.from_iterable(data), dtype=object, count=6 * n)
+    flat = flat.reshape(n, 6)
+    values = flat[:, 1:].T.astype(np.float64)
+    epochs = _parse_stamps(flat[:, 0])
+
+    if n > 1 and not (epochs[1:] >= epochs[:-1]).all():
+        order = np.argsort(epochs, kind="stable")
+        epochs, values = epochs[order], values[:, order]
+    return epochs, values
+
+
+def candles_frame(epochs, values):
+    """Candle DataFrame (IST times) from decode_candle_data arrays"""
+    frame = {"time": pd.to_datetime(epochs, unit="s", utc=True).tz_convert(IST)}
+    frame.update(zip(CANDLE_COLUMNS[1:], values))
+    return pd.DataFrame(frame)
+
+
+def _parse_stamps(stamps):
+    """ISO timestamps (object array of str) → int64 epoch seconds"""
+    if not len(stamps):
+        return np.empty(0, dtype=np.int64)
+    first = stamps[0]
+    if not _is_fixed_stamp(first):
+        return _parse_stamps_slow(stamps)
+
+    chars = stamps.astype(f"U{STAMP_LENGTH}").view(np.uint32).reshape(-1, STAMP_LENGTH)
+    # Every row must share the first row's layout and UTC offset (shorter
+    # strings are zero padded, longer ones are caught by the offset check)
+    digits = chars[:, :19].astype(np.int64) - ord("0")
+    if (not (chars[:, _LAYOUT] == chars[0, _LAYOUT]).all()
+            or not ((digits[:, _DIGITS] >= 0) & (digits[:, _DIGITS] <= 9)).all()):
+        return _parse_stamps_slow(stamps)
+
+    year, month, day, hour, minute, second = (
+        _number(digits, start, end) for start, end in _FIELDS
+    )
+    months = (year - 1970) * 12 + (month - 1)
+    days = months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64) + day - 1
+    sign = -1 if first[19] == "-" else 1
+    offset = sign * (int(first[20:22]) * 3600 + int(first[23:25]) * 60)
+    return days * 86400 + hour * 3600 + minute * 60 + second - offset
+
+
+def _number(digits, start, end):
+    value = digits[:, start]
+    for k in range(start + 1, end):
+        value = value * 10 + digits[:, k]
+    return value
+
+
+def _is_fixed_stamp(stamp):
+    return (isinstance(stamp, str) and len(stamp) == STAMP_LENGTH
+            and all(stamp[k] == c for k, c in _SEPARATORS.items())
+            and stamp[19] in "+-"
+            and stamp[:4].isdigit() and stamp[20:22].isdigit() and stamp[23:25].isdigit())
+
+
+def _parse_stamps_slow(stamps):
+    times = pd.to_datetime(pd.Series(stamps), utc=True, format="ISO8601")
+    return ((times - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).to_numpy(np.int64)
@@ -0,0 +1,117 @@
+"""
+Candle Sources
+Common interface of every candle provider (Angel One, Delta Exchange, local
+files, replay), so the scanner, polling loop and backtests run unchanged
+against any of them
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+
+from utils.rate_limiter import RateLimiter, PRIORITY_LIVE
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Round-the-clock market (crypto): one 24h session per day from 05:30 IST
+# (00:00 UTC), every day of the week. (session open, session close, trading days)
+SESSION_24X7 = ((5, 30), (5, 30), [0, 1, 2, 3, 4, 5, 6])
+
+
+class CandleSource(ABC):
+    """
+    Base class of candle providers.
+
+    Subclasses must implement fetch_candles_range; fetch_candles (used by the
+    scanner on every cycle) defaults to the last `days` days up to now.
+    Timeframes are named as in TIMEFRAME_MINUTES ("FIVE_MINUTE", ...) and
+    candles come back as a DataFrame with columns time (tz-aware), open,
+    high, low, close, volume, oldest first.
+
+    Class attributes:
+    - name       : CANDLE_SOURCE value selecting the source
+    - session    : (open, close, trading days) of the market, None = the
+                   NSE session from settings
+    - tick_feed  : True if utils.live_feed can stream ticks for the source
+    """
+
+    name = None
+    session = None
+    tick_feed = False
+
+    def __init__(self, candle_store=None, rate_limiter=None):
+        self.candle_store = candle_store
+        # Sources without request limits still count requests for the cycle log
+        self.rate_limiter = rate_limiter or RateLimiter([(10 ** 9, 1)])
+
+    def login(self):
+        """Authenticate if the source needs it. Returns True when ready."""
+        return True
+
+    def now(self):
+        return datetime.now(IST)
+
+    def fetch_candles(self, symbol_token, exchange, timeframe, days=5):
+        """Candles of the last `days` days (None on failure)"""
+        to_date = self.now()
+        return self.fetch_candles_range(
+            symbol_token, exchange, timeframe, to_date - timedelta(days=days), to_date
+        )
+
+    @abstractmethod
+    def fetch_candles_range(self, symbol_token, exchange, timeframe, from_date, to_date,
+                            priority=PRIORITY_LIVE):
+        """
+        Candles starting in [from_date, to_date]. Returns an empty DataFrame
+        if the range holds no candles, None on failure.
+        """
+
+    def max_request_days(self, timeframe):
+        """
+        Longest range (days) one fetch_candles_range call should cover in a
+        bulk download, or None if any range is fine.
+        """
+        return None
+
+
+def http_pool():
+    """HTTPAdapter pool arguments: one keep-alive connection per concurrent fetch"""
+    from config.settings import HTTP_POOL_SIZE
+    return {"pool_connections": HTTP_POOL_SIZE, "pool_maxsize": HTTP_POOL_SIZE}
+
+
+def keep_alive_session():
+    """requests.Session whose connection pool covers every concurrent fetch"""
+    import requests  # imported on first use (slow)
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(**http_pool())
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def open_candle_source(name=None, candle_store=None, session_cache=None):
+    """
+    Candle source selected by CANDLE_SOURCE (or `name`), configured from settings.
+
+    Only the Angel One source needs credentials; they are validated here.
+    """
+    from config.settings import CANDLE_SOURCE
+
+    name = (name or CANDLE_SOURCE).lower()
+    if name == "angel":
+        from config.settings import (
+            ANGEL_API_KEY, ANGEL_CLIENT_ID, ANGEL_PASSWORD, ANGEL_TOTP_SECRET,
+            require_angel_credentials
+        )
+        from utils.api_helpers import AngelOneApiHelper
+        require_angel_credentials()
+        return AngelOneApiHelper(ANGEL_API_KEY, ANGEL_CLIENT_ID, ANGEL_PASSWORD, ANGEL_TOTP_SECRET,
+                                 candle_store=candle_store, session_cache=session_cache)
+    if name == "delta":
+        from utils.delta_api_helper import DeltaApiHelper
+        return DeltaApiHelper()
+    if name == "file":
+        from config.settings import CANDLE_FILES_DIR
+        from utils.file_source import FileCandleSource
+        return FileCandleSource(CANDLE_FILES_DIR)
+    raise ValueError(f"Unknown CANDLE_SOURCE '{name}' (expected angel, delta or file)")
@@ -0,0 +1,245 @@
+"""
+Persistent Local Candle Store
+SQLite cache of OHLCV candles keyed by symbol token / exchange / timeframe
+"""
+import os
+import sqlite3
+import threading
+from datetime import timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+CANDLE_COLUMNS = ["time", "open", "high", "low", "close", "volume"]
+
+
+class CandleStore:
+    """
+    On-disk candle cache.
+
+    Each candle row carries a `complete` flag: a candle fetched before its
+    interval had ended (the forming candle) is stored as incomplete so the
+    next delta fetch requests it again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS candles (
+                    symbol_token TEXT NOT NULL,
+                    exchange TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    time INTEGER NOT NULL,
+                    open REAL, high REAL, low REAL, close REAL, volume REAL,
+                    complete INTEGER NOT NULL,
+                    PRIMARY KEY (symbol_token, exchange, timeframe, time)
+                ) WITHOUT ROWID
+            """)
+            # Earliest date each series has been fetched from
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS coverage (
+                    symbol_token TEXT NOT NULL,
+                    exchange TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    start INTEGER NOT NULL,
+                    PRIMARY KEY (symbol_token, exchange, timeframe)
+                )
+            """)
+            # Request windows of a long-history download that were fully saved
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS downloads (
+                    symbol_token TEXT NOT NULL,
+                    exchange TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    start INTEGER NOT NULL,
+                    end INTEGER NOT NULL,
+                    PRIMARY KEY (symbol_token, exchange, timeframe, start, end)
+                )
+            """)
+
+    def close(self):
+        self._conn.close()
+
+    def save(self, symbol_token, exchange, timeframe, df, step_minutes, fetched_at):
+        """
+        Upsert candles. Rows with the same timestamp are replaced.
+
+        Parameters:
+        -----------
+        df : pandas.DataFrame
+            Candles with columns: time (tz-aware), open, high, low, close, volume
+        step_minutes : int
+            Candle interval, used to decide which candles were complete
+        fetched_at : datetime
+            Time (tz-aware) of the request's end
+        """
+        if df is None or df.empty:
+            return 0
+        epochs = _to_epoch(df['time'])
+        cutoff = int(fetched_at.timestamp()) - step_minutes * 60
+        rows = [
+            (symbol_token, exchange, timeframe, int(t),
+             float(o), float(h), float(l), float(c), float(v), int(t <= cutoff))
+            for t, o, h, l, c, v in zip(
+                epochs, df['open'], df['high'], df['low'], df['close'], df['volume']
+            )
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def load(self, symbol_token, exchange, timeframe, start=None, end=None):
+        """
+        Load candles in [start, end] sorted by time (IST timestamps).
+        """
+        query = ("SELECT time, open, high, low, close, volume FROM candles "
+                 "WHERE symbol_token = ? AND exchange = ? AND timeframe = ?")
+        params = [symbol_token, exchange, timeframe]
+        if start is not None:
+            query += " AND time >= ?"
+            params.append(int(start.timestamp()))
+        if end is not None:
+            query += " AND time <= ?"
+            params.append(int(end.timestamp()))
+        query += " ORDER BY time"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        df = pd.DataFrame(rows, columns=CANDLE_COLUMNS)
+        df['time'] = pd.to_datetime(df['time'], unit='s', utc=True).dt.tz_convert(IST)
+        return df
+
+    def load_array(self, symbol_token, exchange, timeframe, start=None):
+        """
+        Candles since start as a (6, n) float64 array of rows time (epoch
+        seconds), open, high, low, close, volume. Skips pandas entirely, for
+        bulk loads of many symbols.
+        """
+        query = ("SELECT time, open, high, low, close, volume FROM candles "
+                 "WHERE symbol_token = ? AND exchange = ? AND timeframe = ?")
+        params = [symbol_token, exchange, timeframe]
+        if start is not None:
+            query += " AND time >= ?"
+            params.append(int(start.timestamp()))
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY time", params).fetchall()
+        return np.array(rows, dtype=np.float64).reshape(-1, len(CANDLE_COLUMNS)).T
+
+    def resume_point(self, symbol_token, exchange, timeframe, step_minutes):
+        """
+        Start of the first candle that still has to be fetched: the oldest
+        incomplete candle, or the candle after the last complete one.
+        Returns None for an empty series.
+        """
+        key = (symbol_token, exchange, timeframe)
+        with self._lock:
+            incomplete = self._conn.execute(
+                "SELECT MIN(time) FROM candles WHERE symbol_token = ? AND exchange = ? "
+                "AND timeframe = ? AND complete = 0", key
+            ).fetchone()[0]
+            last_complete = self._conn.execute(
+                "SELECT MAX(time) FROM candles WHERE symbol_token = ? AND exchange = ? "
+                "AND timeframe = ? AND complete = 1", key
+            ).fetchone()[0]
+
+        if incomplete is not None:
+            epoch = incomplete
+        elif last_complete is not None:
+            epoch = last_complete + step_minutes * 60
+        else:
+            return None
+        return pd.Timestamp(epoch, unit='s', tz='UTC').tz_convert(IST).to_pydatetime()
+
+    def coverage_start(self, symbol_token, exchange, timeframe):
+        """Earliest date this series has been fetched from (or None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT start FROM coverage WHERE symbol_token = ? AND exchange = ? "
+                "AND timeframe = ?", (symbol_token, exchange, timeframe)
+            ).fetchone()
+        if row is None:
+            return None
+        return pd.Timestamp(row[0], unit='s', tz='UTC').tz_convert(IST).to_pydatetime()
+
+    def extend_coverage(self, symbol_token, exchange, timeframe, start):
+        """Record that the series is complete from `start` onwards"""
+        epoch = int(start.timestamp())
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO coverage VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (symbol_token, exchange, timeframe) "
+                "DO UPDATE SET start = MIN(start, excluded.start)",
+                (symbol_token, exchange, timeframe, epoch)
+            )
+
+    def mark_downloaded(self, symbol_token, exchange, timeframe, start, end):
+        """Record that the window [start, end] was downloaded completely"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO downloads VALUES (?, ?, ?, ?, ?)",
+                (symbol_token, exchange, timeframe, int(start.timestamp()), int(end.timestamp()))
+            )
+
+    def downloaded_windows(self, symbol_token, exchange, timeframe):
+        """Set of (start, end) epoch pairs recorded by mark_downloaded"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT start, end FROM downloads WHERE symbol_token = ? AND exchange = ? "
+                "AND timeframe = ?", (symbol_token, exchange, timeframe)
+            ).fetchall()
+        return {tuple(row) for row in rows}
+
+
+def find_gaps(df, step_minutes):
+    """
+    Find missing candles inside a trading day.
+
+    Overnight and weekend breaks are not gaps, so only consecutive candles on
+    the same IST date are compared. Daily candles are never checked.
+
+    Returns:
+    --------
+    list of (datetime, datetime)
+        Inclusive start/end times of each run of missing candles
+    """
+    if df is None or len(df) < 2 or step_minutes >= 1440:
+        return []
+    times = df['time']
+    step = timedelta(minutes=step_minutes)
+    same_day = times.dt.date.values[1:] == times.dt.date.values[:-1]
+    too_far = (times.diff().iloc[1:] > step).values
+    gaps = []
+    for k in (same_day & too_far).nonzero()[0]:
+        before, after = times.iloc[k], times.iloc[k + 1]
+        gaps.append(((before + step).to_pydatetime(), (after - step).to_pydatetime()))
+    return gaps
+
+
+def to_ist(times):
+    """
+    Convert a time column to tz-aware IST.
+    Naive timestamps are treated as UTC (everywhere candles enter the bot).
+    """
+    if isinstance(times.dtype, pd.DatetimeTZDtype) and times.dt.tz == IST:
+        return times  # already IST (decoded API responses, candle store)
+    times = pd.to_datetime(times)
+    if times.dt.tz is None:
+        times = times.dt.tz_localize("UTC")
+    return times.dt.tz_convert(IST)
+
+
+def _to_epoch(times):
+    times = to_ist(times)
+    return (times - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
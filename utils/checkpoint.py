@@ -0,0 +1,69 @@
+"""
+Warm-Restart Checkpoint
+Persists the scanner's streaming state (indicator sums, detector ring buffers,
+timeframe roll-ups, dedup keys) so a restart continues where it stopped
+"""
+import os
+import pickle
+import time
+
+from logzero import logger
+
+# Bumped whenever the pickled state classes change incompatibly
+CHECKPOINT_VERSION = 1
+
+
+class Checkpoint:
+    """
+    Single pickle file, replaced atomically on every save.
+
+    A checkpoint is only restored when it was written with the same strategy
+    configuration (`fingerprint`) and is younger than `max_age` seconds.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def save(self, state, fingerprint):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        payload = {
+            "version": CHECKPOINT_VERSION,
+            "saved_at": time.time(),
+            "fingerprint": fingerprint,
+            "state": state,
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)  # atomic: a crash never leaves a partial file
+
+    def load(self, fingerprint, max_age=None):
+        """
+        Returns:
+        --------
+        object or None
+            The saved state, or None if missing, unreadable, stale or written
+            with a different configuration
+        """
+        try:
+            with open(self.path, "rb") as f:
+                payload = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"[CHECKPOINT] Unreadable checkpoint ignored: {e}")
+            return None
+
+        if payload.get("version") != CHECKPOINT_VERSION:
+            logger.info("[CHECKPOINT] Checkpoint from another version ignored")
+            return None
+        if payload.get("fingerprint") != fingerprint:
+            logger.info("[CHECKPOINT] Strategy settings changed. Checkpoint ignored")
+            return None
+        age = time.time() - payload.get("saved_at", 0)
+        if max_age is not None and age > max_age:
+            logger.info(f"[CHECKPOINT] Checkpoint is {age / 3600:.1f}h old. Ignored")
+            return None
+        return payload["state"]
@@ -0,0 +1,151 @@
+"""
+API Helper for Delta Exchange India
+Public candles of crypto perpetuals (24x7) through the CandleSource interface
+"""
+import time
+
+import pandas as pd
+import requests
+from logzero import logger
+
+from utils.candle_source import CandleSource, IST, SESSION_24X7, keep_alive_session
+from utils.candle_store import CANDLE_COLUMNS
+from utils.metrics import get_metrics
+from utils.rate_limiter import RateLimiter, PRIORITY_LIVE
+
+# Seconds per unit of a Delta resolution ("5m", "1h", "1d", "1w")
+RESOLUTION_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def resolution_of(timeframe):
+    """
+    Delta resolution and candle length in seconds for a timeframe name
+    ("FIFTEEN_MINUTE") or a Delta resolution ("15m").
+    """
+    from config.settings import DELTA_RESOLUTIONS
+
+    resolution = DELTA_RESOLUTIONS.get(timeframe, timeframe)
+    try:
+        return resolution, int(resolution[:-1]) * RESOLUTION_UNITS[resolution[-1]]
+    except (KeyError, ValueError):
+        raise ValueError(f"Unsupported Delta timeframe '{timeframe}'") from None
+
+
+class DeltaApiHelper(CandleSource):
+    """
+    Delta Exchange candles (symbol_token = product symbol, e.g. BTCUSD; the
+    exchange argument is ignored).
+
+    Every request reuses one keep-alive session. Ranges longer than a page
+    (DELTA_MAX_CANDLES_PER_REQUEST candles) are fetched page by page. Only
+    closed candles are returned, like after a candle close on Angel One.
+    """
+
+    name = "delta"
+    session = SESSION_24X7
+
+    def __init__(self, base_url=None, rate_limiter=None, http=None):
+        from config.settings import DELTA_BASE_URL, DELTA_RATE_LIMITS, DELTA_REQUEST_TIMEOUT
+
+        super().__init__(rate_limiter=rate_limiter or RateLimiter(DELTA_RATE_LIMITS))
+        self.base_url = (base_url or DELTA_BASE_URL).rstrip("/")
+        self.timeout = DELTA_REQUEST_TIMEOUT
+        self.http = http or keep_alive_session()
+
+    def _get(self, path, params=None, priority=PRIORITY_LIVE):
+        """
+        GET an API path with retries.
+
+        Returns:
+        --------
+        The response's "result" payload, or None on failure
+        """
+        max_retries = 3
+        metrics = get_metrics()
+        for attempt in range(max_retries):
+            metrics.increment("fetch_requests")
+            if attempt:
+                metrics.increment("fetch_retries")
+            try:
+                self.rate_limiter.acquire(priority)
+                response = self.http.get(self.base_url + path, params=params, timeout=self.timeout)
+
+                if response.status_code == 429:
+                    # Throttled → back off (pauses every caller of the limiter)
+                    delay = self.rate_limiter.record_throttle(attempt)
+                    logger.warning(f"[WARN] Delta rate limited. Backing off {delay:.1f}s")
+                    continue
+
+                body = response.json()
+                if response.ok and body.get("success"):
+                    return body.get("result")
+
+                logger.warning(
+                    f"[WARN] Attempt {attempt+1}/{max_retries} failed: "
+                    f"HTTP {response.status_code} {body.get('error', '')}"
+                )
+                if response.status_code < 500:
+                    return None  # bad symbol / resolution: retrying cannot help
+
+            except (requests.RequestException, ValueError) as e:
+                logger.error(f"[ERROR] Exception on attempt {attempt+1}: {e}")
+
+            time.sleep(self.rate_limiter.backoff_delay(attempt))
+
+        return None
+
+    def fetch_candles_range(self, symbol_token, exchange, timeframe, from_date, to_date,
+                            priority=PRIORITY_LIVE):
+        """
+        Closed candles starting in [from_date, to_date], one request per page.
+        Returns an empty DataFrame if the range holds no candles, None on failure.
+        """
+        from config.settings import DELTA_MAX_CANDLES_PER_REQUEST
+
+        resolution, step = resolution_of(timeframe)
+        start = int(from_date.timestamp())
+        # A candle is closed once its full length has passed
+        end = min(int(to_date.timestamp()), int(self.now().timestamp()) - step)
+        page = DELTA_MAX_CANDLES_PER_REQUEST * step
+
+        rows = []
+        page_start = start
+        while page_start <= end:
+            page_end = min(page_start + page - step, end)
+            result = self._get("/v2/history/candles", {
+                "symbol": symbol_token,
+                "resolution": resolution,
+                "start": page_start,
+                "end": page_end,
+            }, priority)
+            if result is None:
+                return None
+            rows.extend(result)
+            page_start += page
+
+        df = pd.DataFrame(rows, columns=CANDLE_COLUMNS)
+        df = df[(df["time"] >= start) & (df["time"] <= end)].copy()
+        df["time"] = pd.to_datetime(df["time"].astype("int64"), unit="s", utc=True).dt.tz_convert(IST)
+        for col in CANDLE_COLUMNS[1:]:
+            df[col] = pd.to_numeric(df[col])
+        df = (df.drop_duplicates(subset="time", keep="last")
+                .sort_values("time").reset_index(drop=True))
+        logger.info(f"[INFO] Fetched {len(df)} candles from Delta Exchange")
+        return df
+
+    def max_request_days(self, timeframe):
+        """One page of candles"""
+        from config.settings import DELTA_MAX_CANDLES_PER_REQUEST
+        return DELTA_MAX_CANDLES_PER_REQUEST * resolution_of(timeframe)[1] / 86400
+
+    def products(self, contract_types=None):
+        """
+        Listed products, optionally only the given contract types
+        (e.g. ["perpetual_futures"]). None on failure.
+        """
+        result = self._get("/v2/products")
+        if result is None:
+            return None
+        if contract_types:
+            result = [p for p in result if p.get("contract_type") in contract_types]
+        return result
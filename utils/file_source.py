@@ -0,0 +1,120 @@
+"""
+File-Backed Candle Source
+Serves candles from local CSV / Parquet files, in-memory frames or the
+candle store through the CandleSource interface: no network, no credentials
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.candle_source import CandleSource
+from utils.candle_store import to_ist
+from utils.metrics import get_metrics
+from utils.rate_limiter import PRIORITY_LIVE
+
+# Tried in this order for <token>_<TIMEFRAME>.<ext>
+FILE_EXTENSIONS = (".parquet", ".csv")
+
+
+class FileCandleSource(CandleSource):
+    """
+    Candles of a (token, timeframe) series come from, in order: `frames`
+    ({(token, timeframe): DataFrame}), a file <path>/<token>_<TIMEFRAME>.parquet
+    or .csv with columns time, open, high, low, close, volume, then the candle
+    store. File times may be ISO strings (naive = UTC) or epoch seconds.
+
+    Only candles that had closed by now() are served, so with a virtual
+    clock (replay) the loop never sees the future. Files are re-read when
+    they change, e.g. while a recorder appends to them.
+    """
+
+    name = "file"
+
+    def __init__(self, path=None, frames=None, candle_store=None, now=None):
+        from config.settings import TIMEFRAME_MINUTES
+
+        super().__init__(candle_store)
+        self.path = path
+        self.step_minutes = TIMEFRAME_MINUTES
+        if now is not None:
+            self.now = now
+        self._series = {}  # key → (file mtime or None, candles, epochs)
+        for (token, timeframe), df in (frames or {}).items():
+            self._series[(token, timeframe)] = (None, *index_candles(df))
+
+    def file_path(self, symbol_token, timeframe):
+        """Existing file of a series, or None"""
+        if not self.path:
+            return None
+        for ext in FILE_EXTENSIONS:
+            path = os.path.join(self.path, f"{symbol_token}_{timeframe}{ext}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _load(self, symbol_token, exchange, timeframe):
+        """(candles, epochs) of a series, or (None, None)"""
+        key = (symbol_token, timeframe)
+        cached = self._series.get(key)
+        if cached is not None and cached[0] is None:
+            return cached[1:]  # frames / candle store series never change
+
+        path = self.file_path(symbol_token, timeframe)
+        if path is not None:
+            mtime = os.path.getmtime(path)
+            if cached is None or cached[0] != mtime:
+                self._series[key] = (mtime, *index_candles(read_candle_file(path)))
+            return self._series[key][1:]
+
+        df = None
+        if self.candle_store is not None:
+            df = self.candle_store.load(symbol_token, exchange, timeframe)
+        self._series[key] = (None, *index_candles(df))
+        return self._series[key][1:]
+
+    def fetch_candles_range(self, symbol_token, exchange, timeframe, from_date, to_date,
+                            priority=PRIORITY_LIVE):
+        """Closed candles starting in [from_date, to_date] (None for an unknown series)"""
+        get_metrics().increment("fetch_requests")
+        self.rate_limiter.acquire(priority)
+        df, epochs = self._load(symbol_token, exchange, timeframe)
+        if df is None:
+            return None
+
+        step = self.step_minutes.get(timeframe, 5) * 60
+        end = min(int(to_date.timestamp()), int(self.now().timestamp()) - step)
+        lo = np.searchsorted(epochs, int(from_date.timestamp()), side="left")
+        hi = np.searchsorted(epochs, end, side="right")
+        return df.iloc[lo:hi].reset_index(drop=True)
+
+    def candle_span(self, watchlist, timeframe):
+        """(first, last) candle time over the watchlist's series, or (None, None)"""
+        frames = [self._load(item["token"], item["exchange"], timeframe)[0] for item in watchlist]
+        frames = [df for df in frames if df is not None]
+        if not frames:
+            return None, None
+        return min(df['time'].iloc[0] for df in frames), max(df['time'].iloc[-1] for df in frames)
+
+
+def read_candle_file(path):
+    """Candles from a CSV or Parquet file (Parquet needs pyarrow or fastparquet)"""
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    if pd.api.types.is_numeric_dtype(df['time']):
+        df['time'] = pd.to_datetime(df['time'], unit="s", utc=True)
+    return df
+
+
+def index_candles(df):
+    """(candles sorted by IST time, int64 epoch seconds) or (None, None)"""
+    if df is None or df.empty:
+        return None, None
+    df = df.copy()
+    df['time'] = to_ist(df['time'])
+    df = df.sort_values("time").drop_duplicates(subset="time", keep="last").reset_index(drop=True)
+    epochs = df['time'].dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+    epochs = epochs.astype("datetime64[s]").astype(np.int64)
+    return df, epochs
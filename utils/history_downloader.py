@@ -0,0 +1,135 @@
+"""
+Long-History Downloader
+Splits a date range into the largest windows the candle source allows per
+request and fetches them concurrently under its rate limiter
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import pandas as pd
+from logzero import logger
+
+from utils.api_helpers import IST
+from utils.candle_store import CANDLE_COLUMNS
+from utils.rate_limiter import PRIORITY_BACKFILL
+
+# Windows are aligned to this date so the same range splits the same way on
+# every run (needed to skip windows finished before an interruption)
+WINDOW_ANCHOR = datetime(2000, 1, 1, tzinfo=IST)
+
+
+def split_range(from_date, to_date, max_days):
+    """
+    Split [from_date, to_date] into request windows of at most max_days.
+
+    Windows follow a fixed grid of max_days blocks from WINDOW_ANCHOR; only the
+    first and last are clipped to the requested range. Window ends are one
+    minute before the next start since both API bounds are inclusive.
+
+    Returns:
+    --------
+    list of (datetime, datetime)
+    """
+    size = timedelta(days=max_days)
+    block = (from_date - WINDOW_ANCHOR) // size
+    start = WINDOW_ANCHOR + block * size
+    windows = []
+    while start <= to_date:
+        end = start + size - timedelta(minutes=1)
+        windows.append((max(start, from_date), min(end, to_date)))
+        start += size
+    return windows
+
+
+class HistoryDownloader:
+    """
+    Multi-window candle download on top of any CandleSource.
+
+    With a candle store each finished window is saved and recorded as it
+    completes, so an interrupted download resumes with the windows still
+    missing. Without one the windows are stitched in memory.
+    """
+
+    def __init__(self, api, candle_store=None, max_workers=None):
+        from config.settings import HISTORY_DOWNLOAD_WORKERS
+        self.api = api
+        self.store = candle_store if candle_store is not None else api.candle_store
+        self.max_workers = max_workers or HISTORY_DOWNLOAD_WORKERS
+
+    def download(self, symbol_token, exchange, timeframe, from_date, to_date=None):
+        """
+        Fetch every candle in [from_date, to_date] (IST datetimes).
+
+        Returns:
+        --------
+        pandas.DataFrame
+            Sorted, de-duplicated candles, or None if any window failed
+            (finished windows stay in the store for the next attempt)
+        """
+        from config.settings import TIMEFRAME_MINUTES
+
+        to_date = to_date or datetime.now(IST)
+        step = TIMEFRAME_MINUTES.get(timeframe, 5)
+        key = (symbol_token, exchange, timeframe)
+        max_days = self.api.max_request_days(timeframe)
+        windows = split_range(from_date, to_date, max_days) if max_days else [(from_date, to_date)]
+
+        done = set()
+        if self.store is not None:
+            done = self.store.downloaded_windows(*key)
+        # A window inside one downloaded earlier is done, even if this run's
+        # from_date clips it differently (e.g. --days N relative to now)
+        pending = [w for w in windows if not _covered(w, done)]
+        logger.info(
+            f"[HISTORY] {symbol_token} {timeframe}: {len(windows)} window(s), "
+            f"{len(windows) - len(pending)} already downloaded"
+        )
+
+        frames = []
+        failed = 0
+        # A window is final once its last candle has closed
+        complete_until = datetime.now(IST) - timedelta(minutes=step)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self.api.fetch_candles_range, *key, start, end,
+                            priority=PRIORITY_BACKFILL): (start, end)
+                for start, end in pending
+            }
+            for future in as_completed(futures):
+                start, end = futures[future]
+                try:
+                    df = future.result()
+                except Exception as e:
+                    logger.error(f"[HISTORY] Window {start:%Y-%m-%d} → {end:%Y-%m-%d} failed: {e}")
+                    df = None
+                if df is None:
+                    failed += 1
+                    continue
+
+                if self.store is not None:
+                    self.store.save(*key, df, step, fetched_at=datetime.now(IST))
+                    if end <= complete_until:
+                        self.store.mark_downloaded(*key, start, end)
+                else:
+                    frames.append(df)
+
+        if failed:
+            logger.error(f"[HISTORY] {failed}/{len(pending)} window(s) failed. Run again to resume")
+            return None
+
+        if self.store is not None:
+            self.store.extend_coverage(*key, from_date)
+            return self.store.load(*key, start=from_date, end=to_date)
+
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame(columns=CANDLE_COLUMNS)
+        df = pd.concat(frames, ignore_index=True)
+        return (df.drop_duplicates(subset='time', keep='last')
+                  .sort_values('time').reset_index(drop=True))
+
+
+def _covered(window, done):
+    """True if a (start, end) epoch pair in done contains window"""
+    start, end = int(window[0].timestamp()), int(window[1].timestamp())
+    return any(lo <= start and end <= hi for lo, hi in done)
@@ -0,0 +1,219 @@
+"""
+Instrument Master Index
+Symbol ↔ token lookup for the whole Angel One universe (NSE / BSE / NFO / MCX)
+from a local copy of the scrip master JSON:
+https://margincalculator.angelbroking.com/OpenAPI_File/files/OpenAPIScripMaster.json
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from logzero import logger
+
+# Bumped whenever the index schema or row parsing changes
+INDEX_VERSION = 1
+
+INSTRUMENT_FIELDS = ["exchange", "token", "symbol", "name", "instrument_type",
+                     "expiry", "strike", "option_type", "lot_size", "tick_size"]
+
+
+def parse_instrument(entry):
+    """
+    One scrip master entry → index row.
+
+    The master stores strikes and tick sizes in paise and expiries as
+    "26DEC2024"; rows hold rupees and ISO dates ("2024-12-26") so they sort.
+    """
+    symbol = entry.get("symbol", "")
+    instrument_type = entry.get("instrumenttype", "")
+    expiry = entry.get("expiry") or None
+    if expiry:
+        expiry = datetime.strptime(expiry, "%d%b%Y").date().isoformat()
+    strike = float(entry.get("strike") or -1)
+    option_type = None
+    if instrument_type.startswith("OPT") and symbol[-2:] in ("CE", "PE"):
+        option_type = symbol[-2:]
+    return (
+        entry.get("exch_seg", ""),
+        str(entry.get("token", "")),
+        symbol,
+        entry.get("name", ""),
+        instrument_type,
+        expiry,
+        strike / 100 if strike > 0 else None,
+        option_type,
+        int(float(entry.get("lotsize") or 1)),
+        float(entry.get("tick_size") or 0) / 100,
+    )
+
+
+class InstrumentMaster:
+    """
+    SQLite index of the scrip master.
+
+    The JSON (tens of MB, ~150k entries) is parsed only when the index is
+    missing or the master file changed; every later run opens the index
+    directly. Lookups use primary-key / covering indexes.
+    """
+
+    def __init__(self, index_path, master_path=None):
+        self.index_path = index_path
+        self.master_path = master_path
+        folder = os.path.dirname(index_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(index_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS instruments (
+                    exchange TEXT NOT NULL,
+                    token TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    name TEXT,
+                    instrument_type TEXT,
+                    expiry TEXT,
+                    strike REAL,
+                    option_type TEXT,
+                    lot_size INTEGER,
+                    tick_size REAL,
+                    PRIMARY KEY (exchange, token)
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS by_symbol ON instruments (symbol COLLATE NOCASE, exchange)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS by_token ON instruments (token)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS by_chain ON instruments (name, exchange, expiry, strike)"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        if master_path:
+            self.refresh()
+
+    def close(self):
+        self._conn.close()
+
+    # ===== BUILD =====
+
+    def _source_key(self):
+        stat = os.stat(self.master_path)
+        return f"{INDEX_VERSION}:{stat.st_size}:{int(stat.st_mtime)}"
+
+    def refresh(self):
+        """Rebuild the index if the master file changed since it was built. Returns True if rebuilt."""
+        if not self.master_path or not os.path.exists(self.master_path):
+            if self.count() == 0:
+                logger.warning(f"[INSTRUMENTS] No scrip master at {self.master_path}")
+            return False
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+        if row is not None and row[0] == self._source_key():
+            return False
+        self.build(self.master_path)
+        return True
+
+    def build(self, master_path):
+        """Parse the scrip master JSON and replace the whole index"""
+        with open(master_path, "rb") as f:
+            entries = json.load(f)
+        rows = [parse_instrument(e) for e in entries]
+
+        self.master_path = master_path
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM instruments")
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO instruments VALUES ({', '.join('?' * len(INSTRUMENT_FIELDS))})",
+                rows
+            )
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('source', ?)", (self._source_key(),))
+        logger.info(f"[INSTRUMENTS] Indexed {len(rows)} instruments from {master_path}")
+        return len(rows)
+
+    # ===== LOOKUPS =====
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(sql, params).fetchall()]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM instruments").fetchone()[0]
+
+    def by_token(self, token, exchange=None):
+        """Instrument dict for a token (None if unknown). Tokens repeat across exchanges."""
+        if exchange:
+            rows = self._query("SELECT * FROM instruments WHERE exchange = ? AND token = ?",
+                               (exchange, str(token)))
+        else:
+            rows = self._query("SELECT * FROM instruments WHERE token = ?", (str(token),))
+        return rows[0] if rows else None
+
+    def by_symbol(self, symbol, exchange=None):
+        """
+        Instrument dict for a trading symbol, e.g. "RELIANCE-EQ", "NIFTY 50"
+        or "NIFTY26DEC2424000CE" (case-insensitive). Equity symbols also
+        match without "-EQ".
+        """
+        sql = "SELECT * FROM instruments WHERE symbol = ? COLLATE NOCASE"
+        for candidate in (symbol, f"{symbol}-EQ"):
+            params = [candidate]
+            query = sql
+            if exchange:
+                query += " AND exchange = ?"
+                params.append(exchange)
+            rows = self._query(query, params)
+            if rows:
+                return rows[0]
+        return None
+
+    def expiries(self, name, exchange="NFO", instrument_type=None):
+        """Sorted ISO expiry dates of an underlying's derivatives"""
+        sql = "SELECT DISTINCT expiry FROM instruments WHERE name = ? AND exchange = ? AND expiry IS NOT NULL"
+        params = [name, exchange]
+        if instrument_type:
+            sql += " AND instrument_type LIKE ?"  # "OPT" matches OPTIDX and OPTSTK
+            params.append(f"{instrument_type}%")
+        return [r["expiry"] for r in self._query(sql + " ORDER BY expiry", params)]
+
+    def futures(self, name, exchange="NFO"):
+        """Futures of an underlying, nearest expiry first"""
+        return self._query(
+            "SELECT * FROM instruments WHERE name = ? AND exchange = ? AND instrument_type LIKE 'FUT%' "
+            "ORDER BY expiry", (name, exchange)
+        )
+
+    def option_chain(self, name, expiry=None, exchange="NFO", strikes=None):
+        """
+        Options of an underlying for one expiry (default: the nearest one).
+
+        Parameters:
+        -----------
+        name : str
+            Underlying, e.g. "NIFTY", "BANKNIFTY", "RELIANCE"
+        expiry : str or date, optional
+            ISO date
+        strikes : (float, float), optional
+            Inclusive strike range in rupees
+
+        Returns:
+        --------
+        list of dict
+            Sorted by strike, CE before PE
+        """
+        if expiry is None:
+            options = self.expiries(name, exchange, "OPT")
+            options = [e for e in options if e >= datetime.now().date().isoformat()] or options
+            if not options:
+                return []
+            expiry = options[0]
+        sql = ("SELECT * FROM instruments WHERE name = ? AND exchange = ? AND expiry = ? "
+               "AND option_type IS NOT NULL")
+        params = [name, exchange, str(expiry)]
+        if strikes:
+            sql += " AND strike BETWEEN ? AND ?"
+            params.extend(strikes)
+        return self._query(sql + " ORDER BY strike, option_type", params)
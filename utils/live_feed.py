@@ -0,0 +1,259 @@
+"""
+Live Tick Feed
+SmartAPI WebSocket ticks aggregated into OHLCV candles in memory
+"""
+import json
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+from logzero import logger
+
+from utils.market_session import session_bucket_bounds
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# SmartWebSocketV2 exchange types
+EXCHANGE_TYPES = {"NSE": 1, "NFO": 2, "BSE": 3, "BFO": 4, "MCX": 5, "NCX": 7, "CDS": 13}
+
+# SmartWebSocketV2 subscription mode with LTP + day volume
+QUOTE_MODE = 2
+
+
+def parse_tick(message):
+    """
+    Extract (token, time, price, day volume) from a SmartWebSocketV2 message.
+    Prices arrive in paise; volume is the cumulative volume for the day.
+    """
+    ts = datetime.fromtimestamp(message["exchange_timestamp"] / 1000, tz=IST)
+    price = message["last_traded_price"] / 100.0
+    volume = message.get("volume_trade_for_the_day")
+    return str(message["token"]), ts, price, volume
+
+
+class CandleAggregator:
+    """
+    Builds OHLCV candles from ticks.
+
+    Buckets are anchored to the NSE session open (09:15 IST), so 1h candles
+    run 09:15-10:15 like Angel One's historical candles, and the last bucket
+    of the day is cut at the close (15:15-15:30). A candle is emitted
+    through on_candle(token, candle) when a tick of a later bucket arrives or
+    when flush() is called after the bucket has ended.
+    """
+
+    def __init__(self, timeframe_minutes, on_candle, session_open=(9, 15), session_close=(15, 30)):
+        self.minutes = timeframe_minutes
+        self.on_candle = on_candle
+        self.session_open = session_open
+        self.session_close = session_close
+        self._open = {}         # token → forming candle
+        self._ends = {}         # token → end of the forming candle
+        self._day_volume = {}   # token → last cumulative day volume
+        self._lock = threading.Lock()
+
+    def bucket_bounds(self, ts):
+        """(start, end) of the candle containing ts"""
+        return session_bucket_bounds(ts, self.minutes, self.session_open, self.session_close)
+
+    def bucket_start(self, ts):
+        """Start of the candle containing ts"""
+        return self.bucket_bounds(ts)[0]
+
+    def add_tick(self, token, ts, price, day_volume=None):
+        closed = None
+        with self._lock:
+            volume = 0.0
+            if day_volume is not None:
+                previous = self._day_volume.get(token)
+                if previous is not None and day_volume >= previous:
+                    volume = float(day_volume - previous)
+                self._day_volume[token] = day_volume
+
+            start, end = self.bucket_bounds(ts)
+            candle = self._open.get(token)
+
+            if candle is not None and start < candle['time']:
+                logger.debug(f"[FEED] Late tick for {token} at {ts} ignored")
+                return
+            if ts >= end:
+                logger.debug(f"[FEED] Tick for {token} after the session close at {ts} ignored")
+                return
+
+            if candle is None or start > candle['time']:
+                closed = candle
+                self._ends[token] = end
+                self._open[token] = {
+                    "time": pd.Timestamp(start), "open": price, "high": price,
+                    "low": price, "close": price, "volume": volume
+                }
+            else:
+                candle['high'] = max(candle['high'], price)
+                candle['low'] = min(candle['low'], price)
+                candle['close'] = price
+                candle['volume'] += volume
+
+        if closed is not None:
+            self.on_candle(token, closed)
+
+    def flush(self, now, grace_seconds=0):
+        """Emit every forming candle whose interval ended before now - grace"""
+        closed = []
+        with self._lock:
+            for token, candle in list(self._open.items()):
+                if self._ends[token] + timedelta(seconds=grace_seconds) <= now:
+                    closed.append((token, self._open.pop(token)))
+        for token, candle in closed:
+            self.on_candle(token, candle)
+
+
+class ReplayWebSocket:
+    """
+    Local stand-in for SmartWebSocketV2 that replays recorded ticks.
+
+    Ticks are SmartWebSocketV2 messages, one JSON object per line (the format
+    LiveFeed writes with record_path). Only subscribed tokens are replayed.
+    """
+
+    def __init__(self, ticks_path, delay=0.0):
+        self.ticks_path = ticks_path
+        self.delay = delay
+        self.tokens = set()
+        self._running = False
+        self.on_open = None
+        self.on_data = None
+        self.on_error = None
+        self.on_close = None
+
+    def subscribe(self, correlation_id, mode, token_list):
+        for group in token_list:
+            self.tokens.update(str(t) for t in group["tokens"])
+
+    def connect(self):
+        self._running = True
+        if self.on_open:
+            self.on_open(None)
+        with open(self.ticks_path, encoding="utf-8") as f:
+            for line in f:
+                if not self._running:
+                    break
+                message = json.loads(line)
+                if str(message["token"]) in self.tokens and self.on_data:
+                    self.on_data(None, message)
+                if self.delay:
+                    time.sleep(self.delay)
+        self._running = False
+        if self.on_close:
+            self.on_close(None)
+
+    def close_connection(self):
+        self._running = False
+
+
+class LiveFeed:
+    """
+    Subscribes the watchlist to SmartAPI's WebSocket and queues closed candles.
+
+    Closed candles are put on `candles` as (token, candle) tuples for the main
+    loop. A background timer closes candles at their boundary even if no new
+    tick arrives.
+    """
+
+    def __init__(self, api, watchlist, timeframe_minutes, ws_factory=None,
+                 record_path=None, flush_interval=1.0, grace_seconds=2, clock=None):
+        """
+        Parameters:
+        -----------
+        api : AngelOneApiHelper
+            Logged-in helper (auth_token / feed_token are used)
+        ws_factory : callable, optional
+            Returns the WebSocket client; defaults to SmartWebSocketV2.
+            Pass lambda: ReplayWebSocket(path) to replay recorded ticks.
+        record_path : str, optional
+            Append every raw tick to this JSONL file
+        flush_interval : float or None
+            Seconds between timer flushes (None disables the timer)
+        """
+        self.api = api
+        self.watchlist = watchlist
+        self.ws_factory = ws_factory or self._smart_websocket
+        self.record_path = record_path
+        self.flush_interval = flush_interval
+        self.grace_seconds = grace_seconds
+        self.clock = clock or (lambda: datetime.now(IST))
+        self.candles = queue.Queue()
+        self.aggregator = CandleAggregator(timeframe_minutes, self._emit)
+        self.ticks = 0
+        self.ws = None
+        self._record = None
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def _smart_websocket(self):
+        from SmartApi.smartWebSocketV2 import SmartWebSocketV2
+        return SmartWebSocketV2(
+            self.api.auth_token, self.api.api_key, self.api.client_id, self.api.feed_token
+        )
+
+    def _emit(self, token, candle):
+        self.candles.put((token, candle))
+
+    def _token_list(self):
+        groups = {}
+        for item in self.watchlist:
+            exchange_type = EXCHANGE_TYPES.get(item["exchange"], 1)
+            groups.setdefault(exchange_type, []).append(item["token"])
+        return [{"exchangeType": k, "tokens": v} for k, v in groups.items()]
+
+    def _on_open(self, wsapp):
+        logger.info(f"[FEED] Connected. Subscribing {len(self.watchlist)} token(s)")
+        self.ws.subscribe("rsi-divergence", QUOTE_MODE, self._token_list())
+
+    def _on_data(self, wsapp, message):
+        if not isinstance(message, dict) or "last_traded_price" not in message:
+            return
+        self.ticks += 1
+        if self._record:
+            self._record.write(json.dumps(message) + "\n")
+        self.aggregator.add_tick(*parse_tick(message))
+
+    def _on_error(self, *args):
+        logger.error(f"[FEED] WebSocket error: {args[-1] if args else ''}")
+
+    def _on_close(self, *args):
+        logger.info("[FEED] WebSocket closed")
+
+    def _flush_loop(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.aggregator.flush(self.clock(), self.grace_seconds)
+
+    def start(self):
+        """Connect in a background thread (non-blocking)"""
+        if self.record_path:
+            self._record = open(self.record_path, "a", encoding="utf-8")
+        self.ws = self.ws_factory()
+        self.ws.on_open = self._on_open
+        self.ws.on_data = self._on_data
+        self.ws.on_error = self._on_error
+        self.ws.on_close = self._on_close
+
+        self._threads = [threading.Thread(target=self.ws.connect, daemon=True)]
+        if self.flush_interval:
+            self._threads.append(threading.Thread(target=self._flush_loop, daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def join(self, timeout=None):
+        """Wait for the WebSocket thread to finish (replays end on their own)"""
+        if self._threads:
+            self._threads[0].join(timeout)
+
+    def stop(self):
+        self._stopped.set()
+        if self.ws:
+            self.ws.close_connection()
+        if self._record:
+            self._record.close()
+            self._record = None
@@ -0,0 +1,38 @@
+"""
+Market Session Grid
+Candle buckets of a trading session: anchored at the open, cut at the close
+"""
+from datetime import timedelta
+
+
+def session_bucket_start(ts, minutes, session_open=(9, 15)):
+    """
+    Start of the `minutes` candle containing ts, anchored to the session open.
+    Daily candles start at midnight (as in Angel One's historical data).
+    """
+    if minutes >= 1440:
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    anchor = ts.replace(hour=session_open[0], minute=session_open[1],
+                        second=0, microsecond=0)
+    if ts < anchor:
+        anchor -= timedelta(days=1)
+    step = timedelta(minutes=minutes)
+    return anchor + ((ts - anchor) // step) * step
+
+
+def session_bucket_bounds(ts, minutes, session_open=(9, 15), session_close=(15, 30)):
+    """
+    (start, end) of the `minutes` candle containing ts.
+
+    The last intraday candle of the day is cut at the session close, e.g.
+    the 15:15 hourly candle ends at 15:30. Daily candles end at the close.
+    """
+    start = session_bucket_start(ts, minutes, session_open)
+    close = ts.replace(hour=session_close[0], minute=session_close[1],
+                       second=0, microsecond=0)
+    if minutes >= 1440:
+        return start, close
+    end = start + timedelta(minutes=minutes)
+    if start < close < end:
+        end = close
+    return start, end
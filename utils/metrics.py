@@ -0,0 +1,132 @@
+"""
+Latency Metrics
+Timing spans and counters for the live loop, exported as JSONL or
+Prometheus text (node_exporter textfile format)
+"""
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyMetrics:
+    """
+    Rolling latency samples per stage plus monotonic counters.
+
+    Each stage keeps its last `window` samples; percentiles are computed over
+    that window. Safe to use from the scanner's worker threads.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._samples = {}
+        self._totals = {}   # stage -> (count, sum) since start
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=self.window)
+                self._totals[name] = (0, 0.0)
+            self._samples[name].append(seconds)
+            count, total = self._totals[name]
+            self._totals[name] = (count + 1, total + seconds)
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block as one sample of `name`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """
+        Returns:
+        --------
+        dict
+            {"latency": {stage: {"count", "last", "p50", "p95", "p99", "max"}},
+             "counters": {...}}
+        """
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+            totals = dict(self._totals)
+            counters = dict(self.counters)
+
+        latency = {}
+        for name, values in samples.items():
+            ordered = sorted(values)
+            stats = {"count": totals[name][0], "sum": totals[name][1], "last": values[-1],
+                     "max": ordered[-1]}
+            for q in QUANTILES:
+                stats[f"p{int(q * 100)}"] = _quantile(ordered, q)
+            latency[name] = stats
+        return {"latency": latency, "counters": counters}
+
+    def prometheus_text(self, prefix="rsi_bot"):
+        """Stage latencies as summaries, counters as counters"""
+        snap = self.snapshot()
+        lines = [f"# HELP {prefix}_stage_seconds Latency of each live loop stage",
+                 f"# TYPE {prefix}_stage_seconds summary"]
+        for name, stats in sorted(snap["latency"].items()):
+            for q in QUANTILES:
+                lines.append(f'{prefix}_stage_seconds{{stage="{name}",quantile="{q}"}} '
+                             f'{stats[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stats["sum"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stats["count"]}')
+        for name, value in sorted(snap["counters"].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path, fmt="jsonl", **fields):
+        """
+        Write the current metrics.
+
+        jsonl      : append one line {"time", **fields, "latency", "counters"}
+        prometheus : replace the file atomically (for the textfile collector)
+        """
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        if fmt == "prometheus":
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp, path)
+            return
+
+        record = {"time": datetime.now().astimezone().isoformat(timespec="seconds"), **fields}
+        record.update(self.snapshot())
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+def _quantile(ordered, q):
+    """Nearest-rank quantile of a sorted list"""
+    rank = max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))
+    return ordered[rank]
+
+
+_metrics = None
+
+
+def get_metrics():
+    """Process-wide metrics registry"""
+    global _metrics
+    if _metrics is None:
+        _metrics = LatencyMetrics()
+    return _metrics
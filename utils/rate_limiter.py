@@ -0,0 +1,132 @@
+"""
+Client-side Rate Limiter
+Token buckets with priority lanes for the Angel One historical API
+"""
+import heapq
+import itertools
+import random
+import threading
+import time
+
+# Priority lanes (lower value goes first)
+PRIORITY_LIVE = 0
+PRIORITY_BACKFILL = 1
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per `per` seconds, burst = rate"""
+
+    def __init__(self, rate, per):
+        self.capacity = float(rate)
+        self.fill_rate = rate / per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until one token is available"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.fill_rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def drain(self, seconds):
+        """Pretend the bucket was emptied `seconds` of refill ago"""
+        self.tokens = min(self.tokens, -seconds * self.fill_rate)
+
+
+class RateLimiter:
+    """
+    Request scheduler shared by every API caller.
+
+    A request may start only when every bucket has a token AND no request of a
+    higher priority lane is waiting, so live-cycle fetches overtake backfill.
+    """
+
+    def __init__(self, limits, backoff_base=1.0, backoff_cap=30.0):
+        """
+        Parameters:
+        -----------
+        limits : list of (int, float)
+            (requests, seconds) pairs, e.g. [(3, 1), (180, 60)]
+        """
+        self.buckets = [TokenBucket(rate, per) for rate, per in limits]
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self.stats = {
+            "requests": 0,
+            "queued": 0,      # requests that had to wait for a slot
+            "throttled": 0,   # throttle responses reported by callers
+            "wait_seconds": 0.0,
+        }
+
+    def acquire(self, priority=PRIORITY_LIVE):
+        """Block until the request may be sent"""
+        ticket = (priority, next(self._sequence))
+        started = time.monotonic()
+        waited = False
+
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                now = time.monotonic()
+                delay = max(bucket.wait_time(now) for bucket in self.buckets)
+                if self._waiting[0] == ticket and delay == 0:
+                    break
+                waited = True
+                # Not our turn: wake up on release or when a token is due
+                self._cond.wait(timeout=delay if self._waiting[0] == ticket else None)
+
+            heapq.heappop(self._waiting)
+            for bucket in self.buckets:
+                bucket.take()
+            self.stats["requests"] += 1
+            if waited:
+                self.stats["queued"] += 1
+                self.stats["wait_seconds"] += time.monotonic() - started
+            self._cond.notify_all()
+
+    def record_throttle(self, attempt=0):
+        """
+        Report a throttle response. Pauses every lane for the backoff delay
+        and returns that delay.
+        """
+        delay = self.backoff_delay(attempt)
+        with self._cond:
+            self.stats["throttled"] += 1
+            for bucket in self.buckets:
+                bucket.drain(delay)
+            self._cond.notify_all()
+        return delay
+
+    def backoff_delay(self, attempt):
+        """Exponential backoff with jitter (between 50% and 100% of the step)"""
+        step = min(self.backoff_cap, self.backoff_base * (2 ** attempt))
+        return step * random.uniform(0.5, 1.0)
+
+    @property
+    def queue_depth(self):
+        with self._cond:
+            return len(self._waiting)
+
+    def snapshot(self):
+        """Copy of the counters plus the current queue depth"""
+        with self._cond:
+            stats = dict(self.stats)
+            stats["queue_depth"] = len(self._waiting)
+        return stats
+
+
+def is_throttle_message(message):
+    """True if an API error message means the rate limit was exceeded"""
+    text = str(message).lower()
+    return any(x in text for x in ["exceeding access rate", "rate limit", "too many requests", "access denied"])
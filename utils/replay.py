@@ -0,0 +1,48 @@
+"""
+Replay Mode Helpers
+Virtual clock and a file-backed stand-in for AngelOneApiHelper, so the real
+polling loop can run over recorded candles as fast as the CPU allows
+"""
+from datetime import timedelta, timezone
+
+from utils.file_source import FileCandleSource
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+class ReplayClock:
+    """
+    Virtual time. sleep() advances the clock instantly instead of blocking;
+    plugs into CandleCloseScheduler as now / monotonic / sleep.
+    """
+
+    def __init__(self, start):
+        self.start = start.astimezone(IST)
+        self.elapsed = 0.0
+
+    def now(self):
+        return self.start + timedelta(seconds=self.elapsed)
+
+    def monotonic(self):
+        return self.elapsed
+
+    def sleep(self, seconds):
+        self.elapsed += max(seconds, 0.0)
+
+
+class ReplayApiHelper(FileCandleSource):
+    """
+    Serves recorded candles through the CandleSource interface used by the
+    scanner. fetch_candles returns only the candles that had closed by the
+    clock's time, so the loop never sees the future.
+
+    Candles come from `frames` ({(token, timeframe): DataFrame}) or, for
+    series not in frames, from CSV / Parquet files under `path` or a
+    CandleStore. `session` is the recorded market's (open, close, trading
+    days), None for NSE hours.
+    """
+
+    def __init__(self, clock, frames=None, candle_store=None, path=None, session=None):
+        super().__init__(path, frames=frames, candle_store=candle_store, now=clock.now)
+        self.clock = clock
+        self.session = session
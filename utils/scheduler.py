@@ -0,0 +1,151 @@
+"""
+Candle-Close Scheduler
+Wakes the bot right after candles close, for every active timeframe at once
+"""
+import time
+from datetime import datetime, timedelta, timezone
+
+from logzero import logger
+
+from utils.metrics import get_metrics
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Longest single sleep. Waking up periodically keeps the wait responsive to
+# Ctrl+C and lets a suspended machine notice that the deadline has passed.
+MAX_SLEEP_SECONDS = 60
+
+
+def session_closes(day, minutes, session_open=(9, 15), session_close=(15, 30)):
+    """
+    Close times of all `minutes` candles of one session (IST).
+
+    Intraday candles are anchored at the open and the last one is cut at the
+    close, like CandleResampler: 1h closes at 10:15, 11:15, ..., 15:15, 15:30.
+    Daily candles close with the session. A close at or before the open ends
+    the session on the next day (round-the-clock markets).
+    """
+    open_at = datetime(day.year, day.month, day.day, *session_open, tzinfo=IST)
+    close_at = datetime(day.year, day.month, day.day, *session_close, tzinfo=IST)
+    if close_at <= open_at:
+        close_at += timedelta(days=1)
+    if minutes >= 1440:
+        return [close_at]
+
+    closes = []
+    step = timedelta(minutes=minutes)
+    end = open_at + step
+    while end < close_at:
+        closes.append(end)
+        end += step
+    closes.append(close_at)
+    return closes
+
+
+class CandleCloseScheduler:
+    """
+    Computes the next session-aligned candle close of every timeframe and
+    sleeps until it (plus `buffer_seconds` for the broker to publish the
+    candle) on the monotonic clock, so wall-clock adjustments cannot stretch
+    or skip a wait.
+
+    Timeframes closing at the same instant (e.g. 5m / 15m / 1h at 10:15) are
+    reported as one event. How late each wakeup fires is recorded as the
+    "wakeup_late" latency metric.
+
+    `session` is the candle source's (open, close, trading days), e.g.
+    utils.candle_source.SESSION_24X7; None uses the NSE hours from settings.
+    """
+
+    def __init__(self, timeframes, buffer_seconds=15, metrics=None,
+                 now=None, monotonic=None, sleep=None, session=None):
+        from config.settings import (
+            TIMEFRAME_MINUTES, TRADING_DAYS,
+            MARKET_OPEN_HOUR, MARKET_OPEN_MINUTE,
+            MARKET_CLOSE_HOUR, MARKET_CLOSE_MINUTE
+        )
+
+        if session is None:
+            session = ((MARKET_OPEN_HOUR, MARKET_OPEN_MINUTE),
+                       (MARKET_CLOSE_HOUR, MARKET_CLOSE_MINUTE), TRADING_DAYS)
+        self.minutes = {tf: TIMEFRAME_MINUTES.get(tf, 5) for tf in timeframes}
+        self.buffer = timedelta(seconds=buffer_seconds)
+        self.session_open, self.session_close, self.trading_days = session
+        self.metrics = metrics or get_metrics()
+        self.now = now or (lambda: datetime.now(IST))
+        self.monotonic = monotonic or time.monotonic
+        self.sleep = sleep or time.sleep
+        self._callbacks = {tf: [] for tf in self.minutes}
+        self._last_close = None
+
+    def on_close(self, timeframe, callback):
+        """Call callback(timeframe, close_time) whenever a candle of timeframe closes"""
+        self._callbacks[timeframe].append(callback)
+
+    def next_close(self, timeframe, after):
+        """First close of timeframe strictly after `after` (IST), on a trading day"""
+        # Yesterday's session may still be running past midnight
+        day = after.astimezone(IST).date() - timedelta(days=1)
+        for _ in range(16):
+            if day.weekday() in self.trading_days:
+                for close in session_closes(day, self.minutes[timeframe],
+                                            self.session_open, self.session_close):
+                    if close > after:
+                        return close
+            day += timedelta(days=1)
+        raise ValueError("No trading day within two weeks. Check TRADING_DAYS")
+
+    def next_event(self, after=None):
+        """
+        Returns:
+        --------
+        tuple
+            (close_time, [timeframes closing then]) for the next close of any
+            timeframe strictly after `after` (default: now minus the buffer)
+        """
+        if after is None:
+            after = self.now() - self.buffer
+        closes = {tf: self.next_close(tf, after) for tf in self.minutes}
+        close_time = min(closes.values())
+        return close_time, [tf for tf in self.minutes if closes[tf] == close_time]
+
+    def wait(self):
+        """
+        Sleep until the next candle close + buffer.
+
+        Returns:
+        --------
+        tuple
+            (close_time, [timeframes closing then], seconds late)
+        """
+        after = self.now() - self.buffer
+        if self._last_close is not None and self._last_close > after:
+            after = self._last_close  # never report the same close twice
+        close_time, timeframes = self.next_event(after)
+        fire_at = close_time + self.buffer
+
+        wait_seconds = (fire_at - self.now()).total_seconds()
+        if wait_seconds > 0:
+            logger.info(
+                f"[WAIT] Next close {close_time.strftime('%a %H:%M')} "
+                f"({', '.join(timeframes)}) | Sleeping {int(wait_seconds)}s"
+            )
+            deadline = self.monotonic() + wait_seconds
+            while True:
+                remaining = deadline - self.monotonic()
+                if remaining <= 0:
+                    break
+                self.sleep(min(remaining, MAX_SLEEP_SECONDS))
+
+        late = (self.now() - fire_at).total_seconds()
+        self.metrics.observe("wakeup_late", max(late, 0.0))
+        self._last_close = close_time
+        return close_time, timeframes, late
+
+    def run_once(self):
+        """Wait for the next close and fire the callbacks of the timeframes that closed"""
+        close_time, timeframes, late = self.wait()
+        for tf in timeframes:
+            for callback in self._callbacks[tf]:
+                callback(tf, close_time)
+        return close_time, timeframes, late
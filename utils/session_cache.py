@@ -0,0 +1,87 @@
+"""
+Session Token Cache
+Persists Angel One JWT / refresh / feed tokens so restarts skip the TOTP login
+"""
+import base64
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from logzero import logger
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Sessions this close to expiry are not reused
+EXPIRY_MARGIN_SECONDS = 300
+
+
+def token_expiry(jwt_token):
+    """
+    Expiry (epoch seconds) of a JWT, read from its `exp` claim.
+    Falls back to the next midnight IST, when Angel One sessions end.
+    """
+    try:
+        payload = jwt_token.replace("Bearer ", "").split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        now = datetime.now(IST)
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return midnight.timestamp()
+
+
+class SessionCache:
+    """JSON file of session tokens keyed by client id"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, data):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, self.path)  # atomic: readers never see a partial file
+
+    def load(self, client_id):
+        """
+        Cached session for client_id, or None if missing / about to expire.
+
+        Returns:
+        --------
+        dict or None
+            {"jwt_token", "refresh_token", "feed_token", "expires_at"}
+        """
+        session = self._read().get(client_id)
+        if not session:
+            return None
+        if session.get("expires_at", 0) - EXPIRY_MARGIN_SECONDS <= time.time():
+            logger.info("[SESSION] Cached session expired")
+            return None
+        return session
+
+    def save(self, client_id, jwt_token, refresh_token, feed_token):
+        data = self._read()
+        data[client_id] = {
+            "jwt_token": jwt_token,
+            "refresh_token": refresh_token,
+            "feed_token": feed_token,
+            "expires_at": token_expiry(jwt_token),
+        }
+        self._write(data)
+
+    def clear(self, client_id):
+        data = self._read()
+        if data.pop(client_id, None) is not None:
+            self._write(data)
@@ -0,0 +1,64 @@
+"""
+Pooled SmartConnect
+SmartConnect whose REST calls (login, token refresh, getCandleData) reuse
+one keep-alive requests.Session instead of a new connection per request
+"""
+import json
+from urllib.parse import urljoin
+
+import SmartApi.smartExceptions as ex
+from SmartApi import SmartConnect
+
+from utils.candle_source import keep_alive_session
+
+
+class PooledSmartConnect(SmartConnect):
+    """
+    SmartConnect sending every request through `http` (default: a session
+    pooled by http_pool()). The stock _request calls requests.request and so
+    ignores the session SmartConnect builds from its `pool` argument.
+    """
+
+    def __init__(self, *args, http=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reqsession = http or keep_alive_session()
+
+    def _request(self, route, method, parameters=None):
+        """Same contract as SmartConnect._request, over the pooled session"""
+        params = parameters.copy() if parameters else {}
+        url = urljoin(self.root, self._routes[route].format(**params))
+
+        headers = self.requestHeaders()
+        if self.access_token:
+            headers["Authorization"] = "Bearer {}".format(self.access_token)
+
+        r = self.reqsession.request(
+            method,
+            url,
+            data=json.dumps(params) if method in ["POST", "PUT"] else None,
+            params=json.dumps(params) if method in ["GET", "DELETE"] else None,
+            headers=headers,
+            verify=not self.disable_ssl,
+            allow_redirects=True,
+            timeout=self.timeout,
+            proxies=self.proxies,
+        )
+
+        if "json" in headers["Content-type"]:
+            try:
+                data = json.loads(r.content.decode("utf8"))
+            except ValueError:
+                raise ex.DataException(
+                    f"Couldn't parse the JSON response received from the server: {r.content}"
+                )
+            if data.get("error_type"):
+                if self.session_expiry_hook and r.status_code == 403 and data["error_type"] == "TokenException":
+                    self.session_expiry_hook()
+                exp = getattr(ex, data["error_type"], ex.GeneralException)
+                raise exp(data["message"], code=r.status_code)
+            return data
+        if "csv" in headers["Content-type"]:
+            return r.content
+        raise ex.DataException(
+            f"Unknown Content-type ({headers['Content-type']}) with response: ({r.content})"
+        )
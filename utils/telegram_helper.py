@@ -1,7 +1,15 @@
+import queue
+import threading
+import time
+from collections import deque
 
-import requests
 from logzero import logger
 from config.settings import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from utils.metrics import get_metrics
+
+# Telegram rejects messages longer than this
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
 
 def send_telegram_alert(message):
     """
@@ -19,6 +27,7 @@ def send_telegram_alert(message):
     }
 
     try:
+        import requests
         response = requests.post(url, json=payload, timeout=10)
         if response.status_code == 200:
             logger.info("[TELEGRAM] Alert sent successfully!")
@@ -29,3 +38,165 @@ def send_telegram_alert(message):
     except Exception as e:
         logger.error(f"[TELEGRAM] Error sending alert: {e}")
         return False
+
+
+class AlertDispatcher:
+    """
+    Background Telegram sender so the scan loop never waits on alert I/O.
+
+    Alerts go into a bounded queue (new alerts are dropped and counted when it
+    is full). A worker thread sends them over one keep-alive session, joining
+    alerts that arrive together (e.g. many symbols on one candle close) into a
+    single message, with exponential backoff on failures and 429 responses.
+    """
+
+    def __init__(self, bot_token=None, chat_id=None, max_queue=100, max_batch=10,
+                 batch_window=0.5, max_retries=4, timeout=10, session=None):
+        self.bot_token = bot_token if bot_token is not None else TELEGRAM_BOT_TOKEN
+        self.chat_id = chat_id if chat_id is not None else TELEGRAM_CHAT_ID
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.session = session or self._make_session()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self.counters = {"queued": 0, "sent": 0, "batches": 0, "retries": 0, "failed": 0, "dropped": 0}
+
+    @staticmethod
+    def _make_session():
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        return session
+
+    @property
+    def url(self):
+        return f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def send(self, message):
+        """
+        Queue an alert without blocking. Returns False if it was dropped.
+        """
+        if not self.bot_token or not self.chat_id:
+            logger.warning("[TELEGRAM] Telegram credentials not configured. Skipping alert.")
+            return False
+        try:
+            self._queue.put_nowait((time.monotonic(), message))
+        except queue.Full:
+            self._count("dropped")
+            logger.error("[TELEGRAM] Alert queue full. Alert dropped")
+            return False
+        self._count("queued")
+        return True
+
+    def stop(self, timeout=15):
+        """Deliver what is queued (up to timeout seconds) and stop the worker"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        """Counters plus delivery latency (enqueue → delivered) in seconds"""
+        with self._lock:
+            stats = dict(self.counters)
+            latencies = sorted(self._latencies)
+        stats["pending"] = self._queue.qsize()
+        if latencies:
+            stats["latency_p50"] = latencies[len(latencies) // 2]
+            stats["latency_max"] = latencies[-1]
+        return stats
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.counters[key] += amount
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+
+            batch = [first]
+            size = len(first[1])
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if size + len(item[1]) + 2 > TELEGRAM_MAX_MESSAGE_LENGTH:
+                    self._deliver(batch)
+                    batch, size = [], 0
+                batch.append(item)
+                size += len(item[1]) + 2
+
+            self._deliver(batch)
+
+    def _deliver(self, batch):
+        text = "\n\n".join(message for _, message in batch)
+        payload = {"chat_id": self.chat_id, "text": text, "parse_mode": "HTML"}
+
+        for attempt in range(self.max_retries + 1):
+            delay = min(30.0, 2 ** attempt)
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                if response.status_code == 200:
+                    now = time.monotonic()
+                    with self._lock:
+                        self.counters["sent"] += len(batch)
+                        self.counters["batches"] += 1
+                        self._latencies.extend(now - queued for queued, _ in batch)
+                    metrics = get_metrics()
+                    for queued, _ in batch:
+                        metrics.observe("alert_delivery", now - queued)
+                    logger.info(f"[TELEGRAM] Sent {len(batch)} alert(s)")
+                    return True
+                if response.status_code == 429:
+                    try:
+                        delay = float(response.json()["parameters"]["retry_after"])
+                    except Exception:
+                        pass
+                elif response.status_code < 500:
+                    logger.error(f"[TELEGRAM] Failed to send alert: {response.text}")
+                    break
+                logger.warning(f"[TELEGRAM] HTTP {response.status_code}, retrying in {delay:.0f}s")
+            except Exception as e:
+                logger.warning(f"[TELEGRAM] Error sending alert: {e}. Retrying in {delay:.0f}s")
+
+            if attempt < self.max_retries:
+                self._count("retries")
+                time.sleep(delay)
+
+        self._count("failed", len(batch))
+        return False
+
+
+_dispatcher = None
+
+
+def get_alert_dispatcher():
+    """Process-wide dispatcher, started on first use"""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = AlertDispatcher().start()
+    return _dispatcher
+
+
+def dispatch_alert(message):
+    """Non-blocking replacement for send_telegram_alert"""
+    return get_alert_dispatcher().send(message)